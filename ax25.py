@@ -0,0 +1,126 @@
+"""
+AX25
+ADDRESS FIELDS AND HEADER PARSER OF THE AX.25 UI FRAMES CARRIED IN KISS DATA FRAMES
+
+EACH ADDRESS IS 6 CALLSIGN CHARACTERS SHIFTED LEFT ONE BIT AND AN SSID BYTE (SSID IN BITS 1-4,
+BIT 0 SET ON THE LAST ADDRESS); DESTINATION COMES FIRST, THEN SOURCE, THEN UP TO 8 DIGIPEATERS
+(BIT 7 OF A DIGIPEATER SSID BYTE IS SET ONCE IT HAS REPEATED THE FRAME), THEN CONTROL AND PID
+"""
+
+ADDRESS_LENGTH = 7
+UI_CONTROL = 0x03  # UNNUMBERED INFORMATION FRAME
+POLL_FINAL = 0x10  # P/F BIT OF THE CONTROL BYTE
+NO_LAYER3 = 0xF0  # PID: NO LAYER 3 PROTOCOL
+HEADER_LENGTH = 2 * ADDRESS_LENGTH + 2  # DESTINATION, SOURCE, CONTROL AND PID
+MAX_DIGIPEATERS = 8
+REPEATED = 0x80  # H BIT OF A DIGIPEATER SSID BYTE
+_SSID_MASK = 0x1E  # SSID BITS OF THE SSID BYTE, WITHOUT THE RESERVED, H AND LAST-ADDRESS BITS
+_UNSHIFT = bytes(byte >> 1 for byte in range(256))  # TRANSLATE TABLE FROM ADDRESS BYTES TO CALLSIGN CHARACTERS
+
+
+def decodeAddress(field):
+    """Callsign of a 7-byte address field as CALL or CALL-SSID"""
+    if len(field) < ADDRESS_LENGTH:
+        raise ValueError('AX.25 address must be {} bytes'.format(ADDRESS_LENGTH))
+    callsign = bytes(field[:6]).translate(_UNSHIFT).decode('ascii', 'replace').rstrip()
+    ssid = (field[6] >> 1) & 0x0F
+    return '{}-{}'.format(callsign, ssid) if ssid else callsign
+
+
+def encodeAddress(callsign, last=False):
+    """7-byte address field for CALL or CALL-SSID"""
+    callsign, _, ssid = callsign.upper().partition('-')
+    if not 0 < len(callsign) <= 6:
+        raise ValueError('Callsign {!r} must be 1 to 6 characters'.format(callsign))
+    field = bytes(ord(ch) << 1 for ch in callsign.ljust(6))
+    # RESERVED BITS 5-6 ARE SENT AS 1
+    return field + bytes([0x60 | (int(ssid or 0) & 0x0F) << 1 | (1 if last else 0)])
+
+
+def encodeHeader(destination, source, control=UI_CONTROL, pid=NO_LAYER3, path=()):
+    """Address, control and PID bytes of a UI frame sent through the digipeaters in path"""
+    addresses = [destination, source] + list(path)
+    header = bytearray()
+    for i, callsign in enumerate(addresses):
+        header += encodeAddress(callsign.rstrip('*'), last=i == len(addresses) - 1)
+        if i >= 2 and callsign.endswith('*'):
+            header[-1] |= REPEATED
+    return bytes(header) + bytes([control, pid])
+
+
+def sourceCallsign(frame, offset=1):
+    """Source callsign of an unescaped KISS frame (the AX.25 frame starts after the KISS command byte)"""
+    return decodeAddress(frame[offset + ADDRESS_LENGTH:offset + 2 * ADDRESS_LENGTH])
+
+
+class UIFrame:
+    """Header fields of one AX.25 UI frame, info is a memoryview of the received bytes"""
+
+    def __init__(self, destination, source, path, control, pid, info):
+        self.destination = destination
+        self.source = source
+        self.path = path  # DIGIPEATER CALLSIGNS, "*" MARKS THOSE THAT REPEATED THE FRAME
+        self.control = control
+        self.pid = pid
+        self.info = info
+
+    def __repr__(self):
+        return '{}>{}{}: {} bytes'.format(self.source, self.destination,
+                                          ''.join(',' + callsign for callsign in self.path), len(self.info))
+
+
+def parseFrame(frame, offset=1):
+    """UIFrame of an unescaped KISS frame (the AX.25 frame starts after the KISS command byte).
+
+    The information field is a memoryview into frame, nothing after the
+    header is copied. Raises ValueError for frames that are too short, have
+    more than 8 digipeaters or are not UI frames.
+    """
+    view = memoryview(frame)
+    addresses = []
+    end = offset
+    while True:
+        if len(view) < end + ADDRESS_LENGTH:
+            raise ValueError('AX.25 address field is cut short')
+        addresses.append(view[end:end + ADDRESS_LENGTH])
+        end = end + ADDRESS_LENGTH
+        if view[end - 1] & 0x01:
+            break
+        if len(addresses) == 2 + MAX_DIGIPEATERS:
+            raise ValueError('AX.25 frame has more than {} digipeaters'.format(MAX_DIGIPEATERS))
+    if len(addresses) < 2:
+        raise ValueError('AX.25 frame has no source address')
+    if len(view) < end + 2:
+        raise ValueError('AX.25 frame has no control and PID bytes')
+    control = view[end]
+    if control & ~POLL_FINAL != UI_CONTROL:
+        raise ValueError('Not an AX.25 UI frame (control 0x{:02X})'.format(control))
+
+    path = [decodeAddress(field) + ('*' if field[6] & REPEATED else '') for field in addresses[2:]]
+    return UIFrame(decodeAddress(addresses[0]), decodeAddress(addresses[1]), path, control, view[end + 1],
+                   view[end + 2:])
+
+
+class SourceFilter:
+    """Allow-list of source callsigns, checked on the raw address bytes before anything is decoded"""
+
+    def __init__(self, callsigns):
+        self.callsigns = sorted(callsign.upper() for callsign in callsigns)
+        self._keys = {self._key(encodeAddress(callsign)) for callsign in self.callsigns}
+        self.accepted = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _key(field):
+        # CALLSIGN BYTES AND SSID, IGNORING THE RESERVED, H AND LAST-ADDRESS BITS
+        return bytes(field[:6]) + bytes([field[6] & _SSID_MASK])
+
+    def accepts(self, frame, offset=1):
+        """True when the source address of an unescaped frame is on the list"""
+        start = offset + ADDRESS_LENGTH
+        field = frame[start:start + ADDRESS_LENGTH]
+        if len(field) == ADDRESS_LENGTH and self._key(field) in self._keys:
+            self.accepted = self.accepted + 1
+            return True
+        self.rejected = self.rejected + 1
+        return False
@@ -0,0 +1,102 @@
+"""
+KISS DECODE THROUGHPUT BENCHMARK
+DEFRAMES AND UNESCAPES A MULTI-MEGABYTE KISS CAPTURE AND COMPARES IT TO MODEM LINE RATE
+
+run "python -m benchmarks.benchKiss" from the repository root
+run "python -m benchmarks.benchKiss --file capture.kiss" to use a recorded soundmodem capture
+"""
+
+import argparse
+import random
+import time
+
+import kissProtocol as kiss
+
+MODEM_BAUD = 9600  # FASTEST HS SOUNDMODEM MODE IN USE
+FRAME_LENGTH = 104  # UNESCAPED KISS FRAME WITHOUT FENDS
+
+
+def makeCapture(size, seed=0):
+    """Build a synthetic capture of back-to-back frames with random payloads"""
+    rng = random.Random(seed)
+    frames = []
+    total = 0
+    while total < size:
+        frame = kiss.encodeFrame(rng.randbytes(FRAME_LENGTH - 1))
+        frames.append(frame)
+        total = total + len(frame)
+    return b''.join(frames)
+
+
+def decodeCapture(capture, readSize=kiss.RECV_SIZE):
+    """Deframe and unescape the capture in socket-sized reads"""
+    deframer = kiss.KISSDeframer()
+    view = memoryview(capture)
+    count = 0
+    for start in range(0, len(capture), readSize):
+        for frame in deframer.feed(view[start:start + readSize].tobytes()):
+            kiss.unescape(frame)
+            count = count + 1
+    return count
+
+
+def decodeCaptureHex(capture):
+    """Previous receiver approach: hex string, split('DBDD') and split('C000') joins"""
+    count = 0
+    for frame in capture.split(bytes([kiss.FEND])):
+        if not frame:
+            continue
+        DATA_PACKET_KISS = frame.hex().upper()
+        DATA_PACKET_DBDD = ''
+        DATA_PACKET_KISS = DATA_PACKET_KISS.split('DBDD')
+        for i in range(len(DATA_PACKET_KISS)):
+            if(i == len(DATA_PACKET_KISS) - 1):
+                DATA_PACKET_DBDD = DATA_PACKET_DBDD + DATA_PACKET_KISS[i]
+                break
+            DATA_PACKET_DBDD = DATA_PACKET_DBDD + DATA_PACKET_KISS[i] + 'DB'
+        DATA_PACKET_C000 = ''
+        DATA_PACKET_DBDD = DATA_PACKET_DBDD.split('C000')
+        for j in range(len(DATA_PACKET_DBDD)):
+            if(j == len(DATA_PACKET_DBDD) - 1):
+                DATA_PACKET_C000 = DATA_PACKET_C000 + DATA_PACKET_DBDD[j]
+                break
+            DATA_PACKET_C000 = DATA_PACKET_C000 + DATA_PACKET_DBDD[j] + 'C0'
+        count = count + 1
+    return count
+
+
+def timeIt(function, capture, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames = function(capture)
+        best = min(best, time.perf_counter() - start)
+    return frames, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--file', help='recorded KISS capture to decode')
+    parser.add_argument('--size', type=float, default=8, help='synthetic capture size in MB')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'rb') as file:
+            capture = file.read()
+    else:
+        capture = makeCapture(int(args.size * 1e6))
+
+    lineRate = MODEM_BAUD / 8
+    megabytes = len(capture) / 1e6
+    print('Capture: {:.2f} MB'.format(megabytes))
+
+    for name, function in (('kissProtocol', decodeCapture), ('hex split/join', decodeCaptureHex)):
+        frames, seconds = timeIt(function, capture, args.repeat)
+        rate = len(capture) / seconds
+        print('{:>15}: {:8d} frames {:8.3f} s {:9.2f} MB/s {:9.0f}x line rate'
+              .format(name, frames, seconds, rate / 1e6, rate / lineRate))
+
+
+if __name__ == '__main__':
+    main()
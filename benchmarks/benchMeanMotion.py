@@ -0,0 +1,78 @@
+"""
+MEAN MOTION CONVERSION MICRO-BENCHMARK
+COMPARES THE OLD CTYPES POINTER-CAST REINTERPRETATION WITH STRUCT AND NUMPY VIEWS
+
+run "python -m benchmarks.benchMeanMotion" from the repository root
+"""
+
+import argparse
+import struct
+import timeit
+from ctypes import *
+
+import numpy as np
+
+import tlePacket
+
+
+# PREVIOUS DECODER: CONVERT HEX TO FLOATING POINT
+def toFloat(s):
+    cp = pointer(c_int(s))
+    fp = cast(cp, POINTER(c_float))
+    str_value = "{:.8f}".format(fp.contents.value)
+    return float(str_value)
+
+
+# PREVIOUS ENCODER: FLOATING POINT CONVERSION TO HEX
+def toInt(s):
+    cp = pointer(c_float(s))
+    fp = cast(cp, POINTER(c_int))
+    return fp.contents.value
+
+
+def report(name, seconds, count):
+    print('{:>32}: {:9.1f} ns/packet'.format(name, seconds / count * 1e9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--packets', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    meanMotion = struct.Struct('>f')
+    packet = tlePacket.encode({
+        'epoch': 23108.95540690, 'derivative': '.00019443', 'drag': '34804-3',
+        'inclination': 51.6391, 'raan': 262.0713, 'eccentricity': '0006099',
+        'argPerigee': 208.3097, 'meanAnomaly': 234.4315, 'meanMotion': 15.49967480,
+    })
+    MM = int.from_bytes(packet[tlePacket.MM_OFFSET:], 'big')
+    number = 100000
+
+    def best(statement):
+        return min(timeit.repeat(statement, number=number, repeat=args.repeat))
+
+    print('Scalar decode ({} calls)'.format(number))
+    report('ctypes pointer cast', best(lambda: toFloat(MM)), number)
+    report('struct.unpack_from', best(lambda: meanMotion.unpack_from(packet, tlePacket.MM_OFFSET)[0]), number)
+
+    print('Scalar encode ({} calls)'.format(number))
+    report('ctypes pointer cast', best(lambda: toInt(15.4996748)), number)
+    report('struct.pack', best(lambda: meanMotion.pack(15.4996748)), number)
+
+    # RANDOM PACKETS CARRYING REALISTIC LEO MEAN MOTIONS
+    rng = np.random.default_rng(0)
+    packets = rng.integers(0, 256, (args.packets, tlePacket.PACKET_LENGTH), dtype=np.uint8)
+    packets[:, tlePacket.MM_OFFSET:] = rng.uniform(11, 17, args.packets).astype('>f4').view(np.uint8).reshape(-1, 4)
+    words = [int.from_bytes(row[tlePacket.MM_OFFSET:].tobytes(), 'big') for row in packets]
+
+    print('Batch decode ({} packets)'.format(args.packets))
+    seconds = min(timeit.repeat(lambda: [toFloat(word) for word in words], number=1, repeat=args.repeat))
+    report('ctypes pointer cast per packet', seconds, args.packets)
+    seconds = min(timeit.repeat(lambda: packets[:, tlePacket.MM_OFFSET:].view('>f4')[:, 0].astype(np.float64),
+                                number=1, repeat=args.repeat))
+    report("ndarray.view('>f4')", seconds, args.packets)
+
+
+if __name__ == '__main__':
+    main()
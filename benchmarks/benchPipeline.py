@@ -0,0 +1,217 @@
+"""
+RECEIVE PIPELINE THROUGHPUT BENCHMARK
+SERVES SYNTHETIC KISS/AX.25 TLE FRAMES FROM A kissReplay STAND-IN AT FIXED RATES AND RECEIVES THEM
+WITH THE groundStationCore PATH OF groundStationSW (DEFRAME, ROUTE, ARCHIVE, DECODE, FORMAT, PUBLISH)
+
+RESULTS ARE WRITTEN TO benchmarks/pipelineResults.json AND CHECKED AGAINST benchmarks/pipelineBaseline.json
+
+run "python -m benchmarks.benchPipeline" from the repository root
+run "python -m benchmarks.benchPipeline --rates 500 2000 0 --seconds 5" for other offered rates (0 is unpaced)
+run "python -m benchmarks.benchPipeline --update" to write the measured results as the new baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import groundStationCore
+import kissProtocol as kiss
+import kissReplay
+import satellitePredict
+from packetArchive import PacketArchive
+from pipelineMetrics import PipelineMetrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'pipelineBaseline.json')
+RESULTS_FILE = os.path.join(ROOT, 'benchmarks', 'pipelineResults.json')
+
+RATES = [100, 1000, 5000, 0]  # OFFERED FRAMES PER SECOND, 0 SENDS AS FAST AS THE RECEIVER READS
+KEPT_UP = 0.95  # A RATE IS SUSTAINED WHEN THE RECEIVER TAKES AT LEAST 95% OF IT
+SLACK = 1.5  # THROUGHPUT MAY BE UP TO 1.5x LOWER THAN THE BASELINE BEFORE IT COUNTS AS A REGRESSION
+TIMEOUT = 30.0  # SECONDS A RUN MAY TAKE BEYOND ITS IDEAL DURATION
+
+
+def makeEntries(count, seed=0):
+    """Distinct DIWATA-2B and ISS TLEs with random epoch, angles and mean motion"""
+    rng = random.Random(seed)
+    templates = satellitePredict.readTLEFiles([os.path.join(ROOT, 'diwataTLE.txt'), os.path.join(ROOT, 'issTLE.txt')])
+    entries = []
+    for i in range(count):
+        name, line1, line2 = templates[i % len(templates)]
+        epoch = '{:02d}{:012.8f}'.format(rng.randint(10, 99), rng.uniform(1, 366))
+        angles = ['{:8.4f}'.format(rng.uniform(0, 360)) for _ in range(3)]
+        meanMotion = '{:11.8f}'.format(rng.uniform(11, 17))
+        entries.append((name, line1[:18] + epoch + line1[32:],
+                        line2[:17] + angles[0] + line2[25:34] + angles[1] + ' ' + angles[2] + ' ' + meanMotion
+                        + line2[63:]))
+    return entries
+
+
+def makeCapture(entries, frames, callsign):
+    """KISS stream of frames UI frames cycling through the entries, encoded like TLEDataDownloader"""
+    pool = [kissReplay.syntheticCapture([entry], callsign) for entry in entries]
+    return b''.join(pool[i % len(pool)] for i in range(frames))
+
+
+def escapedShare(capture):
+    """Fraction of frames carrying at least one escaped FEND or FESC byte"""
+    frames = [frame for frame in capture.split(bytes([kiss.FEND])) if frame]
+    return sum(1 for frame in frames if kiss.FESC in frame) / len(frames)
+
+
+def serve(captureFile, baud):
+    """kissReplay.py in its own process so it does not share the GIL with the receiver; returns (process, port)"""
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'kissReplay.py'), captureFile,
+                                '--port', '0', '--baud', str(baud)],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    # FIRST LINE IS "Replaying N bytes on HOST:PORT"
+    line = process.stdout.readline()
+    return process, int(line.rsplit(':', 1)[1])
+
+
+async def receive(core, timeout):
+    """Run the core until the stand-in hangs up; returns (seconds from connect to hang-up, timed out)"""
+    modem = core.modems[0]
+    task = asyncio.ensure_future(core.run())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    began = None
+    try:
+        while loop.time() < deadline:
+            await asyncio.sleep(0.001)
+            if began is None and modem.connects:
+                began = time.perf_counter()
+            if modem.connects and not modem.connected:
+                return time.perf_counter() - began, False
+        return time.perf_counter() - (began or 0.0), True
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def runRate(rate, frames, entries, directory, callsign):
+    capture = makeCapture(entries, frames, callsign)
+    captureFile = os.path.join(directory, 'capture.kiss')
+    with open(captureFile, 'wb') as file:
+        file.write(capture)
+    frameBytes = len(capture) / frames
+    baud = round(rate * frameBytes * 10)
+
+    # ONE MODEM AND ONE SATELLITE LIKE groundStationSW WITHOUT A CONFIG FILE, WRITING INTO THE TEMP DIRECTORY
+    tleFile = os.path.join(directory, 'tle.txt')
+    archiveFile = os.path.join(directory, 'archive.bin')
+    for filename in (tleFile, archiveFile, archiveFile + '.idx'):
+        if os.path.exists(filename):
+            os.remove(filename)
+    metrics = PipelineMetrics(os.path.join(directory, 'metrics.json'))
+    process, port = serve(captureFile, baud)
+    try:
+        config = {'modems': [{'name': 'bench', 'host': kiss.HOST, 'port': port}],
+                  'satellites': [dict(groundStationCore.DEFAULT_CONFIG['satellites'][0], tleFile=tleFile)]}
+        with PacketArchive(archiveFile) as archive, open(os.devnull, 'w') as devnull:
+            core = groundStationCore.GroundStationCore.fromConfig(config, archive=archive, metrics=metrics)
+            # THE RECEIVER PRINTS EVERY NEW TLE, KEEP THAT COST BUT NOT THE TERMINAL
+            with contextlib.redirect_stdout(devnull):
+                seconds, timedOut = asyncio.run(receive(core, (frames / rate if rate else 0) + TIMEOUT))
+            core.close()
+    finally:
+        process.terminate()
+        process.wait()
+
+    decoded = sum(decoder.received for decoder in core.decoders.values())
+    snapshot = metrics.snapshot()
+    latency = snapshot['stages']['latency']
+    throughput = decoded / seconds if seconds else 0.0
+    return {
+        'offeredRate': rate,
+        'frames': frames,
+        'escapedFrames': escapedShare(capture),
+        'seconds': seconds,
+        'throughput': throughput,
+        'dropRate': 1 - decoded / frames,
+        'sustained': not timedOut and (rate == 0 or throughput >= KEPT_UP * rate),
+        'latencyP50': latency.get('p50'),
+        'latencyP99': latency.get('p99'),
+        'badFrames': snapshot['counters'].get('badFrames', 0),
+        'timedOut': timedOut,
+    }
+
+
+def compare(results, baseline):
+    """Lines describing throughput and drop regressions against the baseline"""
+    problems = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['throughput'] * SLACK < reference['throughput']:
+            problems.append('{}: throughput {:.0f}/s, baseline {:.0f}/s'.format(key, result['throughput'],
+                                                                                reference['throughput']))
+        if result['dropRate'] > reference['dropRate']:
+            problems.append('{}: drop rate {:.2%}, baseline {:.2%}'.format(key, result['dropRate'],
+                                                                          reference['dropRate']))
+        if reference['sustained'] and not result['sustained']:
+            problems.append('{}: offered rate no longer sustained'.format(key))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rates', type=int, nargs='+', default=RATES, help='offered frames per second, 0 for unpaced')
+    parser.add_argument('--seconds', type=float, default=2.0, help='length of each paced run')
+    parser.add_argument('--frames', type=int, default=20000, help='frames of the unpaced run')
+    parser.add_argument('--satellites', type=int, default=1000, help='distinct TLEs cycled through the capture')
+    parser.add_argument('--callsign', default=kissReplay.CALLSIGN)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per rate, the fastest is kept')
+    parser.add_argument('--output', default=RESULTS_FILE, help='machine-readable results (default: %(default)s)')
+    parser.add_argument('--update', action='store_true', help='write the measured results as the new baseline')
+    args = parser.parse_args(argv)
+
+    entries = makeEntries(args.satellites)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for rate in args.rates:
+            frames = max(1, round(rate * args.seconds)) if rate else args.frames
+            key = str(rate) if rate else 'unpaced'
+            # BEST OF N, A BUSY MACHINE ONLY EVER MAKES A RUN SLOWER
+            result = max((runRate(rate, frames, entries, directory, args.callsign) for _ in range(args.repeat)),
+                         key=lambda result: result['throughput'])
+            results[key] = result
+            print('{:>8} offered: {:6d} frames {:7.2f} s {:9.0f} frames/s  drop {:6.2%}  '
+                  'latency p50 {:7.1f} us p99 {:7.1f} us  {}'.format(
+                      key, frames, result['seconds'], result['throughput'], result['dropRate'],
+                      (result['latencyP50'] or 0) * 1e6, (result['latencyP99'] or 0) * 1e6,
+                      'sustained' if result['sustained'] else 'FELL BEHIND'))
+
+    with open(args.output, 'w') as file:
+        json.dump({'python': sys.version.split()[0], 'time': time.time(), 'results': results},
+                  file, indent=4, sort_keys=True)
+        file.write('\n')
+    print('Results written to {}'.format(args.output))
+
+    if args.update:
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+            file.write('\n')
+        print('Baseline written to {}'.format(BASELINE_FILE))
+        return 0
+
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as file:
+            problems = compare(results, json.load(file))
+        for problem in problems:
+            print('REGRESSION {}'.format(problem))
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
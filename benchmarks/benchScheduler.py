@@ -0,0 +1,76 @@
+"""
+PASS SCHEDULER SCALING BENCHMARK
+TIMES ONE DAY OF PASS PREDICTION FOR 1K AND 10K SATELLITES WITH 1 .. N WORKER PROCESSES
+
+run "python -m benchmarks.benchScheduler" from the repository root
+run "python -m benchmarks.benchScheduler --catalog" to sample the cached CelesTrak active catalog instead
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import passScheduler
+import satellitePredict
+from catalogStore import CatalogStore
+
+SIZES = [1000, 10000]
+START = datetime(2023, 4, 19, tzinfo=timezone.utc)  # EPOCH OF issTLE.txt
+
+
+def makeConstellation(count, seed=0):
+    """Copies of the ISS TLE spread over random RAAN and mean anomaly (checksums are not kept)"""
+    rng = random.Random(seed)
+    name, line1, line2 = satellitePredict.readTLEFiles(['issTLE.txt'])[0]
+    entries = []
+    for i in range(count):
+        raan = '{:8.4f}'.format(rng.uniform(0, 360))
+        meanAnomaly = '{:8.4f}'.format(rng.uniform(0, 360))
+        entries.append(('SAT-{}'.format(i), line1, line2[:17] + raan + line2[25:43] + meanAnomaly + line2[51:]))
+    return entries
+
+
+def workerCounts(maximum):
+    counts = [1]
+    while counts[-1] * 2 <= maximum:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != maximum:
+        counts.append(maximum)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pass scheduler scaling across worker processes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='satellite counts (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='largest worker count (default: all cores)')
+    parser.add_argument('--hours', type=float, default=satellitePredict.HOURS, help='prediction window (default: %(default)s)')
+    parser.add_argument('--catalog', action='store_true', help='sample the cached CelesTrak catalog, predicting from now')
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        catalog = CatalogStore().load().entries
+        start = datetime.now(timezone.utc)
+    else:
+        start = START
+    print('{} cores'.format(os.cpu_count()))
+    print('{:>10} {:>8} {:>10} {:>10} {:>8}'.format('satellites', 'workers', 'seconds', 'passes', 'speedup'))
+    for size in args.sizes:
+        if args.catalog:
+            entries = random.Random(0).sample(catalog, min(size, len(catalog)))
+        else:
+            entries = makeConstellation(size)
+        baseline = None
+        for workers in workerCounts(args.workers):
+            begin = time.perf_counter()
+            table = passScheduler.schedulePasses(entries, start=start, workers=workers, hours=args.hours)
+            passScheduler.markConflicts(table)
+            elapsed = time.perf_counter() - begin
+            if baseline is None:
+                baseline = elapsed
+            print('{:>10} {:>8} {:>10.2f} {:>10} {:>7.2f}x'.format(len(entries), workers, elapsed, len(table), baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+STARTUP IMPORT-TIME BENCHMARK
+PROFILES EACH ENTRY SCRIPT WITH "python -X importtime" AND CHECKS IT AGAINST benchmarks/startupBudget.json
+
+run "python -m benchmarks.benchStartup" from the repository root
+run "python -m benchmarks.benchStartup --update" to write the measured times as the new budget
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startupBudget.json')
+
+# ENTRY SCRIPT -> HEAVY MODULES THAT MUST NOT BE IMPORTED JUST BY STARTING IT
+SCRIPTS = {
+    'packetDecoder': ['numpy', 'requests', 'tkinter'],
+    'TLEDataDownloader': ['numpy', 'requests', 'tkinter'],
+    'groundStationSW': ['numpy', 'requests'],
+}
+
+SLACK = 1.5  # A RUN MAY TAKE UP TO 50% LONGER THAN THE BUDGET BEFORE IT COUNTS AS A REGRESSION
+
+
+def profile(module, repeat):
+    """Best-of-N cumulative import time in microseconds, heaviest imports and loaded modules"""
+    # ONLY IMPORT THE MODULE, main() IS GUARDED BY __name__ SO NOTHING RUNS
+    code = 'import sys, {0}; print(" ".join(sorted(sys.modules)))'.format(module)
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, [], set(), result.stderr.strip().splitlines()[-1]
+
+        # LINES LOOK LIKE "import time:   self [us] | cumulative | imported package"
+        # CHILDREN ARE PRINTED BEFORE THEIR PARENT, ONE EXTRA SPACE OF INDENT PER LEVEL
+        times = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            name = name.rstrip()
+            if name.strip() == module and name[1] != ' ':
+                total = int(cumulative)
+                break
+            if name[1] != ' ':
+                times = []  # A PREVIOUS TOP-LEVEL IMPORT, E.G. site, IS NOT PART OF THE SCRIPT
+            else:
+                times.append((int(cumulative), name))
+        if best is None or total < best[0]:
+            best = (total, times, set(result.stdout.split()))
+
+    total, times, loaded = best
+    heaviest = sorted(times, reverse=True)
+    return total, heaviest, loaded, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import-time startup budget for the executable entry scripts')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per script, the fastest is kept')
+    parser.add_argument('--top', type=int, default=5, help='heaviest imports listed per script')
+    parser.add_argument('--update', action='store_true', help='write the measured times as the new budget')
+    args = parser.parse_args(argv)
+
+    budget = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE) as file:
+            budget = json.load(file)
+
+    failed = False
+    measured = {}
+    for module, forbidden in SCRIPTS.items():
+        total, heaviest, loaded, error = profile(module, args.repeat)
+        if error is not None:
+            # E.G. mttkinter IS NOT INSTALLED ON THIS MACHINE
+            print('{:<20} skipped: {}'.format(module, error))
+            continue
+        measured[module] = total
+
+        limit = budget.get(module)
+        status = ''
+        if limit is not None:
+            status = 'budget {:8.1f} ms'.format(limit / 1000)
+            if total > limit * SLACK:
+                status += '  REGRESSION'
+                failed = True
+        print('{:<20} {:8.1f} ms  {}'.format(module, total / 1000, status))
+        for cumulative, name in heaviest[:args.top]:
+            print('    {:8.1f} ms  {}'.format(cumulative / 1000, name.strip()))
+
+        eager = [name for name in forbidden if name in loaded]
+        if eager:
+            print('    imported at startup: {}'.format(', '.join(eager)))
+            failed = True
+
+    if args.update:
+        budget.update(measured)
+        with open(BUDGET_FILE, 'w') as file:
+            json.dump(budget, file, indent=4, sort_keys=True)
+            file.write('\n')
+        print('Budget written to {}'.format(BUDGET_FILE))
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
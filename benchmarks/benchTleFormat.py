@@ -0,0 +1,113 @@
+"""
+TLE LINE FORMATTING BENCHMARK
+COMPARES THE OLD insertData STRING SPLICING WITH THE tleFormat TEMPLATE AND BATCH FORMATTERS
+
+run "python -m benchmarks.benchTleFormat" from the repository root
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+import tleFormat
+import tlePacket
+
+
+# PREVIOUS FORMATTER: SPLICE EVERY FIELD INTO A STRING OF SPACES, THEN WALK IT FOR THE CHECKSUM
+def insertData(string, data, index):
+    return string[:index] + data + string[index:]
+
+
+def checkSum(digit):
+    checksum = 0
+    for x in digit:
+        if x == '-':
+            checksum = checksum + 1
+        if x.isdigit():
+            checksum = checksum + int(x)
+    return checksum%10
+
+
+def buildTLE(tle):
+    TLE_LINE1 = '1                                                                   '
+    TLE_LINE1 = insertData(TLE_LINE1, '43678', 2)
+    TLE_LINE1 = insertData(TLE_LINE1, 'U', 7)
+    TLE_LINE1 = insertData(TLE_LINE1, '18084', 9)
+    TLE_LINE1 = insertData(TLE_LINE1, 'H', 14)
+    TLE_LINE1 = insertData(TLE_LINE1, tle['epoch'], 18)
+    if tle['derivative'][0] == '-':
+        TLE_LINE1 = insertData(TLE_LINE1, tle['derivative'], 33)
+    else:
+        TLE_LINE1 = insertData(TLE_LINE1, tle['derivative'], 34)
+    TLE_LINE1 = insertData(TLE_LINE1, '00000+0', 45)
+    if tle['drag'][0] == '-':
+        TLE_LINE1 = insertData(TLE_LINE1, tle['drag'], 53)
+    else:
+        TLE_LINE1 = insertData(TLE_LINE1, tle['drag'], 54)
+    TLE_LINE1 = insertData(TLE_LINE1, '0', 62)
+    TLE_LINE1 = insertData(TLE_LINE1, '999', 65)
+    TLE_LINE1 = insertData(TLE_LINE1, str(checkSum(TLE_LINE1)), 68)
+
+    TLE_LINE2 = '2                                                                   '
+    TLE_LINE2 = insertData(TLE_LINE2, '43678', 2)
+    TLE_LINE2 = insertData(TLE_LINE2, tle['inclination'], 8 + 3 - len(tle['inclination'].split(".")[0]))
+    TLE_LINE2 = insertData(TLE_LINE2, tle['raan'], 17 + 3 - len(tle['raan'].split(".")[0]))
+    TLE_LINE2 = insertData(TLE_LINE2, tle['eccentricity'][2:], 26)
+    TLE_LINE2 = insertData(TLE_LINE2, tle['argPerigee'], 34 + 3 - len(tle['argPerigee'].split(".")[0]))
+    TLE_LINE2 = insertData(TLE_LINE2, tle['meanAnomaly'], 43 + 3 - len(tle['meanAnomaly'].split(".")[0]))
+    TLE_LINE2 = insertData(TLE_LINE2, tle['meanMotion'], 52 + 2 - len(tle['meanMotion'].split(".")[0]))
+    TLE_LINE2 = insertData(TLE_LINE2, '4801', 64)
+    TLE_LINE2 = insertData(TLE_LINE2, str(checkSum(TLE_LINE2)), 68)
+
+    return 'DIWATA-2B' + '\n' + TLE_LINE1.rstrip() + '\n' + TLE_LINE2.rstrip()
+
+
+def report(name, seconds, count):
+    print('{:>36}: {:9.1f} ns/TLE'.format(name, seconds / count * 1e9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--packets', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # RANDOM LEO ELEMENTS WITH EPOCHS IN 2010-2099, SEE tleFormat.LINE1 FOR YEARS 2000-2009
+    rng = np.random.default_rng(0)
+    count = args.packets
+    packets = tlePacket.encodeBatch({
+        'epoch': rng.integers(10, 99, count) * 1000 + rng.uniform(1, 366, count),
+        'derivative': rng.uniform(-1e-3, 1e-3, count),
+        'drag': rng.uniform(-1e-3, 1e-3, count),
+        'inclination': rng.uniform(0, 180, count),
+        'raan': rng.uniform(0, 360, count),
+        'eccentricity': rng.uniform(0, 0.1, count),
+        'argPerigee': rng.uniform(0, 360, count),
+        'meanAnomaly': rng.uniform(0, 360, count),
+        'meanMotion': rng.uniform(11, 17, count),
+    })
+    tles = [tlePacket.decode(packet.tobytes()) for packet in packets]
+
+    # ALL THREE MUST AGREE BEFORE ANY OF THEM IS TIMED
+    old = [buildTLE(tle) for tle in tles]
+    if old != [tleFormat.formatTLE(tle) for tle in tles] or old != tleFormat.formatPackets(packets):
+        raise SystemExit('Formatters disagree')
+
+    def best(function):
+        return min(timeit.repeat(function, number=1, repeat=args.repeat))
+
+    print('Format decoded fields ({} TLEs)'.format(count))
+    report('insertData + checkSum', best(lambda: [buildTLE(tle) for tle in tles]), count)
+    report('tleFormat.formatTLE', best(lambda: [tleFormat.formatTLE(tle) for tle in tles]), count)
+
+    print('Packets to TLE text ({} packets)'.format(count))
+    report('tlePacket.decode + insertData', best(lambda: [buildTLE(tlePacket.decode(packet)) for packet in
+                                                          map(bytes, packets)]), count)
+    report('tlePacket.decode + formatTLE', best(lambda: [tleFormat.formatTLE(tlePacket.decode(packet)) for packet in
+                                                         map(bytes, packets)]), count)
+    report('tleFormat.formatPackets', best(lambda: tleFormat.formatPackets(packets)), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+BulkUplink
+ENCODE TLE PACKETS AND UPLINK COMMANDS FOR A WHOLE LIST OF SATELLITES IN ONE RUN
+
+run "python bulkUplink.py DIWATA-2B 25544 1998-067A" or "python bulkUplink.py --list satellites.txt -o uplink.txt"
+run "python bulkUplink.py --list satellites.txt --changed" to encode only the satellites changed since they were last encoded
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import packetCRC
+import tlePacket
+from catalogStore import CatalogStore, noradNumber
+
+UPLINKED_FILE = 'celestrakUplinked.json'  # BESIDE THE DELTA LOG: NORAD NUMBER -> TIME OF THE DELTA LAST ENCODED
+
+
+def resolve(catalog, keys):
+    """Look every name, NORAD ID or designator up in the catalog; returns (entries, missing keys)"""
+    entries = []
+    missing = []
+    for key in keys:
+        entry = catalog.find(key)
+        if entry is None:
+            missing.append(key)
+        else:
+            entries.append(entry)
+    return entries, missing
+
+
+def changedEntries(catalog, entries):
+    """(entries changed since recordEncoded() last saw them, unchanged entries), see catalogDelta.py.
+
+    Every entry counts as changed when no download has been logged yet.
+    Without a delta log only the download of this run is known.
+    """
+    if catalog.deltaLog is None:
+        if catalog.delta is None:
+            return entries, []
+        norads = catalog.delta.changedNorads()
+        return ([entry for entry in entries if noradNumber(entry[1][2:7]) in norads],
+                [entry for entry in entries if noradNumber(entry[1][2:7]) not in norads])
+
+    changedAt = _changeTimes(catalog)
+    if not changedAt:
+        return entries, []
+    encoded = _readEncoded(catalog)
+    changed = []
+    unchanged = []
+    for entry in entries:
+        norad = str(noradNumber(entry[1][2:7]))
+        if norad in encoded and changedAt.get(norad, 0) <= encoded[norad]:
+            unchanged.append(entry)
+        else:
+            changed.append(entry)
+    return changed, unchanged
+
+
+def recordEncoded(catalog, entries):
+    """Remember that the UL commands of the entries were encoded from the logged catalog as it is now"""
+    if catalog.deltaLog is None:
+        return
+    changedAt = _changeTimes(catalog)
+    if not changedAt:
+        return
+    latest = max(changedAt.values())
+    encoded = _readEncoded(catalog)
+    for entry in entries:
+        encoded[str(noradNumber(entry[1][2:7]))] = latest
+    # WRITE THE WHOLE FILE BESIDE THE OLD ONE AND SWAP IT IN
+    filename = _encodedFile(catalog)
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(filename) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(encoded, file)
+    os.replace(temporary, filename)
+
+
+def _changeTimes(catalog):
+    # NORAD NUMBER -> TIME OF THE LAST LOGGED DELTA THAT ADDED OR UPDATED IT
+    import catalogDelta
+    changedAt = {}
+    for delta in catalogDelta.DeltaLog(catalog.deltaLog).deltas():
+        for norad in delta.changedNorads():
+            changedAt[str(norad)] = delta.timestamp
+    return changedAt
+
+
+def _encodedFile(catalog):
+    return os.path.join(os.path.dirname(catalog.deltaLog), UPLINKED_FILE)
+
+
+def _readEncoded(catalog):
+    filename = _encodedFile(catalog)
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as file:
+        return json.load(file)
+
+
+def encodeEntries(entries):
+    """Encode (name, line1, line2) entries into packets in one vectorized call.
+
+    Returns (valid entries, N x 32 packet array of them, invalid entries);
+    entries whose lines break the TLE column layout or checksums, or whose
+    values do not fit the packet (e.g. a drag term with a positive
+    exponent), are never encoded.
+    """
+    import catalogReader
+    table = catalogReader.readEntries(entries)
+    valid = table['valid'].copy()
+    encoded = valid[valid]
+    packets = tlePacket.encodeBatch({key: column[valid] for key, column in table.items()}, encoded)
+    valid[valid] = encoded
+    return ([entry for entry, ok in zip(entries, valid) if ok], packets[encoded],
+            [entry for entry, ok in zip(entries, valid) if not ok])
+
+
+def uplink(catalog, keys, output, crc=False, changed=False):
+    """Look the keys up, encode them and write their UL commands to the output stream; returns the exit status.
+
+    Satellites not found, unchanged since they were last encoded (with
+    changed) or failing encodeEntries() are reported on stderr, and the
+    status is 1 when any key was not found or skipped.
+    """
+    entries, missing = resolve(catalog, keys)
+    for key in missing:
+        print('Satellite not found: {}'.format(key), file=sys.stderr)
+    if changed:
+        entries, unchanged = changedEntries(catalog, entries)
+        for name, _, _ in unchanged:
+            print('Unchanged since last encoded: {}'.format(name), file=sys.stderr)
+    entries, packets, invalid = encodeEntries(entries)
+    for name, _, _ in invalid:
+        print('Skipped: {} fails the TLE checks or does not fit the packet'.format(name), file=sys.stderr)
+
+    if entries:
+        output.write(formatCommands(entries, packets, crc))
+    recordEncoded(catalog, entries)
+    return 1 if missing or invalid else 0
+
+
+def formatCommands(entries, packets, crc=False):
+    """Text block per satellite: TLE, encoded packet, UL CMD 1-4 and the DL command.
+
+    With crc, the packet is shown with its CRC-16 trailer (see packetCRC.py)
+    and the trailer follows the UL commands as its own spaced-hex line.
+    """
+    trailers = packetCRC.crcBatch(packets) if crc else [None] * len(packets)
+    blocks = []
+    for (name, line1, line2), packet, commands, trailer in zip(entries, packets, tlePacket.uplinkCommandsBatch(packets),
+                                                                trailers):
+        packetHex = packet.tobytes().hex()
+        if trailer is not None:
+            packetHex = packetHex + '{:04x}'.format(trailer)
+        lines = [name, line1, line2, '0x' + packetHex]
+        lines.extend('UL CMD {} = {}'.format(i + 1, command) for i, command in enumerate(commands))
+        if trailer is not None:
+            lines.append('UL CRC = {}'.format(uplinkCRC(trailer)))
+        lines.append('DL COMMAND = {}'.format(tlePacket.DOWNLINK_COMMAND))
+        blocks.append('\n'.join(lines) + '\n')
+    return '\n'.join(blocks)
+
+
+def uplinkCRC(trailer):
+    """CRC-16 trailer as spaced hex like the UL commands"""
+    return int(trailer).to_bytes(packetCRC.CRC_LENGTH, 'big').hex(' ').upper()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Encode uplink commands for several satellites at once')
+    parser.add_argument('satellites', nargs='*', help='satellite names, NORAD IDs or international designators')
+    parser.add_argument('--list', help='file with one satellite per line')
+    parser.add_argument('-o', '--output', help='write the commands to this file instead of stdout')
+    parser.add_argument('--crc', action='store_true', help='add the CRC-16 trailer of every packet')
+    parser.add_argument('--changed', action='store_true', help='skip satellites not changed since they were last encoded')
+    args = parser.parse_args(argv)
+
+    keys = list(args.satellites)
+    if args.list:
+        with open(args.list) as file:
+            keys.extend(line.strip() for line in file if line.strip() and not line.startswith('#'))
+    if not keys:
+        parser.error('no satellites given')
+
+    catalog = CatalogStore().load()
+    if not args.output:
+        return uplink(catalog, keys, sys.stdout, args.crc, args.changed)
+    with open(args.output, 'w') as file:
+        return uplink(catalog, keys, file, args.crc, args.changed)
+
+if __name__ == '__main__':
+    sys.exit(main())
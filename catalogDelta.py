@@ -0,0 +1,193 @@
+"""
+CatalogDelta
+SNAPSHOT-TO-SNAPSHOT CHANGES OF THE CELESTRAK CATALOG, KEYED BY NORAD NUMBER AND ELEMENT-SET EPOCH
+
+EVERY CATALOG DOWNLOAD BY catalogStore APPENDS ONE DELTA (ADDED, UPDATED, RENAMED AND REMOVED SATELLITES)
+TO A GZIP JSON-LINES LOG; THE FIRST DELTA HOLDS THE WHOLE SNAPSHOT, SO REPLAYING THE LOG REBUILDS THE
+CATALOG AS IT WAS AFTER ANY DOWNLOAD
+
+run "python catalogDelta.py" to list the logged downloads
+run "python catalogDelta.py --norad 43678" to list the element-set epochs logged for one satellite
+run "python catalogDelta.py --at 2024-07-25T06:00 -o snapshot.txt" to rebuild the catalog of that time
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from catalogStore import DELTA_LOG, noradNumber
+
+
+def epochKey(line1):
+    """Element-set epoch of a TLE line 1, e.g. 23108.95540690"""
+    return line1[18:32].strip()
+
+
+class CatalogDelta:
+    """Changes from one catalog snapshot to the next; entries are (name, line1, line2)"""
+
+    def __init__(self, added=(), updated=(), renamed=(), removed=(), timestamp=None):
+        self.added = list(added)  # NEW NORAD NUMBERS
+        self.updated = list(updated)  # NEW ELEMENT SET (EPOCH OR ELEMENTS CHANGED)
+        self.renamed = list(renamed)  # SAME ELEMENT SET, NEW NAME
+        self.removed = sorted(removed)  # NORAD NUMBERS NO LONGER IN THE CATALOG
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def changed(self):
+        """Entries whose packets and UL commands must be encoded again"""
+        return self.added + self.updated
+
+    def changedNorads(self):
+        return {noradNumber(line1[2:7]) for _, line1, _ in self.changed()}
+
+    def empty(self):
+        return not (self.added or self.updated or self.renamed or self.removed)
+
+    def summary(self):
+        return '{} added, {} updated, {} renamed, {} removed'.format(
+            len(self.added), len(self.updated), len(self.renamed), len(self.removed))
+
+    def toRecord(self):
+        return {'time': self.timestamp, 'added': self.added, 'updated': self.updated, 'renamed': self.renamed,
+                'removed': self.removed}
+
+    @classmethod
+    def fromRecord(cls, record):
+        return cls([tuple(entry) for entry in record['added']], [tuple(entry) for entry in record['updated']],
+                   [tuple(entry) for entry in record['renamed']], record['removed'], record['time'])
+
+
+def computeDelta(old, new, timestamp=None):
+    """CatalogDelta from snapshot old to snapshot new, both dicts of NORAD number -> entry"""
+    added, updated, renamed = [], [], []
+    for norad, entry in new.items():
+        previous = old.get(norad)
+        if previous is None:
+            added.append(entry)
+        elif previous[1:] != entry[1:]:
+            updated.append(entry)
+        elif previous[0] != entry[0]:
+            renamed.append(entry)
+    removed = [norad for norad in old if norad not in new]
+    return CatalogDelta(added, updated, renamed, removed, timestamp)
+
+
+def applyDelta(snapshot, delta):
+    """Snapshot dict (NORAD number -> entry) after the delta, the given dict is not changed"""
+    snapshot = dict(snapshot)
+    for norad in delta.removed:
+        snapshot.pop(norad, None)
+    for entry in delta.added + delta.updated + delta.renamed:
+        snapshot[noradNumber(entry[1][2:7])] = entry
+    return snapshot
+
+
+def formatSnapshot(snapshot):
+    """3-line catalog text of a snapshot, in NORAD order"""
+    return ''.join('{}\n{}\n{}\n'.format(*snapshot[norad]) for norad in sorted(snapshot))
+
+
+class DeltaLog:
+    """Append-only gzip log of catalog deltas, one JSON line (and gzip member) per download"""
+
+    def __init__(self, filename=DELTA_LOG):
+        self.filename = filename
+
+    def exists(self):
+        return os.path.exists(self.filename) and os.path.getsize(self.filename) > 0
+
+    def append(self, delta):
+        # EACH APPEND ADDS A COMPLETE GZIP MEMBER, READERS SEE THE MEMBERS AS ONE STREAM
+        with gzip.open(self.filename, 'at') as file:
+            file.write(json.dumps(delta.toRecord(), separators=(',', ':')) + '\n')
+
+    def deltas(self):
+        """Every logged delta, oldest first"""
+        if not self.exists():
+            return
+        with gzip.open(self.filename, 'rt') as file:
+            for line in file:
+                yield CatalogDelta.fromRecord(json.loads(line))
+
+    def latest(self):
+        """The last logged delta, None for an empty log"""
+        delta = None
+        for delta in self.deltas():
+            pass
+        return delta
+
+    def history(self, norad):
+        """(download time, element-set epoch) of every logged element set of one satellite"""
+        history = []
+        for delta in self.deltas():
+            for _, line1, _ in delta.changed():
+                if noradNumber(line1[2:7]) == norad:
+                    history.append((delta.timestamp, epochKey(line1)))
+        return history
+
+    def snapshot(self, at=None):
+        """(snapshot dict, download time) as of UNIX time at, the latest snapshot when at is None"""
+        snapshot = {}
+        timestamp = None
+        for delta in self.deltas():
+            if at is not None and delta.timestamp > at:
+                break
+            snapshot = applyDelta(snapshot, delta)
+            timestamp = delta.timestamp
+        return snapshot, timestamp
+
+
+def _parseTime(text):
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _formatTime(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List catalog deltas or rebuild a past catalog snapshot')
+    parser.add_argument('--log', default=DELTA_LOG, help='delta log (default: %(default)s)')
+    parser.add_argument('--at', type=_parseTime, help='UTC time of the snapshot to rebuild, e.g. 2024-07-25T06:00')
+    parser.add_argument('--norad', type=int, help='list the logged element-set epochs of one satellite')
+    parser.add_argument('-o', '--output', help='write the rebuilt catalog to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    log = DeltaLog(args.log)
+    if not log.exists():
+        print('No catalog deltas logged in {}'.format(args.log), file=sys.stderr)
+        return 1
+
+    if args.norad is not None:
+        for timestamp, epoch in log.history(args.norad):
+            print('{} UTC  epoch {}'.format(_formatTime(timestamp), epoch))
+        return 0
+
+    if args.at is None and args.output is None:
+        for delta in log.deltas():
+            print('{} UTC  {}'.format(_formatTime(delta.timestamp), delta.summary()))
+        return 0
+
+    snapshot, timestamp = log.snapshot(args.at)
+    if timestamp is None:
+        print('No catalog downloaded before that time', file=sys.stderr)
+        return 1
+    text = formatSnapshot(snapshot)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text)
+        print('{} satellites as downloaded at {} UTC'.format(len(snapshot), _formatTime(timestamp)))
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+CatalogReader
+VECTORIZED FIXED-COLUMN READER FOR WHOLE TLE CATALOGS
+
+THE CATALOG TEXT IS LOADED INTO ONE N x 69 uint8 ARRAY OF LINES; EVERY COLUMN OF EVERY SATELLITE
+IS CHECKED AGAINST THE TLE LAYOUT AND CONVERTED WITH INTEGER ARITHMETIC, CHECKSUMS ARE VERIFIED IN BULK
+
+run "python catalogReader.py" for a summary of the cached CelesTrak catalog
+run "python catalogReader.py catalog.txt --invalid" to list the entries failing the layout or checksum
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+import tleFormat
+
+LINE_LENGTH = tleFormat.LINE_LENGTH
+MIN_LINE_LENGTH = 64  # SHORTER LINE 1S ARE NOT TLES, SAME AS catalogStore.parseCatalog
+
+# COLUMN LAYOUT OF BOTH LINES, ONE CHARACTER CLASS PER COLUMN:
+# D DIGIT OR SPACE, N NORAD DIGIT OR ALPHA-5 LETTER, A ANY PRINTABLE, S SIGN (SPACE, + OR -), C CHECKSUM DIGIT
+# ANY OTHER CHARACTER MUST APPEAR LITERALLY
+LAYOUT1 = '1 NNNNNA AAAAAAAA DDDDD.DDDDDDDD S.DDDDDDDD SDDDDDSD SDDDDDSD D DDDDC'
+LAYOUT2 = '2 NNNNN DDD.DDDD DDD.DDDD DDDDDDD DDD.DDDD DDD.DDDD DD.DDDDDDDDDDDDDC'
+
+
+def _characterClasses():
+    # 256-ENTRY MEMBERSHIP TABLE PER CHARACTER CLASS
+    classes = {
+        'D': b'0123456789 ',
+        'N': b'0123456789 ABCDEFGHJKLMNPQRSTUVWXYZ',
+        'A': bytes(range(32, 127)),
+        'S': b' +-',
+        'C': b'0123456789',
+    }
+    tables = {}
+    for name, members in classes.items():
+        table = np.zeros(256, dtype=bool)
+        table[np.frombuffer(members, dtype=np.uint8)] = True
+        tables[name] = table
+    return tables
+
+
+def _layoutTable(layout, classes):
+    # LINE_LENGTH x 256 TABLE: IS BYTE b ALLOWED IN COLUMN i
+    if len(layout) != LINE_LENGTH:
+        raise ValueError('Layout must be {} columns'.format(LINE_LENGTH))
+    table = np.zeros((LINE_LENGTH, 256), dtype=bool)
+    for column, ch in enumerate(layout):
+        if ch in classes:
+            table[column] = classes[ch]
+        else:
+            table[column, ord(ch)] = True
+    return table
+
+
+_CLASSES = _characterClasses()
+_LAYOUT1 = _layoutTable(LAYOUT1, _CLASSES)
+_LAYOUT2 = _layoutTable(LAYOUT2, _CLASSES)
+_COLUMN_OFFSETS = (np.arange(LINE_LENGTH) * 256).astype(np.uint16)  # ROW STARTS IN THE FLATTENED LAYOUT TABLES
+_DIGIT_VALUES = np.zeros(256)  # SPACES, NUL AND PUNCTUATION ARE 0; FLOAT SUMS STAY EXACT BELOW 2**53
+_DIGIT_VALUES[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+
+# ALPHA-5 NORAD NUMBERS: A=10 ... Z=33 SKIPPING I AND O IN THE FIRST COLUMN
+_NORAD_LEADING = np.zeros(256, dtype=np.int64)
+_NORAD_LEADING[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+_NORAD_LEADING[np.frombuffer(b'ABCDEFGHJKLMNPQRSTUVWXYZ', dtype=np.uint8)] = np.arange(10, 34)
+
+
+def asLineArray(lines):
+    """N x 69 uint8 array of byte strings; short lines are padded with NUL, long ones cut"""
+    array = np.array(lines, dtype='S{}'.format(LINE_LENGTH))
+    return array.view(np.uint8).reshape(-1, LINE_LENGTH)
+
+
+def _layoutOk(lines, table):
+    # EVERY COLUMN OF EVERY LINE AGAINST ITS CHARACTER CLASS IN ONE LOOKUP
+    return table.ravel()[lines + _COLUMN_OFFSETS].all(axis=1)
+
+
+def _checkSums(lines, values):
+    # TLE CHECKSUMS FROM THE DIGIT VALUES ALREADY LOOKED UP, SEE tleFormat.checkSums
+    return (values[:, :68].sum(axis=1) + np.count_nonzero(lines[:, :68] == ord('-'), axis=1)) % 10
+
+
+def _digits(values, layout, start, end):
+    # INTEGER VALUE OF THE DIGIT COLUMNS OF layout IN start..end-1, A SPACE COUNTS AS A LEADING ZERO
+    isDigit = np.array([ch in 'DNC' for ch in layout[start:end]])
+    weights = np.where(isDigit, 10.0 ** (np.cumsum(isDigit[::-1])[::-1] - isDigit), 0.0)
+    return values[:, start:end] @ weights
+
+
+def _fixed(values, layout, start, end, decimals):
+    # FIXED-POINT FIELD WITH decimals DIGITS AFTER ITS POINT, CORRECTLY ROUNDED LIKE float()
+    return _digits(values, layout, start, end) / float(10 ** decimals)
+
+
+def _exponential(lines, values, sign, exponentSign):
+    # TLE EXPONENT FIELD OF LINE 1: SIGN, 5-DIGIT MANTISSA WITH ASSUMED LEADING POINT, EXPONENT SIGN AND DIGIT
+    mantissa = _digits(values, LAYOUT1, sign + 1, sign + 6)
+    exponent = _digits(values, LAYOUT1, exponentSign + 1, exponentSign + 2)
+    exponent = np.where(lines[:, exponentSign] == ord('-'), -exponent, exponent)
+    # EXACT NUMERATOR AND DENOMINATOR SO THE ONE DIVISION ROUNDS LIKE float('0.34804e-3')
+    value = mantissa * 10.0 ** np.maximum(exponent, 0) / 10.0 ** (5 - np.minimum(exponent, 0))
+    return np.where(lines[:, sign] == ord('-'), -value, value)
+
+
+def _noradNumbers(lines, values):
+    return _NORAD_LEADING[lines[:, 2]] * 10000 + _digits(values, LAYOUT1, 3, 7).astype(np.int64)
+
+
+def _text(lines, start, end):
+    return np.char.strip(np.ascontiguousarray(lines[:, start:end]).view('S{}'.format(end - start))[:, 0]).astype(str)
+
+
+def readLines(line1, line2, names=None):
+    """Columnar table of TLE line pairs (byte strings, or N x 69 uint8 arrays from asLineArray).
+
+    Numeric columns are keyed like tlePacket.decodeBatch(), so the table can
+    be passed to tlePacket.encodeBatch() as is. 'valid' is False where a
+    line breaks the column layout, the checksums fail or the two lines carry
+    different NORAD numbers; values in those rows are best effort.
+    """
+    if not isinstance(line1, np.ndarray):
+        line1 = asLineArray(line1)
+    if not isinstance(line2, np.ndarray):
+        line2 = asLineArray(line2)
+    if line1.shape != line2.shape:
+        raise ValueError('Line 1 and line 2 counts differ')
+
+    layoutOk = _layoutOk(line1, _LAYOUT1) & _layoutOk(line2, _LAYOUT2)
+    values1 = _DIGIT_VALUES[line1]
+    values2 = _DIGIT_VALUES[line2]
+    checksumOk = (_checkSums(line1, values1) == values1[:, 68]) & (_checkSums(line2, values2) == values2[:, 68])
+    norad = _noradNumbers(line1, values1)
+
+    derivative = _fixed(values1, LAYOUT1, 34, 43, 8)
+    table = {
+        'norad': norad,
+        'classification': _text(line1, 7, 8),
+        'designator': _text(line1, 9, 17),
+        'epoch': _fixed(values1, LAYOUT1, 18, 32, 8),
+        'derivative': np.where(line1[:, 33] == ord('-'), -derivative, derivative),
+        'secondDerivative': _exponential(line1, values1, 44, 50),
+        'drag': _exponential(line1, values1, 53, 59),
+        'ephemeris': _digits(values1, LAYOUT1, 62, 63).astype(np.int64),
+        'elementSet': _digits(values1, LAYOUT1, 64, 68).astype(np.int64),
+        'inclination': _fixed(values2, LAYOUT2, 8, 16, 4),
+        'raan': _fixed(values2, LAYOUT2, 17, 25, 4),
+        'eccentricity': _digits(values2, LAYOUT2, 26, 33) / 1e7,
+        'argPerigee': _fixed(values2, LAYOUT2, 34, 42, 4),
+        'meanAnomaly': _fixed(values2, LAYOUT2, 43, 51, 4),
+        'meanMotion': _fixed(values2, LAYOUT2, 52, 63, 8),
+        'revolution': _digits(values2, LAYOUT2, 63, 68).astype(np.int64),
+        'checksumOk': checksumOk,
+        'layoutOk': layoutOk,
+        'valid': layoutOk & checksumOk & (norad == _noradNumbers(line2, values2)),
+    }
+    if names is None:
+        names = np.char.strip(line1[:, 2:7].copy().view('S5')[:, 0]).astype(str)
+    table['name'] = np.asarray(names, dtype=str)
+    return table
+
+
+def readEntries(entries):
+    """Columnar table of (name, line1, line2) entries, e.g. CatalogStore().entries"""
+    return readLines([line1.encode('ascii', 'replace') for _, line1, _ in entries],
+                     [line2.encode('ascii', 'replace') for _, _, line2 in entries],
+                     [name for name, _, _ in entries])
+
+
+def readCatalog(text):
+    """Columnar table of every TLE in catalog text.
+
+    Accepts 3-line (named) and 2-line catalogs with blank lines anywhere,
+    pairing lines the same way as catalogStore.parseCatalog: a line 1 is
+    taken with the line 2 right after it and the name line right before it.
+    """
+    lines = list(filter(None, map(bytes.rstrip, text.encode('ascii', 'replace').splitlines())))
+    if not lines:
+        return readLines(np.zeros((0, LINE_LENGTH), dtype=np.uint8), np.zeros((0, LINE_LENGTH), dtype=np.uint8), [])
+    lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    strings = np.array(lines, dtype='S{}'.format(LINE_LENGTH))
+    array = strings.view(np.uint8).reshape(-1, LINE_LENGTH)
+
+    isLine1 = (array[:, 0] == ord('1')) & (array[:, 1] == ord(' ')) & (lengths >= MIN_LINE_LENGTH)
+    isLine2 = (array[:, 0] == ord('2')) & (array[:, 1] == ord(' '))
+    first = np.flatnonzero(isLine1[:-1] & isLine2[1:])
+    previous = np.maximum(first - 1, 0)
+    named = (first > 0) & ~isLine1[previous] & ~isLine2[previous]
+
+    table = readLines(array[first], array[first + 1])
+    table['name'] = np.where(named, np.char.strip(strings[previous]).astype(str), table['name'])
+    return table
+
+
+def main(argv=None):
+    from catalogStore import CatalogStore
+
+    parser = argparse.ArgumentParser(description='Read and validate a whole TLE catalog')
+    parser.add_argument('catalog', nargs='?', help='catalog text file (default: the cached CelesTrak catalog)')
+    parser.add_argument('--invalid', action='store_true', help='list the entries failing the layout or checksum checks')
+    args = parser.parse_args(argv)
+
+    if args.catalog:
+        with open(args.catalog) as file:
+            text = file.read()
+    else:
+        text = CatalogStore().load().text
+    table = readCatalog(text)
+    count = len(table['name'])
+    print('{} TLEs, {} failing the column layout, {} failing the checksum, {} valid'.format(
+        count, np.count_nonzero(~table['layoutOk']), np.count_nonzero(~table['checksumOk']),
+        np.count_nonzero(table['valid'])))
+    if count:
+        print('epochs {:.8f} to {:.8f}, mean motion {:.2f} to {:.2f} rev/day'.format(
+            table['epoch'].min(), table['epoch'].max(), table['meanMotion'].min(), table['meanMotion'].max()))
+    if args.invalid:
+        for i in np.flatnonzero(~table['valid']):
+            print('{:>6} {}'.format(table['norad'][i], table['name'][i]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
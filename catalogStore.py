@@ -0,0 +1,180 @@
+"""
+CatalogStore
+LOCAL CACHE OF THE CELESTRAK ACTIVE CATALOG WITH NAME, NORAD AND DESIGNATOR INDEXES
+"""
+
+import json
+import os
+import re
+import time
+
+CATALOG_URL = "https://celestrak.org/NORAD/elements/gp.php?GROUP=active&FORMAT=tle"
+CACHE_FILE = 'celestrakActive.txt'  # LAST DOWNLOADED SNAPSHOT, META DATA IS KEPT NEXT TO IT AS .json
+DELTA_LOG = 'celestrakDelta.jsonl.gz'  # CHANGES OF EVERY DOWNLOAD, SEE catalogDelta.py
+TTL = 2 * 3600  # CELESTRAK UPDATES GP DATA EVERY 2 HOURS
+TIMEOUT = 30  # SECONDS
+
+_LONG_DESIGNATOR = re.compile(r'^(\d{2})(\d{2})-(\d{3})([A-Z]{1,3})$')
+
+
+def parseCatalog(text):
+    """Split catalog text into (name, line1, line2) entries.
+
+    Works for 3-line (named) and 2-line catalogs and ignores blank lines.
+    Unnamed entries are named after their NORAD catalog number.
+    """
+    entries = []
+    name = None
+    line1 = None
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line:
+            continue
+        if line.startswith('1 ') and len(line) >= 64:
+            line1 = line
+        elif line.startswith('2 ') and line1 is not None:
+            entries.append((name or line1[2:7].strip(), line1, line))
+            name = None
+            line1 = None
+        else:
+            name = line.strip()
+            line1 = None
+    return entries
+
+
+def noradNumber(field):
+    """NORAD catalog number from TLE columns 3-7, including Alpha-5 numbers above 99999"""
+    field = field.strip().upper()
+    if field[:1].isalpha():
+        # ALPHA-5: A=10 ... Z=33 SKIPPING I AND O
+        return (10 + 'ABCDEFGHJKLMNPQRSTUVWXYZ'.index(field[0])) * 10000 + int(field[1:])
+    return int(field)
+
+
+def designatorKey(designator):
+    """Normalise an international designator to the TLE form, e.g. 1998-067A -> 98067A"""
+    designator = designator.strip().upper()
+    match = _LONG_DESIGNATOR.match(designator)
+    if match:
+        designator = match.group(2) + match.group(3) + match.group(4)
+    return designator
+
+
+class CatalogStore:
+    """CelesTrak catalog snapshot kept on disk and indexed in memory"""
+
+    def __init__(self, url=CATALOG_URL, cacheFile=CACHE_FILE, ttl=TTL, deltaLog=DELTA_LOG):
+        self.url = url
+        self.cacheFile = cacheFile
+        self.deltaLog = deltaLog  # None KEEPS NO DELTA LOG
+        self.delta = None  # catalogDelta.CatalogDelta OF THE LAST DOWNLOAD IN THIS RUN
+        self.metaFile = os.path.splitext(cacheFile)[0] + '.json'
+        self.ttl = ttl
+        self.text = ''
+        self.meta = {}
+        self.entries = []
+        self.byName = {}
+        self.byNorad = {}
+        self.byDesignator = {}
+
+    def load(self):
+        """Load the snapshot from disk and refresh it when older than the TTL.
+
+        When CelesTrak cannot be reached the last snapshot is used, so the
+        downloader keeps working offline.
+        """
+        if os.path.exists(self.cacheFile):
+            with open(self.cacheFile) as file:
+                self.text = file.read()
+            if os.path.exists(self.metaFile):
+                with open(self.metaFile) as file:
+                    self.meta = json.load(file)
+            self._index()
+        if self.age() > self.ttl:
+            import requests
+            try:
+                self.refresh()
+            except requests.RequestException as error:
+                if not self.entries:
+                    raise
+                print('CelesTrak not reachable, using snapshot from {}: {}'.format(self.retrieved(), error))
+        return self
+
+    def age(self):
+        """Seconds since the snapshot was last confirmed current"""
+        return time.time() - self.meta.get('checked', 0)
+
+    def retrieved(self):
+        return time.strftime("%d/%m/%Y %H:%M:%S", time.localtime(self.meta.get('checked', 0)))
+
+    def refresh(self):
+        """Conditionally download the catalog; True if the snapshot changed"""
+        import requests
+
+        headers = {}
+        if self.entries and 'etag' in self.meta:
+            headers['If-None-Match'] = self.meta['etag']
+        if self.entries and 'modified' in self.meta:
+            headers['If-Modified-Since'] = self.meta['modified']
+
+        response = requests.get(self.url, headers=headers, timeout=TIMEOUT)
+        changed = response.status_code != 304
+        if changed:
+            response.raise_for_status()
+            previous = self.byNorad
+            previousChecked = self.meta.get('checked', 0)
+            self.text = response.text
+            self.meta = {}
+            if 'ETag' in response.headers:
+                self.meta['etag'] = response.headers['ETag']
+            if 'Last-Modified' in response.headers:
+                self.meta['modified'] = response.headers['Last-Modified']
+            self._write(self.cacheFile, self.text)
+            self._index()
+            self._logDelta(previous, previousChecked)
+        self.meta['checked'] = time.time()
+        self._write(self.metaFile, json.dumps(self.meta))
+        return changed
+
+    def find(self, key):
+        """Look up an entry by name, NORAD catalog number or international designator"""
+        key = str(key).strip().upper()
+        if key in self.byName:
+            return self.byName[key]
+        if key.isdigit():
+            return self.byNorad.get(int(key))
+        if len(key) == 5 and key[0].isalpha() and key[1:].isdigit() and key[0] not in 'IO':
+            return self.byNorad.get(noradNumber(key))
+        return self.byDesignator.get(designatorKey(key))
+
+    def _index(self):
+        self.entries = parseCatalog(self.text)
+        self.byName = {}
+        self.byNorad = {}
+        self.byDesignator = {}
+        for entry in self.entries:
+            name, line1, line2 = entry
+            self.byName.setdefault(name.upper(), entry)
+            self.byNorad[noradNumber(line1[2:7])] = entry
+            designator = line1[9:17].strip()
+            if designator:
+                self.byDesignator[designator] = entry
+
+    def _logDelta(self, previous, previousChecked):
+        # ONLY THE SATELLITES THAT CHANGED ARE LOGGED, A NEW LOG STARTS WITH THE WHOLE PREVIOUS SNAPSHOT
+        import catalogDelta
+        self.delta = catalogDelta.computeDelta(previous, self.byNorad)
+        if self.deltaLog is None:
+            return
+        log = catalogDelta.DeltaLog(self.deltaLog)
+        if not log.exists() and previous:
+            log.append(catalogDelta.computeDelta({}, previous, previousChecked))
+        log.append(self.delta)
+
+    @staticmethod
+    def _write(filename, text):
+        # WRITE THE WHOLE FILE BESIDE THE OLD ONE AND SWAP IT IN
+        temporary = filename + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(text)
+        os.replace(temporary, filename)
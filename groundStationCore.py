@@ -0,0 +1,380 @@
+"""
+GroundStationCore
+ASYNCIO RECEIVER FOR SEVERAL KISS MODEMS AND SATELLITES AT ONCE
+
+EVERY MODEM IN THE CONFIG GETS ITS OWN TCP CONNECTION, RECONNECTED WITH EXPONENTIAL BACKOFF
+FRAMES ARE ROUTED BY AX.25 SOURCE CALLSIGN TO THE DECODER OF THEIR SATELLITE, CALLSIGN "*" CATCHES THE REST
+
+CONFIG FILE (JSON), WITHOUT ONE THE SOUNDMODEM ON 127.0.0.1:8100 FEEDS DIWATA-2B AS BEFORE:
+{"modems": [{"name": "UHF", "host": "127.0.0.1", "port": 8100}, ...],
+ "satellites": [{"callsign": "DW2B", "tleFile": "diwataTLE.txt", "name": "DIWATA-2B", "catalog": 43678, ...}, ...],
+ "sources": ["DW2B", ...],
+ "metrics": {"file": "pipelineMetrics.json", "interval": 10}}
+SATELLITE ENTRIES TAKE THE KEYS OF packetSchema.SATELLITES, MISSING KEYS DEFAULT TO THE SATELLITE OF THAT "name"
+IN packetSchema.SATELLITES OR ELSE TO DIWATA-2B; "packet": N DECODES WITH PACKET VERSION N OF packetSchema.LAYOUTS
+"crc": true IN A SATELLITE ENTRY EXPECTS THE CRC-16 TRAILER OF packetCRC.py AFTER EVERY PACKET
+"sources": ["DW2B", ...] IS THE ALLOW-LIST OF SOURCE CALLSIGNS, OTHER FRAMES ARE DROPPED BEFORE THEY ARE UNESCAPED;
+WITHOUT IT THE SATELLITE CALLSIGNS ARE ALLOWED, OR EVERY SOURCE WHEN ONE OF THEM IS "*"
+WITHOUT "metrics" NO STAGE IS TIMED, SEE pipelineMetrics.py
+
+run "python groundStationCore.py" to receive headless with groundStation.json (or the default setup)
+run "python groundStationCore.py --metrics pipelineMetrics.json" to also dump per-stage latencies
+run "python kissReplay.py --synthetic diwataTLE.txt --port 8100" first to receive from a local stand-in
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import sys
+from datetime import datetime
+
+import ax25
+import kissProtocol as kiss
+import packetCRC
+import packetSchema
+import tleFormat
+import tlePacket
+from packetArchive import PacketArchive
+from packetCache import PacketCache
+from pipelineMetrics import PipelineMetrics, clock, formatSnapshot, INTERVAL
+from tlePublisher import TLEPublisher, DEBOUNCE
+
+CONFIG_FILE = 'groundStation.json'
+ANY_CALLSIGN = '*'
+RECONNECT_DELAY = 1.0  # SECONDS BEFORE THE FIRST RECONNECT, DOUBLED AFTER EVERY FAILURE
+MAX_RECONNECT_DELAY = 60.0
+RECONNECT_JITTER = 0.2  # +-20% SO MODEMS ON ONE HOST DO NOT RECONNECT IN LOCKSTEP
+SOURCE_END = 1 + 2 * ax25.ADDRESS_LENGTH  # KISS COMMAND, DESTINATION AND SOURCE ADDRESSES
+
+DEFAULT_CONFIG = {
+    'modems': [{'name': 'KISS', 'host': kiss.HOST, 'port': kiss.PORT}],
+    'satellites': [dict(tleFormat.DIWATA_2B, callsign=ANY_CALLSIGN, tleFile='diwataTLE.txt')],
+}
+
+
+def loadConfig(filename=CONFIG_FILE):
+    """Config dict from a JSON file, DEFAULT_CONFIG when the file does not exist"""
+    if not os.path.exists(filename):
+        return DEFAULT_CONFIG
+    with open(filename) as file:
+        return json.load(file)
+
+
+class SatelliteDecoder:
+    """Archive, decode, format and publish the TLE packets of one satellite"""
+
+    def __init__(self, satellite, tleFile=None, archive=None, debounce=DEBOUNCE, metrics=None):
+        self.satellite = satellite
+        self.archive = archive
+        self.metrics = metrics
+        self.cache = PacketCache()
+        self.publisher = TLEPublisher(tleFile, debounce, metrics) if tleFile else None
+        self.codec = packetSchema.codecFor(satellite)
+        self.crc = bool(satellite.get('crc'))
+        self.length = packetCRC.FRAME_LENGTH if self.crc else tlePacket.PACKET_LENGTH  # BYTES TAKEN FROM EACH FRAME
+        self.received = 0
+        self.badCRC = 0
+
+    def handle(self, packet, source='', received=None):
+        """(TLE text, True for a repeat of a recent packet) for one packet read at clock() time received.
+
+        packet is self.length bytes: the 32-byte packet, followed by its CRC
+        trailer when the satellite sends one. A packet failing its CRC is
+        archived without the VALID flag and returns (None, False).
+        """
+        self.received = self.received + 1
+        if self.crc:
+            # A CORRUPTED PACKET NEVER REACHES THE CACHE, DECODER OR TLE FILE
+            valid = packetCRC.checkCRC(packet)
+            packet = packet[:tlePacket.PACKET_LENGTH]
+            if not valid:
+                self.badCRC = self.badCRC + 1
+                if self.archive is not None:
+                    self.archive.append(packet, source, valid=False)
+                if self.metrics is not None:
+                    self.metrics.count('badCRC')
+                return None, False
+        if self.archive is not None:
+            self.archive.append(packet, source)
+        outputTLE = self.cache.get(packet)
+        if outputTLE is not None:
+            if self.metrics is not None:
+                self.metrics.count('duplicates')
+            return outputTLE, True
+        if self.metrics is None:
+            outputTLE = tleFormat.formatTLE(self.codec.decode(packet), self.satellite)
+            self.cache.put(packet, outputTLE)
+            if self.publisher is not None:
+                self.publisher.publish(outputTLE)
+            return outputTLE, False
+
+        # SAME STEPS WITH A TIMESTAMP AFTER EACH ONE
+        start = clock()
+        tle = self.codec.decode(packet)
+        decoded = clock()
+        outputTLE = tleFormat.formatTLE(tle, self.satellite)
+        formatted = clock()
+        self.cache.put(packet, outputTLE)
+        if self.publisher is not None:
+            self.publisher.publish(outputTLE)
+        published = clock()
+        self.metrics.record('decode', decoded - start)
+        self.metrics.record('format', formatted - decoded)
+        self.metrics.record('publish', published - formatted)
+        if received is not None:
+            self.metrics.record('latency', published - received)
+        return outputTLE, False
+
+    def flush(self):
+        if self.publisher is not None:
+            self.publisher.flush()
+
+
+class Modem:
+    """One KISS TCP port and its receive counters"""
+
+    def __init__(self, name, host=kiss.HOST, port=kiss.PORT):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.connected = False
+        self.connects = 0
+        self.bytes = 0
+        self.frames = 0
+        self.dropped = 0  # RUNAWAY FRAMES DISCARDED BY THE DEFRAMER
+
+
+class GroundStationCore:
+    """Receive from every modem concurrently and route frames to satellite decoders"""
+
+    def __init__(self, modems, decoders, onTLE=None, reconnectDelay=RECONNECT_DELAY,
+                 maxReconnectDelay=MAX_RECONNECT_DELAY, metrics=None, sources=None):
+        self.modems = modems
+        self.decoders = decoders  # CALLSIGN -> SatelliteDecoder
+        self.sources = sources  # ax25.SourceFilter, None ACCEPTS EVERY SOURCE
+        self.onTLE = onTLE  # CALLED AS onTLE(timestamp, outputTLE, repeat) FOR EVERY PACKET
+        self.metrics = metrics  # PipelineMetrics SHARED WITH THE DECODERS, None WHEN DISABLED
+        self.reconnectDelay = reconnectDelay
+        self.maxReconnectDelay = maxReconnectDelay
+        self.unrouted = collections.Counter()  # FRAMES PER UNKNOWN SOURCE CALLSIGN
+        self.invalid = 0  # NON-DATA, NON-UI OR SHORT FRAMES
+        self._tasks = []
+        self._loop = None  # EVENT LOOP AND TASK OF run(), FOR stop() FROM OTHER THREADS
+        self._runner = None
+        self._stopped = False
+
+    @classmethod
+    def fromConfig(cls, config, archive=None, onTLE=None, **options):
+        modems = [Modem(modem.get('name', '{}:{}'.format(modem['host'], modem['port'])), modem['host'], modem['port'])
+                  for modem in config['modems']]
+        metrics = options.pop('metrics', None)
+        if metrics is None and config.get('metrics'):
+            metrics = PipelineMetrics(**config['metrics'])
+        decoders = {}
+        for satellite in config['satellites']:
+            defaults = packetSchema.SATELLITES.get(satellite.get('name'), tleFormat.DIWATA_2B)
+            satellite = dict(defaults, **satellite)
+            decoders[satellite['callsign'].upper()] = SatelliteDecoder(satellite, satellite.get('tleFile'), archive,
+                                                                       metrics=metrics)
+        sources = config.get('sources')
+        if sources is None and ANY_CALLSIGN not in decoders:
+            sources = list(decoders)
+        if sources is not None and 'sources' not in options:
+            options['sources'] = ax25.SourceFilter(sources)
+        return cls(modems, decoders, onTLE, metrics=metrics, **options)
+
+    async def run(self):
+        """Receive until cancelled or stopped"""
+        self._loop = asyncio.get_running_loop()
+        self._runner = asyncio.current_task()
+        if self._stopped:
+            return
+        self._tasks = [asyncio.ensure_future(self._link(modem)) for modem in self.modems]
+        if self.metrics is not None:
+            self._tasks.append(asyncio.ensure_future(self._dumpMetrics()))
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            if not self._stopped:
+                raise
+        finally:
+            for task in self._tasks:
+                task.cancel()
+
+    def stop(self):
+        """Make run() return; safe to call from any thread, before or while run() is running"""
+        self._stopped = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._runner.cancel)
+            except RuntimeError:
+                pass  # run() HAS ALREADY RETURNED AND ITS LOOP IS CLOSED
+
+    def close(self):
+        """Write every pending TLE file, e.g. before the program exits"""
+        for decoder in self.decoders.values():
+            decoder.flush()
+        if self.metrics is not None:
+            self.metrics.dump()
+
+    async def _dumpMetrics(self):
+        while True:
+            await asyncio.sleep(self.metrics.interval)
+            self.metrics.dump()
+
+    async def _link(self, modem):
+        # KEEP ONE CONNECTION TO THE MODEM OPEN, BACKING OFF WHILE IT IS UNREACHABLE
+        delay = self.reconnectDelay
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(modem.host, modem.port)
+            except OSError as error:
+                print('{}: KISS connection failed: {}'.format(modem.name, error))
+            else:
+                delay = self.reconnectDelay
+                modem.connected = True
+                modem.connects = modem.connects + 1
+                print('{}: connected to {}:{}'.format(modem.name, modem.host, modem.port))
+                try:
+                    await self._receive(modem, reader)
+                    print('{}: modem closed the connection'.format(modem.name))
+                except OSError as error:
+                    print('{}: KISS connection lost: {}'.format(modem.name, error))
+                finally:
+                    modem.connected = False
+                    writer.close()
+            await asyncio.sleep(delay * random.uniform(1 - RECONNECT_JITTER, 1 + RECONNECT_JITTER))
+            delay = min(delay * 2, self.maxReconnectDelay)
+
+    async def _receive(self, modem, reader):
+        deframer = kiss.KISSDeframer()
+        metrics = self.metrics
+        received = None
+        while True:
+            data = await reader.read(kiss.RECV_SIZE)
+            if not data:
+                return
+            if metrics is not None:
+                received = clock()
+            modem.bytes = modem.bytes + len(data)
+            frames = deframer.feed(data)
+            if metrics is not None:
+                metrics.record('deframe', clock() - received)
+            for frame in frames:
+                self.handleFrame(modem, frame, received)
+            modem.dropped = deframer.dropped
+
+    def handleFrame(self, modem, frame, received=None):
+        """Route one KISS-escaped frame, read at clock() time received, to the decoder of its source callsign"""
+        modem.frames = modem.frames + 1
+        if self.metrics is not None:
+            self.metrics.count('frames')
+        # LOW NIBBLE OF THE KISS COMMAND BYTE IS THE COMMAND, THE HIGH NIBBLE THE MODEM PORT
+        if frame[0] & 0x0F != kiss.DATA_FRAME:
+            self._badFrame()
+            return
+
+        # FOREIGN TRAFFIC IS DROPPED ON ITS SOURCE ADDRESS BEFORE ANYTHING IS UNESCAPED OR DECODED;
+        # ADDRESS BYTES ALMOST NEVER NEED KISS ESCAPES, A HEADER THAT HAS ONE IS UNESCAPED FIRST
+        if self.sources is not None:
+            head = frame[:SOURCE_END]
+            if kiss.FESC in head:
+                head = kiss.unescape(frame[:2 * SOURCE_END])
+            if not self.sources.accepts(head):
+                if self.metrics is not None:
+                    self.metrics.count('rejected')
+                return
+
+        if self.metrics is None:
+            data = kiss.unescape(frame)
+        else:
+            start = clock()
+            data = kiss.unescape(frame)
+            self.metrics.record('unescape', clock() - start)
+        try:
+            header = ax25.parseFrame(data)
+        except ValueError:
+            self._badFrame()
+            return
+        source = header.source
+        decoder = self.decoders.get(source) or self.decoders.get(ANY_CALLSIGN)
+        if decoder is None:
+            self.unrouted[source] = self.unrouted[source] + 1
+            if self.metrics is not None:
+                self.metrics.count('unrouted')
+            return
+        packet = header.info[tlePacket.INFO_OFFSET:tlePacket.INFO_OFFSET + decoder.length]
+        if len(packet) != decoder.length:
+            self._badFrame()
+            return
+        outputTLE, repeat = decoder.handle(bytes(packet), source, received)
+        if outputTLE is None:
+            return
+        if not repeat:
+            print('{} {}:\n{}'.format(modem.name, source, outputTLE))
+        if self.onTLE is not None:
+            self.onTLE(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), outputTLE, repeat)
+
+    def _badFrame(self):
+        self.invalid = self.invalid + 1
+        if self.metrics is not None:
+            self.metrics.count('badFrames')
+
+    def report(self):
+        """Lines of receive statistics per modem and satellite"""
+        lines = []
+        for modem in self.modems:
+            lines.append('{}: {} connects, {} bytes, {} frames, {} runaway frames dropped'.format(
+                modem.name, modem.connects, modem.bytes, modem.frames, modem.dropped))
+        for callsign, decoder in self.decoders.items():
+            lines.append('{} ({}): {} packets, {hits} repeats{}'.format(
+                decoder.satellite['name'], callsign, decoder.received,
+                ', {} failing the CRC'.format(decoder.badCRC) if decoder.crc else '', **decoder.cache.stats()))
+            if decoder.publisher is not None and decoder.publisher.failed:
+                lines.append('{} writes of {} failed'.format(decoder.publisher.failed, decoder.publisher.filename))
+        if self.sources is not None and self.sources.rejected:
+            lines.append('{} frames from sources not in {}'.format(self.sources.rejected, ', '.join(self.sources.callsigns)))
+        if self.invalid:
+            lines.append('{} non-data, non-UI or short frames'.format(self.invalid))
+        for callsign, count in self.unrouted.most_common():
+            lines.append('{} frames from unknown callsign {}'.format(count, callsign))
+        return lines
+
+
+async def run(args):
+    metrics = PipelineMetrics(args.metrics, args.interval) if args.metrics else None
+    core = GroundStationCore.fromConfig(loadConfig(args.config), archive=PacketArchive(), metrics=metrics)
+    try:
+        if args.duration is None:
+            await core.run()
+        else:
+            try:
+                await asyncio.wait_for(core.run(), args.duration)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        core.close()
+        print('\n'.join(core.report()))
+        if metrics is not None:
+            print('\n'.join(formatSnapshot(metrics.snapshot())))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Receive TLE packets from several KISS modems')
+    parser.add_argument('--config', default=CONFIG_FILE, help='JSON config of modems and satellites (default: %(default)s)')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    parser.add_argument('--metrics', metavar='FILE', help='time every pipeline stage and dump the metrics to FILE')
+    parser.add_argument('--interval', type=float, default=INTERVAL, help='seconds between metrics dumps (default: %(default)s)')
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
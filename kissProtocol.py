@@ -0,0 +1,120 @@
+"""
+KISSProtocol
+STREAMING KISS DEFRAMER AND BYTE-LEVEL ESCAPE/UNESCAPE FOR THE HS SOUNDMODEM TCP PORT
+"""
+
+import socket
+
+# KISS SPECIAL CHARACTERS
+FEND = 0xC0  # FRAME END
+FESC = 0xDB  # FRAME ESCAPE
+TFEND = 0xDC  # TRANSPOSED FRAME END
+TFESC = 0xDD  # TRANSPOSED FRAME ESCAPE
+
+HOST = "127.0.0.1"  # Standard loopback interface address (localhost)
+PORT = 8100  # KISS port of HS soundmodem (non-privileged ports are > 1023)
+
+# ESCAPED BYTE SEQUENCES
+_FEND = bytes([FEND])
+_FESC = bytes([FESC])
+_FESC_TFEND = bytes([FESC, TFEND])
+_FESC_TFESC = bytes([FESC, TFESC])
+
+DATA_FRAME = 0x00  # KISS DATA COMMAND ON PORT 0
+
+RECV_SIZE = 4096  # BYTES REQUESTED PER SOCKET READ
+MAX_FRAME = 4096  # DISCARD RUNAWAY FRAMES WITH A MISSING FEND
+
+
+class KISSDeframer:
+    """Split a byte stream into KISS frames on FEND"""
+
+    def __init__(self, maxFrame=MAX_FRAME):
+        self._buffer = bytearray()
+        self._inFrame = False
+        self.maxFrame = maxFrame
+        self.dropped = 0
+
+    def feed(self, data):
+        """Add received bytes and return the list of frames completed by them.
+
+        Frames are returned still KISS-escaped and without their FENDs, i.e.
+        starting with the KISS command byte. A frame cut across two reads is
+        kept in the buffer until its closing FEND arrives.
+        """
+        parts = data.split(_FEND)
+        frames = []
+        if len(parts) > 1:
+            if self._inFrame:
+                self._buffer += parts[0]
+                if len(self._buffer) > self.maxFrame:
+                    self.dropped = self.dropped + 1
+                elif self._buffer:  # BACK-TO-BACK FENDS ARE IDLE FILL, NOT FRAMES
+                    frames.append(bytes(self._buffer))
+                self._buffer.clear()
+            # A RUNAWAY FRAME CAN ALSO START AND END WITHIN ONE READ
+            for frame in parts[1:-1]:
+                if len(frame) > self.maxFrame:
+                    self.dropped = self.dropped + 1
+                elif frame:
+                    frames.append(frame)
+            self._inFrame = True
+
+        # KEEP THE PARTIAL FRAME FOR THE NEXT READ
+        if self._inFrame:
+            self._buffer += parts[-1]
+            if len(self._buffer) > self.maxFrame:
+                self._buffer.clear()
+                self._inFrame = False
+                self.dropped = self.dropped + 1
+        return frames
+
+    def reset(self):
+        """Forget any partial frame, e.g. after a reconnect"""
+        self._buffer.clear()
+        self._inFrame = False
+
+
+def unescape(frame):
+    """Undo KISS transparency: FESC TFEND -> FEND and FESC TFESC -> FESC.
+
+    Works on bytes, bytearray or memoryview and returns bytes. Every FESC in
+    a valid frame starts an escape, so each replace is a single C-level scan
+    and a frame without FESC is returned without copying.
+    """
+    if not isinstance(frame, bytes):
+        frame = bytes(frame)
+    if _FESC not in frame:
+        return frame
+    return frame.replace(_FESC_TFEND, _FEND).replace(_FESC_TFESC, _FESC)
+
+
+def escape(data):
+    """Apply KISS transparency to raw bytes (FESC first so it is not escaped twice)"""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    return data.replace(_FESC, _FESC_TFESC).replace(_FEND, _FESC_TFEND)
+
+
+def encodeFrame(data, command=DATA_FRAME):
+    """Build a complete FEND-delimited KISS frame around raw bytes"""
+    return _FEND + bytes([command]) + escape(data) + _FEND
+
+
+def readFrames(sock, deframer=None, recvSize=RECV_SIZE):
+    """Yield KISS frames from a connected socket until the peer closes it"""
+    if deframer is None:
+        deframer = KISSDeframer()
+    while True:
+        data = sock.recv(recvSize)
+        if not data:
+            return
+        yield from deframer.feed(data)
+
+
+def connect(host=HOST, port=PORT, timeout=None):
+    """Open a long-lived TCP connection to the KISS port"""
+    sock = socket.create_connection((host, port))
+    sock.settimeout(timeout)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    return sock
@@ -0,0 +1,174 @@
+"""
+KISSReplay
+LOCAL TCP STAND-IN FOR THE KISS PORT OF HS SOUNDMODEM: RECORDS AND REPLAYS RAW KISS STREAMS
+
+A REPLAY SERVER SENDS ITS CAPTURE TO EVERY CLIENT AT THE MODEM LINE RATE, THEN HANGS UP (OR LOOPS)
+SYNTHETIC CAPTURES HOLD AX.25 UI FRAMES WITH TLE PACKETS ENCODED FROM TLE FILES
+
+run "python kissReplay.py --record capture.kiss" to record the soundmodem on 127.0.0.1:8100 until Ctrl-C
+run "python kissReplay.py capture.kiss --port 8101 --loop" to serve a recording
+run "python kissReplay.py --synthetic diwataTLE.txt --callsign DW2B --port 8101" to serve packets of a TLE file
+"""
+
+import argparse
+import asyncio
+import sys
+
+import ax25
+import kissProtocol as kiss
+import packetCRC
+import tlePacket
+
+BAUD = 9600  # MODEM LINE RATE, 0 SENDS AS FAST AS THE CLIENT READS
+CHUNK = 256  # BYTES PER WRITE
+DESTINATION = 'CQ'
+CALLSIGN = 'DW2B'
+SATELLITE_HEADER = bytes(tlePacket.INFO_OFFSET)  # BYTES BETWEEN THE AX.25 HEADER AND THE TLE PACKET
+
+
+def buildFrame(packet, source=CALLSIGN, destination=DESTINATION, header=SATELLITE_HEADER, path=()):
+    """KISS data frame of an AX.25 UI frame carrying one 32-byte TLE packet"""
+    return kiss.encodeFrame(ax25.encodeHeader(destination, source, path=path) + header + bytes(packet))
+
+
+def syntheticCapture(entries, source=CALLSIGN, copies=1, path=(), crc=False):
+    """KISS stream with every (name, line1, line2) entry encoded and sent copies times in a row"""
+    frames = []
+    for _, line1, line2 in entries:
+        packet = tlePacket.encode(tlePacket.parseTLE(line1, line2))
+        frame = buildFrame(packetCRC.appendCRC(packet) if crc else packet, source, path=path)
+        frames.extend([frame] * copies)
+    return b''.join(frames)
+
+
+class ReplayServer:
+    """TCP server that writes one capture to every client that connects"""
+
+    def __init__(self, capture, host=kiss.HOST, port=0, baud=BAUD, loop=False):
+        self.capture = capture
+        self.host = host
+        self.port = port  # 0 PICKS A FREE PORT, THE BOUND ONE IS SET BY start()
+        self.baud = baud
+        self.loop = loop
+        self.clients = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        self.close()
+        await self._server.wait_closed()
+
+    async def serveForever(self):
+        await self._server.serve_forever()
+
+    async def _serve(self, reader, writer):
+        self.clients = self.clients + 1
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        sent = 0
+        try:
+            while True:
+                for start in range(0, len(self.capture), CHUNK):
+                    chunk = self.capture[start:start + CHUNK]
+                    writer.write(chunk)
+                    await writer.drain()
+                    sent = sent + len(chunk)
+                    if self.baud:
+                        # SLEEP UNTIL THE LINE WOULD HAVE SENT EVERYTHING SO FAR, SO TIMER LATENESS DOES NOT ADD UP
+                        await asyncio.sleep(max(0.0, began + sent * 10 / self.baud - loop.time()))
+                if not self.loop:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def record(filename, host=kiss.HOST, port=kiss.PORT, duration=None):
+    """Append the raw KISS stream of a modem to a file; returns the byte count"""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    end = None if duration is None else loop.time() + duration
+    count = 0
+    try:
+        with open(filename, 'ab') as file:
+            while end is None or loop.time() < end:
+                try:
+                    data = await asyncio.wait_for(reader.read(kiss.RECV_SIZE),
+                                                  None if end is None else max(0.0, end - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if not data:
+                    break
+                file.write(data)
+                count = count + len(data)
+    finally:
+        writer.close()
+    return count
+
+
+async def run(args):
+    if args.record:
+        try:
+            count = await record(args.record, args.host, args.port, args.duration)
+        except asyncio.CancelledError:
+            count = None
+        print('Recorded {} bytes to {}'.format('' if count is None else count, args.record))
+        return 0
+
+    if args.synthetic:
+        import catalogStore
+        entries = []
+        for filename in args.synthetic:
+            with open(filename) as file:
+                entries.extend(catalogStore.parseCatalog(file.read()))
+        capture = syntheticCapture(entries, args.callsign, args.copies, args.path, args.crc)
+    else:
+        with open(args.capture, 'rb') as file:
+            capture = file.read()
+
+    async with ReplayServer(capture, args.host, args.port, args.baud, args.loop) as server:
+        print('Replaying {} bytes on {}:{}'.format(len(capture), server.host, server.port))
+        await server.serveForever()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record or replay the KISS TCP stream of a modem')
+    parser.add_argument('capture', nargs='?', help='recorded KISS stream to serve')
+    parser.add_argument('--record', metavar='FILE', help='record the modem at --host:--port into FILE')
+    parser.add_argument('--synthetic', nargs='+', metavar='TLE_FILE', help='serve TLE packets encoded from TLE files')
+    parser.add_argument('--callsign', default=CALLSIGN, help='AX.25 source of synthetic frames (default: %(default)s)')
+    parser.add_argument('--path', nargs='+', default=(), metavar='CALLSIGN',
+                        help='digipeaters of synthetic frames, e.g. WIDE1-1 RELAY*')
+    parser.add_argument('--crc', action='store_true', help='add the CRC-16 trailer to synthetic packets')
+    parser.add_argument('--copies', type=int, default=1, help='times each synthetic packet is repeated (default: %(default)s)')
+    parser.add_argument('--host', default=kiss.HOST, help='(default: %(default)s)')
+    parser.add_argument('--port', type=int, help='(default: {} to record, a free port to serve)'.format(kiss.PORT))
+    parser.add_argument('--baud', type=int, default=BAUD, help='replay line rate, 0 for unpaced (default: %(default)s)')
+    parser.add_argument('--loop', action='store_true', help='repeat the capture until the client disconnects')
+    parser.add_argument('--duration', type=float, help='stop recording after this many seconds')
+    args = parser.parse_args(argv)
+    if not args.record and not args.synthetic and not args.capture:
+        parser.error('a capture file, --synthetic or --record is required')
+    if args.port is None:
+        args.port = kiss.PORT if args.record else 0
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
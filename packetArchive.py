@@ -0,0 +1,240 @@
+"""
+PacketArchive
+APPEND-ONLY ARCHIVE OF EVERY RECEIVED 32-BYTE TLE PACKET, READ BACK WITH numpy.memmap
+
+FILE LAYOUT: 16-BYTE HEADER (MAGIC, VERSION, RECORD SIZE) FOLLOWED BY FIXED 56-BYTE RECORDS (RECORD_FIELDS)
+A SIDE FILE (.idx) HOLDS THE MIN/MAX TIMESTAMP OF EVERY BLOCK OF RECORDS FOR TIME-RANGE SEEKS
+
+run "python packetArchive.py" for a summary of packetArchive.bin
+run "python packetArchive.py --start 2024-07-25 --end 2024-07-26 --decode" to list the TLEs of a time range
+"""
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import packetCRC
+import tlePacket
+
+ARCHIVE_FILE = 'packetArchive.bin'
+MAGIC = b'TLEARCH\x00'
+VERSION = 1
+BLOCK = 1024  # RECORDS PER INDEX ENTRY
+
+# FLAGS
+VALID = 0x01  # PACKET PASSED THE RECEIVE CHECKS
+
+# RECORD FIELDS, PACKED WITHOUT PADDING
+RECORD_FIELDS = [
+    ('time', '<f8'),  # UNIX TIME OF RECEPTION
+    ('source', 'S12'),  # RECEIVING LINK OR AX.25 SOURCE CALLSIGN
+    ('crc', '<u2'),  # CRC-16/CCITT-FALSE OF THE PAYLOAD, GUARDS THE ARCHIVE ITSELF
+    ('flags', 'u1'),
+    ('reserved', 'u1'),
+    ('payload', 'u1', (tlePacket.PACKET_LENGTH,)),
+]
+# THE RECEIVE PATH PACKS RECORDS WITH struct SO THE GROUND STATION STARTS WITHOUT NUMPY
+_RECORD = struct.Struct('<d12sHBx{}s'.format(tlePacket.PACKET_LENGTH))
+RECORD_SIZE = _RECORD.size
+_HEADER = struct.Struct('<8sII')
+
+
+def recordType():
+    """numpy dtype of one record"""
+    import numpy as np
+    return np.dtype(RECORD_FIELDS)
+
+
+def payloadCRC(payload):
+    return packetCRC.crc16(payload)
+
+
+class PacketArchive:
+    """Append-only record file; appends are safe from any thread"""
+
+    def __init__(self, filename=ARCHIVE_FILE):
+        self.filename = filename
+        self.indexFile = filename + '.idx'
+        self._lock = threading.Lock()
+        self._fd = None
+
+    def append(self, payload, source='', timestamp=None, valid=True):
+        """Archive one raw packet; written with a single O_APPEND write"""
+        payload = bytes(payload)
+        if len(payload) != tlePacket.PACKET_LENGTH:
+            raise ValueError('Packet must be {} bytes'.format(tlePacket.PACKET_LENGTH))
+        data = _RECORD.pack(time.time() if timestamp is None else timestamp, source.encode()[:12],
+                            payloadCRC(payload), VALID if valid else 0, payload)
+        with self._lock:
+            if self._fd is None:
+                self._fd = self._open()
+            os.write(self._fd, data)
+
+    def _open(self):
+        fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                os.write(fd, _HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+            else:
+                self._checkHeader()
+                # DROP A RECORD TORN BY A CRASH SO THE NEXT ONE STARTS ON A RECORD BOUNDARY
+                torn = (size - _HEADER.size) % RECORD_SIZE
+                if torn:
+                    os.ftruncate(fd, size - torn)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _checkHeader(self):
+        with open(self.filename, 'rb') as file:
+            header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError('{} is not a version {} packet archive: {} byte header, expected {}'.format(
+                self.filename, VERSION, len(header), _HEADER.size))
+        magic, version, recordSize = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or recordSize != RECORD_SIZE:
+            raise ValueError('{} is not a version {} packet archive'.format(self.filename, VERSION))
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def records(self):
+        """Read-only memmap of every complete record (empty when there is no archive)"""
+        import numpy as np
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) <= _HEADER.size:
+            return np.zeros(0, dtype=recordType())
+        self._checkHeader()
+        count = (os.path.getsize(self.filename) - _HEADER.size) // RECORD_SIZE
+        if count == 0:
+            return np.zeros(0, dtype=recordType())
+        return np.memmap(self.filename, dtype=recordType(), mode='r', offset=_HEADER.size, shape=(count,))
+
+    def blockIndex(self, records=None):
+        """(blocks, 2) array of min/max receive time per BLOCK records, extended and saved as it grows"""
+        import numpy as np
+        if records is None:
+            records = self.records()
+        index = np.zeros((0, 2))
+        if os.path.exists(self.indexFile):
+            index = np.fromfile(self.indexFile, dtype='<f8').reshape(-1, 2)
+        saved = index
+        blocks = -(-len(records) // BLOCK)
+        # THE LAST SAVED BLOCK MAY HAVE BEEN PARTIAL, RECOMPUTE FROM IT ON
+        first = max(0, len(index) - 1)
+        if len(index) > blocks or first and not self._spans(records, first - 1, index[first - 1]):
+            index = np.zeros((0, 2))  # ARCHIVE WAS REPLACED OR TRUNCATED, REBUILD
+            first = 0
+        times = np.asarray(records['time'][first * BLOCK:])
+        if len(times):
+            starts = np.arange(0, len(times), BLOCK)
+            new = np.stack([np.minimum.reduceat(times, starts), np.maximum.reduceat(times, starts)], axis=1)
+            index = np.concatenate([index[:first], new])
+        # READ-ONLY QUERIES OF AN ARCHIVE THAT DID NOT GROW LEAVE THE SAVED INDEX ALONE
+        if not np.array_equal(index, saved):
+            self._saveIndex(index)
+        return index
+
+    def _saveIndex(self, index):
+        # THE INDEX IS ONLY A CACHE: WHEN IT CANNOT BE SAVED (READ-ONLY DIRECTORY, FULL DISK) IT IS REBUILT NEXT TIME
+        try:
+            fd, temporary = tempfile.mkstemp(prefix=os.path.basename(self.indexFile) + '.', suffix='.tmp',
+                                             dir=os.path.dirname(self.indexFile) or '.')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                index.astype('<f8').tofile(file)
+            os.replace(temporary, self.indexFile)
+        except OSError:
+            os.remove(temporary)
+
+    @staticmethod
+    def _spans(records, block, span):
+        # DOES THE SAVED MIN/MAX OF A FULL BLOCK STILL DESCRIBE THE ARCHIVE?
+        times = records['time'][block * BLOCK:(block + 1) * BLOCK]
+        return len(times) == BLOCK and times.min() == span[0] and times.max() == span[1]
+
+    def range(self, start=None, end=None):
+        """Records received in [start, end) (UNIX times, None for open ends), in archive order.
+
+        Only the blocks whose time span overlaps the range are read, so
+        receive clock jumps never hide records.
+        """
+        import numpy as np
+        records = self.records()
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        index = self.blockIndex(records)
+        selected = np.flatnonzero((index[:, 1] >= start) & (index[:, 0] < end))
+        parts = []
+        for block in selected:
+            chunk = records[block * BLOCK:(block + 1) * BLOCK]
+            parts.append(chunk[(chunk['time'] >= start) & (chunk['time'] < end)])
+        if not parts:
+            return np.zeros(0, dtype=recordType())
+        return np.concatenate(parts)
+
+
+def checkRecords(records):
+    """True for every record whose payload still matches its stored CRC, checked in one vectorized pass"""
+    return packetCRC.crcBatch(records['payload']) == records['crc']
+
+
+def decodeRecords(records):
+    """Batch-decode the payloads of archive records (see tlePacket.decodeBatch)"""
+    import numpy as np
+    return tlePacket.decodeBatch(np.ascontiguousarray(records['payload']))
+
+
+def _parseTime(text):
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarise or query the packet archive')
+    parser.add_argument('--file', default=ARCHIVE_FILE, help='archive file (default: %(default)s)')
+    parser.add_argument('--start', type=_parseTime, help='UTC start of the time range, e.g. 2024-07-25T06:00')
+    parser.add_argument('--end', type=_parseTime, help='UTC end of the time range')
+    parser.add_argument('--decode', action='store_true', help='print the decoded elements of every record')
+    args = parser.parse_args(argv)
+    import numpy as np
+
+    archive = PacketArchive(args.file)
+    records = archive.range(args.start, args.end)
+    intact = checkRecords(records)
+    print('{} records, {} valid, {} failing the archive CRC'.format(
+        len(records), np.count_nonzero(records['flags'] & VALID), np.count_nonzero(~intact)))
+    if len(records):
+        print('from {:%Y-%m-%d %H:%M:%S} to {:%Y-%m-%d %H:%M:%S} UTC'.format(
+            datetime.fromtimestamp(records['time'].min(), timezone.utc),
+            datetime.fromtimestamp(records['time'].max(), timezone.utc)))
+    if args.decode and len(records):
+        fields = decodeRecords(records)
+        for i, record in enumerate(records):
+            print('{:%Y-%m-%d %H:%M:%S} {:<12} {} EPOCH {:.8f} INCL {:.4f} MM {:.8f}'.format(
+                datetime.fromtimestamp(record['time'], timezone.utc), record['source'].decode(),
+                record['payload'].tobytes().hex(), fields['epoch'][i], fields['inclination'][i], fields['meanMotion'][i]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
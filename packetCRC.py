@@ -0,0 +1,107 @@
+"""
+PacketCRC
+OPTIONAL CRC-16 TRAILER OF THE 32-BYTE TLE PACKET, CHECKED ONE PACKET AT A TIME OR A WHOLE ARCHIVE AT ONCE
+
+CRC-16/CCITT-FALSE (POLY 0x1021, INIT 0xFFFF, NO REFLECTION, NO FINAL XOR), SENT BIG ENDIAN AFTER THE PACKET
+THE SAME CRC GUARDS THE RECORDS OF packetArchive.py
+SINGLE PACKETS USE binascii.crc_hqx (THE SAME TABLE-DRIVEN CRC IN C), BATCHES ONE NUMPY TABLE LOOKUP PER 2-BYTE COLUMN
+
+NUMPY IS ONLY IMPORTED BY THE BATCH FUNCTIONS SO THE RECEIVER STARTS WITHOUT IT
+"""
+
+import binascii
+
+import tlePacket
+
+CRC_LENGTH = 2
+POLYNOMIAL = 0x1021
+INIT = 0xFFFF
+FRAME_LENGTH = tlePacket.PACKET_LENGTH + CRC_LENGTH  # PACKET AND TRAILER
+
+
+def _table():
+    # CRC OF EVERY HIGH BYTE, SHIFTED THROUGH THE POLYNOMIAL 8 TIMES
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ POLYNOMIAL if crc & 0x8000 else crc << 1) & 0xFFFF
+        table.append(crc)
+    return table
+
+
+TABLE = _table()
+
+
+def crc16(data):
+    """CRC-16/CCITT-FALSE of bytes"""
+    return binascii.crc_hqx(bytes(data), INIT)
+
+
+def appendCRC(packet):
+    """Packet followed by its 2-byte CRC trailer"""
+    packet = bytes(packet)
+    return packet + crc16(packet).to_bytes(CRC_LENGTH, 'big')
+
+
+def checkCRC(frame):
+    """True when a packet with trailer (FRAME_LENGTH bytes) matches its CRC"""
+    if len(frame) != FRAME_LENGTH:
+        return False
+    return crc16(frame[:tlePacket.PACKET_LENGTH]) == int.from_bytes(frame[tlePacket.PACKET_LENGTH:], 'big')
+
+
+def stripCRC(frame):
+    """The 32-byte packet of a packet with trailer; raises ValueError when the CRC does not match"""
+    if not checkCRC(frame):
+        raise ValueError('CRC-16 trailer does not match the packet')
+    return bytes(frame[:tlePacket.PACKET_LENGTH])
+
+
+_wordTable = None
+
+
+def _words():
+    # 65536-ENTRY TABLE THAT ADVANCES THE CRC BY TWO BYTES AT ONCE: CRC' = WORDS[CRC ^ NEXT 16 BITS]
+    global _wordTable
+    import numpy as np
+    if _wordTable is None:
+        table = np.array(TABLE, dtype=np.uint32)
+        value = np.arange(1 << 16, dtype=np.uint32)
+        high = table[value >> 8]
+        _wordTable = (table[(high >> 8) ^ (value & 0xFF)] ^ ((high << 8) & 0xFFFF)).astype(np.uint16)
+    return _wordTable
+
+
+def crcBatch(rows):
+    """uint16 CRC of every row of an N x L uint8 array, one table lookup per 16-bit column"""
+    import numpy as np
+    rows = np.ascontiguousarray(rows, dtype=np.uint8)
+    words = _words()
+    crc = np.full(len(rows), INIT, dtype=np.uint16)
+    even = rows.shape[1] & ~1
+    # BIG-ENDIAN BYTE PAIRS, COLUMN BY COLUMN SO EVERY LOOKUP READS A CONTIGUOUS ROW
+    for column in np.ascontiguousarray(rows[:, :even].view('>u2').T).astype(np.uint16):
+        crc = words.take(crc ^ column)
+    if even != rows.shape[1]:
+        crc = (crc << np.uint16(8)) ^ np.array(TABLE, dtype=np.uint16).take((crc >> np.uint16(8)) ^ rows[:, -1])
+    return crc
+
+
+def appendCRCBatch(packets):
+    """N x 34 uint8 array of packets followed by their trailers"""
+    import numpy as np
+    packets = tlePacket.asPacketArray(packets)
+    crc = crcBatch(packets)
+    return np.concatenate([packets, (crc >> 8).astype(np.uint8)[:, None], (crc & 0xFF).astype(np.uint8)[:, None]],
+                          axis=1)
+
+
+def checkCRCBatch(frames):
+    """True for every row of an N x 34 uint8 array whose trailer matches its packet"""
+    import numpy as np
+    frames = np.asarray(frames, dtype=np.uint8)
+    if frames.ndim != 2 or frames.shape[1] != FRAME_LENGTH:
+        raise ValueError('Frames must be N x {} bytes'.format(FRAME_LENGTH))
+    trailer = (frames[:, -2].astype(np.uint16) << np.uint16(8)) | frames[:, -1]
+    return crcBatch(frames[:, :tlePacket.PACKET_LENGTH]) == trailer
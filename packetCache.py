@@ -0,0 +1,68 @@
+"""
+PacketCache
+BOUNDED LRU OF RECENTLY RECEIVED RAW TLE PACKETS AND THEIR FORMATTED TLE
+
+THE SATELLITE BEACONS THE SAME 32-BYTE PACKET MANY TIMES PER PASS; A REPEAT SEEN WITHIN
+WINDOW SECONDS IS ANSWERED FROM HERE INSTEAD OF GOING THROUGH DECODE, FORMAT AND PUBLISH
+"""
+
+import collections
+import threading
+import time
+
+CACHE_SIZE = 64  # DISTINCT PACKETS KEPT
+CACHE_WINDOW = 900.0  # SECONDS A PACKET COUNTS AS A REPEAT, ABOUT ONE LEO PASS
+
+
+class PacketCache:
+    """Raw payload -> formatted TLE, least recently seen entries evicted first"""
+
+    def __init__(self, size=CACHE_SIZE, window=CACHE_WINDOW):
+        self.size = size
+        self.window = window
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # PAYLOAD -> [VALUE, LAST SEEN]
+        self._lock = threading.Lock()
+
+    def get(self, payload, now=None):
+        """Value stored for a repeat of payload, None (a miss) when it is new or too old"""
+        now = time.time() if now is None else now
+        key = bytes(payload)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[1] > self.window:
+                self.misses = self.misses + 1
+                return None
+            entry[1] = now
+            self._entries.move_to_end(key)
+            self.hits = self.hits + 1
+            return entry[0]
+
+    def put(self, payload, value, now=None):
+        now = time.time() if now is None else now
+        key = bytes(payload)
+        with self._lock:
+            self._entries[key] = [value, now]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions = self.evictions + 1
+
+    def lastSeen(self, payload):
+        """UNIX time of the latest copy of payload, None when it is not cached"""
+        with self._lock:
+            entry = self._entries.get(bytes(payload))
+            return None if entry is None else entry[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hitRate': self.hits / lookups if lookups else 0.0,
+            }
@@ -1,27 +1,42 @@
 """
 TLEPacketDecoder
 DECODE 32-BYTE DATA PACKET INTO TLE SECTIONS
+
+run "python packetDecoder.py" for the GUI
+run "python packetDecoder.py --hex 0xNNNN...", "python packetDecoder.py --file packets.bin" or pipe one HEX packet per line on stdin
 """
 
-import numpy as np
-from ctypes import *
-import tkinter as tk
+import argparse
 import sys
+import packetCRC
+import packetSchema
+import tleFormat
+import tlePacket
 
 #DATA_PACKET = 0x2f4790da29a801c26c503a6ba3318833a8b8e001c9e420b9d0e321ca417cc1bf
 
-def inputTLEHEX():
-    global user_input
+### MICROORBITER-1 CONSTANTS AND PACKET VERSION, SEE packetSchema.SATELLITES
+SATELLITE = packetSchema.SATELLITES['MicroOrbiter-1']
+CODEC = packetSchema.codecFor(SATELLITE)
+
+
+def inputTLEHEXGUI():
+  import tkinter as tk
+
+  user_input = None
+
+  def inputTLEHEX():
+    nonlocal user_input
     user_input = entry.get() 
     root.destroy()
   
-# ERROR FLAGS FOR TLE HEX INPUT GUI    
-errorFlag = 1
-noInput = 0
-wrongLen = 0
-wrongFormat = 0
+  # ERROR FLAGS FOR TLE HEX INPUT GUI    
+  errorFlag = 1
+  noInput = 0
+  wrongLen = 0
+  wrongFormat = 0
 
-while(errorFlag == 1):
+  while(errorFlag == 1):
     root = tk.Tk()
     root.title("MicroOrbiter-1 HEX TLE Decoder")
     root.geometry("410x115")
@@ -58,156 +73,38 @@ while(errorFlag == 1):
       wrongFormat = 0
 
     # START THE GUI EVENT LOOP
+    user_input = None
     root.mainloop()
 
      
-    try:
-      if user_input == '':
-        noInput = 1 # SET FLAG IF NO INPUT
-      elif len(user_input) < 64 or len(user_input) > 66:
-        wrongLen = 1 # SET FLAG FOR WRONG PACKET LENGTH
-      elif user_input[0:2] != '0x':
-        wrongFormat = 1 # SET FLAG IF NO LEADING 0X
-      elif len(user_input) < 66:
-        wrongLen = 1
-      else:
-        errorFlag = 0
-    except:
+    if user_input is None:
       print("Terminated")
       sys.exit()
-
-# MASKS TO GET SPECIFIC SECTION OF DATA PACKET
-EP_mask = 0xFFFFFFFFFFF00000000000000000000000000000000000000000000000000000
-DV_mask = 0x00000000000FFFFFFFF000000000000000000000000000000000000000000000
-DT_mask = 0x0000000000000000000FFFFFF000000000000000000000000000000000000000
-IN_mask = 0x0000000000000000000000000FFFFFF000000000000000000000000000000000
-RN_mask = 0x0000000000000000000000000000000FFFFFF000000000000000000000000000
-EC_mask = 0x0000000000000000000000000000000000000FFFFFF000000000000000000000
-AP_mask = 0x0000000000000000000000000000000000000000000FFFFFF000000000000000
-MA_mask = 0x0000000000000000000000000000000000000000000000000FFFFFFF00000000
-MM_mask = 0x00000000000000000000000000000000000000000000000000000000FFFFFFFF
-
-DATA_PACKET = int(user_input,16)
-
-print("TLE Packet = {} \n" .format(hex(DATA_PACKET)))
-
-# GET EPOCH YEAR AND JULIAN DAY FRACTION
-EP = (DATA_PACKET & EP_mask) >> int(26.5*8)
-#print(hex(EP))
-
-# GET 1ST DERIVATIVE OF MEAN MOTION
-DV = (DATA_PACKET & DV_mask) >> int(22.5*8)
-#print(hex(DV))
-
-# GET DRAG TERM
-DT = (DATA_PACKET & DT_mask) >> int(19.5*8)
-#print(hex(DT))
-
-# GET INCLINATION
-IN = (DATA_PACKET & IN_mask) >> int(16.5*8)
-#print(hex(IN))
-
-# GET RIGHT ASCENSION OF THE ASCENDING NODE 
-RN = (DATA_PACKET & RN_mask) >> int(13.5*8)
-#print(hex(RN))
-
-# GET ECCENTRICITY
-EC = (DATA_PACKET & EC_mask) >> int(10.5*8)
-#print(hex(EC))
-
-# GET ARGUMENT OF PERIGEE
-AP = (DATA_PACKET & AP_mask) >> int(7.5*8)
-#print(hex(AP))
-
-# GET MEAN ANOMALY
-MA = (DATA_PACKET & MA_mask) >> int(4*8)
-#print(hex(MA))
-
-# GET MEAN MOTION
-MM = (DATA_PACKET & MM_mask)
-#print(hex(MM))
-
-### CONVERT INTO TLE DATA FORMAT
-
-# CONVERT HEX TO FLOATING POINT
-def toFloat(s):
-  cp = pointer(c_int(s))
-  fp = cast(cp, POINTER(c_float))
-  str_value = "{:.8f}".format(fp.contents.value)
-  return float(str_value)
-
-def getDecimal(s):
-  for i in np.array([1,10,100,1000,10000]):
-    if(s % i == s):
-        return(s/i)
-
-
-# EPOCH YEAR AND JULIAN DATE FRACTION
-EP_int = ((EP & 0xFFFF8000000) >> 3) >> (6*4)
-EP_dec = EP & 0x00007FFFFFF
-epoch = "{:.8f}".format(int(EP_int) + int(EP_dec) / 1e8)
-print('Epoch Year and Julian Date Fraction = ', epoch)
-
-# 1ST DERIVATIVE OF MEAN MOTION
-DV_sign = '-'
-if(DV & 0x80000000 == 0x80000000): 
-	DV = DV - 0x80000000
-	DV_sign = '+'
-DV1 = (DV >> 16) / 1e4
-DV2 = (DV & 0x0000FFFF) / 1e8
-derivative = "{:.8f}".format(round(DV1 + DV2,8))
-if (DV_sign == '-') : derivative = DV_sign + str(derivative)[1:]
-else: derivative = str(derivative)[1:]
-print('1st Derivative of Mean Motion = ', derivative)
-
-# DRAG TERM
-DT1 = DT >> 4
-for pad in range(5 - len(str(DT1))): # PADS ZEROS TO SUPPORT FOR DRAG TERMS LESS THAN 5 DIGITS 
-  DT1 = '0' + str(DT1)
-DT2 = DT & 0x00000F
-#DT_sign = '-'
-if(DT2 & 0x8 == 0x8):
-	DT2 = DT2 - 0x8
-	#DT_sign = '+'
-	drag = str(DT1) + '-' + str(DT2)
-else: drag = '-' + str(DT1) + '-' + str(DT2)
-#drag = DT_sign + str(DT1) + '-' + str(DT2)
-print('Drag Term = ', drag)
-
-# INCLINATION
-IN_int = IN >> 16
-IN_dec = (IN & 0x00FFFF) / 1e4
-inclination = "{:.4f}".format(IN_int + IN_dec)
-print('Inclination = ', inclination)
-
-# RIGHT ASCENSION OF THE ASCENDING NODE 
-RN_int = ((RN & 0xFF8000) >> 3) >> (3*4)
-RN_dec = (RN & 0x007FFF) / 1e4
-raan = "{:.4f}".format(RN_int + RN_dec)
-print("Right Ascension of the Ascending Node = ", raan)
-
-# ECCENTRICITY
-eccentricity = "{:.7f}".format(EC / 1e7)
-#print("Eccentricity = ", eccentricity) # ACTUAL VALUE WITH DECIMAL POINT
-print("Eccentricity = ", str(eccentricity)[2:]) # DECIMAL POINT ASSUMED
-
-# ARGUMENT OF PERIGEE
-AP_int = ((AP & 0xFF8000) >> 3) >> (3*4)
-AP_dec = (AP & 0x007FFF) / 1e4
-argPerigee = "{:.4f}".format(AP_int + AP_dec)
-print("Argument of Perigee = ", argPerigee)
-
-# MEAN ANOMALY
-MA_int = MA >> 16
-MA_dec = (MA & 0x000FFFF) / 1e4
-meanAnomaly = "{:.4f}".format(MA_int + MA_dec)
-print("Mean Anomaly = ", meanAnomaly)
-
-# MEAN MOTION
-meanMotion = toFloat(MM)
-meanMotion = "{:.8f}".format(meanMotion)
-print("Mean Motion = ", meanMotion)
-print()
+    if user_input == '':
+      noInput = 1 # SET FLAG IF NO INPUT
+    elif len(user_input) < 64 or len(user_input) > 66:
+      wrongLen = 1 # SET FLAG FOR WRONG PACKET LENGTH
+    elif user_input[0:2] != '0x':
+      wrongFormat = 1 # SET FLAG IF NO LEADING 0X
+    elif len(user_input) < 66:
+      wrongLen = 1
+    else:
+      errorFlag = 0
+
+  return user_input
+
+
+def printTLE(tle):
+  print('Epoch Year and Julian Date Fraction = ', tle['epoch'])
+  print('1st Derivative of Mean Motion = ', tle['derivative'])
+  print('Drag Term = ', tle['drag'])
+  print('Inclination = ', tle['inclination'])
+  print("Right Ascension of the Ascending Node = ", tle['raan'])
+  print("Eccentricity = ", tle['eccentricity'][2:]) # DECIMAL POINT ASSUMED
+  print("Argument of Perigee = ", tle['argPerigee'])
+  print("Mean Anomaly = ", tle['meanAnomaly'])
+  print("Mean Motion = ", tle['meanMotion'])
+  print()
 
 
 #########################################################################################################
@@ -215,77 +112,28 @@ print()
 
 # OUTPUT DECODED TLE INTO TLE FILE FOR GPREDICT
 
-### SUPPORTING FUNCTIONS
-
-# APPEND INTO STRING AT A SPECIFIC INDEX 
-def insertData(string, data, index):
-  return string[:index] + data + string[index:]
-
-# RETURN CHECKSUM MODULO 10
-def checkSum(digit):
-    checksum = 0
-    for x in digit:
-      if x == '-':
-        checksum = checksum + 1
-      if x.isdigit():
-        checksum = checksum + int(x)
-    return checksum%10
-
-### ABRITARY CONSTANTS FOR MICROORBITER-1
-
-# LINE 1
-satelliteName = 'MicroOrbiter-1'
-satelliteCatalog = 59483
-classification = 'U'
-intDesignatorYear = 98067
-intDesignatorPiece = 'WF'
-secondDerivative = '00000+0'
-ephemeris = 0
-elementSetNumber = 999 # ARBRITARY NUMBER
-#LINE 2
-revolutionNumber = 4801 # ARBITRARY NUMBER
-
 ### OUTPUT THE TLE FILE
 
-# WRITE TLE LINE 1
-TLE_LINE1 = '1                                                                   '
-TLE_LINE1 = insertData(TLE_LINE1, str(satelliteCatalog),2)
-TLE_LINE1 = insertData(TLE_LINE1, classification, 7)
-TLE_LINE1 = insertData(TLE_LINE1, str(intDesignatorYear), 9)
-TLE_LINE1 = insertData(TLE_LINE1, intDesignatorPiece,14)
-TLE_LINE1 = insertData(TLE_LINE1, str(epoch), 18)
-if str(derivative)[0] == '-':
-	TLE_LINE1 = insertData(TLE_LINE1, str(derivative), 33)
-else:
-	TLE_LINE1 = insertData(TLE_LINE1, str(derivative), 34)  
-TLE_LINE1 = insertData(TLE_LINE1, secondDerivative, 45)
-if str(drag)[0] == '-':
-	TLE_LINE1 = insertData(TLE_LINE1, str(drag), 53)
-else:
-	TLE_LINE1 = insertData(TLE_LINE1, str(drag), 54)  
-TLE_LINE1 = insertData(TLE_LINE1, str(ephemeris), 62)
-TLE_LINE1 = insertData(TLE_LINE1, str(elementSetNumber), 65)
-TLE_LINE1 = insertData(TLE_LINE1, str(checkSum(TLE_LINE1)), 68)
-#print(TLE_LINE1)
-
-# WRITE TLE LINE 2
-TLE_LINE2 = '2                                                                   '
-TLE_LINE2 = insertData(TLE_LINE2, str(satelliteCatalog), 2)
-TLE_LINE2 = insertData(TLE_LINE2, str(inclination), 8 + 3 - len(inclination.split(".")[0])) # ADDED SUPPORT FOR INCLINATIONS WITH 1-3 DIGIT INTEGER INCLINATIONS
-TLE_LINE2 = insertData(TLE_LINE2, str(raan), 17 + 3 - len(raan.split(".")[0])) # ADDED SUPPORT FOR RAANS WITH 1-3 DIGIT INTEGER RAANS
-TLE_LINE2 = insertData(TLE_LINE2, str(eccentricity)[2:]	, 26)
-TLE_LINE2 = insertData(TLE_LINE2, str(argPerigee), 34 + 3 - len(argPerigee.split(".")[0])) # ADDED SUPPORT FOR ARGUMENTS OF PERIGEE WITH 1-3 DIGIT INTEGER ARGUMENTS OF PERIGEE
-TLE_LINE2 = insertData(TLE_LINE2, str(meanAnomaly), 43 + 3 - len(meanAnomaly.split(".")[0])) # ADDED SUPPORT FOR MEAN ANOMALIES WITH 1-3 DIGIT INTEGER MEAN ANOMALIES
-TLE_LINE2 = insertData(TLE_LINE2, str(meanMotion), 52 + 2 - len(str(meanMotion).split(".")[0])) # ADDED SUPPORT FOR MEAN MOTIONS WITH 1-3 DIGIT INTEGER MEAN MOTIONS 
-TLE_LINE2 = insertData(TLE_LINE2, str(revolutionNumber), 64)
-TLE_LINE2 = insertData(TLE_LINE2, str(checkSum(TLE_LINE2)), 68)
-#print(TLE_LINE2)
-
-# CREATE TLE FILE 
-outputTLE = satelliteName + '\n' + TLE_LINE1.rstrip() + '\n' + TLE_LINE2.rstrip()
-print(outputTLE)
+def buildTLE(tle):
+  return tleFormat.formatTLE(tle, SATELLITE)
+
+
+def decodeHex(text):
+  """32-byte packet from a HEX string, with or without the leading 0x and the CRC-16 trailer"""
+  text = text.strip()
+  if text[0:2].lower() == '0x':
+    text = text[2:]
+  packet = bytes.fromhex(text)
+  if len(packet) == packetCRC.FRAME_LENGTH:
+    return packetCRC.stripCRC(packet)
+  if len(packet) != tlePacket.PACKET_LENGTH:
+    raise ValueError('expected {} or {} bytes, got {}'.format(tlePacket.PACKET_LENGTH, packetCRC.FRAME_LENGTH, len(packet)))
+  return packet
+
  
-def create_gui():
+def create_gui(user_input, outputTLE):
+    import tkinter as tk
+
     root = tk.Tk()
     root.title("MicroOrbiter-1 Decoded TLE from HEX")
     root.geometry("600x180")
@@ -294,7 +142,7 @@ def create_gui():
     text_widget.pack()
 
     lines_to_print = [
-      'Input HEX: \n' + str(hex(DATA_PACKET)) + '\n\n',
+      'Input HEX: \n' + user_input + '\n\n',
       'Decoded TLE from HEX: \n\n',
       outputTLE
     ]
@@ -305,7 +153,7 @@ def create_gui():
 
     # CREATE BUTTON TO SAVE TLE FILE INTO TEXT
     def saveTLEtofile():
-        filename = satelliteName + '.txt'
+        filename = SATELLITE['name'] + '.txt'
         
         with open(filename, 'w') as file:
             file.write(outputTLE)
@@ -321,6 +169,65 @@ def create_gui():
     # RUN GUI
     root.mainloop()
 
-create_gui()
+
+def runGUI():
+  user_input = inputTLEHEXGUI()
+  print("TLE Packet = {} \n" .format(user_input))
+
+  # DECODE 32-BYTE DATA PACKET INTO TLE SECTIONS
+  tle = CODEC.decode(decodeHex(user_input))
+  printTLE(tle)
+
+  outputTLE = buildTLE(tle)
+  print(outputTLE)
+  create_gui(user_input, outputTLE)
+
+
+def readPackets(args):
+  # YIELD (LABEL, PACKET) FROM --hex, --file AND STDIN, HEX PACKETS ARE CONVERTED BY THE CALLER
+  for text in args.hex:
+    yield text, text
+  for filename in args.file:
+    if filename == '-':
+      data = sys.stdin.buffer.read()
+    else:
+      with open(filename, 'rb') as file:
+        data = file.read()
+    if len(data) % tlePacket.PACKET_LENGTH:
+      print('{}: {} trailing bytes ignored'.format(filename, len(data) % tlePacket.PACKET_LENGTH), file=sys.stderr)
+    for start in range(0, len(data) - tlePacket.PACKET_LENGTH + 1, tlePacket.PACKET_LENGTH):
+      yield '{}+{}'.format(filename, start), data[start:start + tlePacket.PACKET_LENGTH]
+  if not args.hex and not args.file:
+    for line in sys.stdin:
+      if line.strip():
+        yield line.strip(), line
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Decode 32-byte TLE packets into TLEs for Gpredict')
+  parser.add_argument('--hex', action='append', default=[], help='HEX packet 0xNNNN... (repeatable)')
+  parser.add_argument('--file', action='append', default=[], help="binary file of concatenated 32-byte packets, '-' for stdin (repeatable)")
+  parser.add_argument('--gui', action='store_true', help='use the Tk dialogs')
+  args = parser.parse_args(argv)
+
+  # NO PACKETS AND AN INTERACTIVE CONSOLE (E.G. THE .EXE) KEEPS THE GUI
+  if args.gui or (not args.hex and not args.file and sys.stdin.isatty()):
+    runGUI()
+    return 0
+
+  errors = 0
+  for label, packet in readPackets(args):
+    try:
+      if isinstance(packet, str):
+        packet = decodeHex(packet)
+      sys.stdout.write(buildTLE(CODEC.decode(packet)) + '\n')
+    except ValueError as error:
+      print('Bad packet {}: {}'.format(label, error), file=sys.stderr)
+      errors = 1
+  return errors
+
+
+if __name__ == "__main__":
+  sys.exit(main())
 
 # run "pyinstaller --onefile packetDecoder.py" to create .exe file
\ No newline at end of file
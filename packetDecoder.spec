@@ -13,7 +13,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['numpy', 'requests', 'unittest', 'pydoc', 'doctest'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
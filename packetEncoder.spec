@@ -5,7 +5,7 @@ block_cipher = None
 
 
 a = Analysis(
-    ['packetEncoder.py'],
+    ['TLEDataDownloader.py'],
     pathex=[],
     binaries=[],
     datas=[],
@@ -13,7 +13,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['unittest', 'pydoc', 'doctest'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -0,0 +1,502 @@
+"""
+PacketSchema
+DECLARATIVE TLE PACKET LAYOUTS AND SATELLITE CONSTANTS, COMPILED INTO ONE CODEC PER PACKET VERSION
+
+A LAYOUT LISTS EVERY PACKET FIELD ONCE: TLE KEY, FIELD NAME, BIT OFFSET, BIT WIDTH, KIND AND THE PARAMETERS OF THE KIND
+COMPILING A LAYOUT BUILDS THE SHIFT/MASK/BYTE TABLES OF THE NUMPY BATCH CODEC AND GENERATES STRAIGHT-LINE pack, unpack,
+encode AND decode FUNCTIONS WITH EVERY SHIFT, MASK AND SCALE WRITTEN IN AS A LITERAL, ONCE PER PROCESS AND VERSION
+A NEW SATELLITE IS ONE ENTRY IN SATELLITES AND A NEW PACKET REVISION ONE ENTRY IN LAYOUTS, NEITHER COSTS ANYTHING PER PACKET
+THE COMPILED FUNCTIONS ARE CACHED IN __pycache__ LIKE A .pyc, SO A STARTING TOOL ONLY COMPILES A LAYOUT THAT CHANGED
+
+NUMPY IS ONLY IMPORTED BY THE BATCH METHODS SO SINGLE-PACKET TOOLS START WITHOUT IT
+
+run "python packetSchema.py" to list the satellites and packet layouts
+run "python packetSchema.py --source 1" to print the functions generated for packet version 1
+"""
+
+import argparse
+import marshal
+import os
+import re
+import struct
+import sys
+
+PACKET_LENGTH = 32  # EVERY VERSION FILLS THE 4 UPLINK COMMANDS AND THE packetArchive RECORD
+
+# FIELD KINDS AND THEIR PARAMETERS
+#   epoch       fractionBits, decimals: YEAR AND DAY ABOVE THE DAY FRACTION x 10**decimals
+#   derivative  sign, fractionBits, decimals: SIGN FLAG SET WHEN POSITIVE, THE FIRST HALF OF THE DECIMALS ABOVE
+#               fractionBits AND THE SECOND HALF BELOW
+#   drag        sign, exponentBits, digits: MANTISSA DIGITS (ASSUMED LEADING DECIMAL POINT) ABOVE THE SIGN FLAG,
+#               SET WHEN POSITIVE, ABOVE THE NEGATIVE EXPONENT
+#   angle       fractionBits, decimals: INTEGER DEGREES ABOVE THE FRACTION x 10**decimals
+#   decimal     decimals: VALUE x 10**decimals
+#   float32     decimals: IEEE 754 SINGLE, DECODED WITH decimals DECIMALS
+KINDS = {
+    'epoch': ('fractionBits', 'decimals'),
+    'derivative': ('sign', 'fractionBits', 'decimals'),
+    'drag': ('sign', 'exponentBits', 'digits'),
+    'angle': ('fractionBits', 'decimals'),
+    'decimal': ('decimals',),
+    'float32': ('decimals',),
+}
+
+# PACKET VERSION -> FIELDS: TLE KEY, FIELD, BIT OFFSET FROM THE LEAST SIGNIFICANT BIT, BIT WIDTH, KIND, PARAMETERS
+LAYOUTS = {
+    1: (
+        ('epoch', 'EP', 212, 44, 'epoch', {'fractionBits': 27, 'decimals': 8}),  # 5.5 BYTES
+        ('derivative', 'DV', 180, 32, 'derivative', {'sign': 0x80000000, 'fractionBits': 16, 'decimals': 8}),  # 4 BYTES
+        ('drag', 'DT', 156, 24, 'drag', {'sign': 0x8, 'exponentBits': 3, 'digits': 5}),  # 3 BYTES
+        ('inclination', 'IN', 132, 24, 'angle', {'fractionBits': 16, 'decimals': 4}),  # 3 BYTES
+        ('raan', 'RN', 108, 24, 'angle', {'fractionBits': 15, 'decimals': 4}),  # 9-BIT INTEGER DEGREES
+        ('eccentricity', 'EC', 84, 24, 'decimal', {'decimals': 7}),  # 3 BYTES
+        ('argPerigee', 'AP', 60, 24, 'angle', {'fractionBits': 15, 'decimals': 4}),  # 9-BIT INTEGER DEGREES
+        ('meanAnomaly', 'MA', 32, 28, 'angle', {'fractionBits': 16, 'decimals': 4}),  # 3.5 BYTES
+        ('meanMotion', 'MM', 0, 32, 'float32', {'decimals': 8}),  # 4 BYTES
+    ),
+}
+
+# TLE CONSTANTS THE PACKET DOES NOT CARRY, AND THE PACKET VERSION EACH SATELLITE SENDS
+DEFAULT_SATELLITE = 'DIWATA-2B'
+SATELLITES = {
+    'DIWATA-2B': {
+        'name': 'DIWATA-2B',
+        'catalog': 43678,
+        'classification': 'U',
+        'designator': '18084H',  # LAUNCH YEAR, LAUNCH NUMBER AND PIECE
+        'secondDerivative': '00000+0',
+        'ephemeris': 0,
+        'elementSet': 999,  # ARBITRARY NUMBER
+        'revolution': 4801,  # ARBITRARY NUMBER
+        'packet': 1,
+    },
+    # ARBITRARY CONSTANTS FOR MICROORBITER-1
+    'MicroOrbiter-1': {
+        'name': 'MicroOrbiter-1',
+        'catalog': 59483,
+        'classification': 'U',
+        'designator': '98067WF',
+        'secondDerivative': '00000+0',
+        'ephemeris': 0,
+        'elementSet': 999,  # ARBITRARY NUMBER
+        'revolution': 4801,  # ARBITRARY NUMBER
+        'packet': 1,
+    },
+}
+
+_FLOAT = struct.Struct('>f')
+_FIELD_NAME = re.compile(r'[A-Z][A-Z0-9]*$')
+_TLE_KEY = re.compile(r'[a-z][A-Za-z0-9]*$')
+_RESERVED = ('tle', 'packet', 'fields')  # NAMES OF THE GENERATED FUNCTIONS' OWN VARIABLES
+
+
+class Field:
+    """One field of a packet layout and the bytes it spans"""
+
+    def __init__(self, key, name, offset, width, kind, params):
+        if not _TLE_KEY.match(key) or key in _RESERVED or not _FIELD_NAME.match(name):
+            raise ValueError('Field {} {} needs a lowerCamel TLE key and an UPPERCASE name'.format(key, name))
+        if kind not in KINDS:
+            raise ValueError('{}: unknown kind {}'.format(name, kind))
+        if sorted(params) != sorted(KINDS[kind]):
+            raise ValueError('{}: kind {} takes {}'.format(name, kind, ', '.join(KINDS[kind])))
+        if offset < 0 or width <= 0 or offset + width > PACKET_LENGTH * 8:
+            raise ValueError('{}: bits {}-{} are outside the packet'.format(name, offset, offset + width - 1))
+        self.key = key
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.kind = kind
+        self.mask = (1 << width) - 1
+        self.fractionBits = params.get('fractionBits')
+        self.decimals = params.get('decimals')
+        self.sign = params.get('sign')
+        self.exponentBits = params.get('exponentBits')
+        self.digits = params.get('digits')
+        if kind == 'float32' and width != 32:
+            raise ValueError('{}: a float32 field is 32 bits wide'.format(name))
+        if kind == 'drag' and self.sign != 1 << self.exponentBits:
+            raise ValueError('{}: the drag sign flag sits right above the exponent'.format(name))
+        if self.sign is not None and self.sign & ~self.mask:
+            raise ValueError('{}: sign flag {:#x} is outside the field'.format(name, self.sign))
+
+        # BYTES SPANNED BY THE FIELD AND THE SHIFT THAT RIGHT-ALIGNS IT
+        msbStart = PACKET_LENGTH * 8 - offset - width
+        self.firstByte = msbStart // 8
+        self.lastByte = (msbStart + width - 1) // 8
+        self.byteShift = (self.lastByte + 1) * 8 - (msbStart + width)
+        # WHOLE BYTES THAT numpy CAN READ AS ONE BIG ENDIAN INTEGER
+        self.aligned = not self.byteShift and not msbStart % 8 and width in (8, 16, 32, 64)
+
+
+def _decodeSource(field):
+    # (STATEMENTS, EXPRESSION) DECODING THE RAW VALUE IN THE VARIABLE NAMED LIKE THE FIELD
+    name = field.name
+    lines = []
+    if field.kind == 'epoch':
+        expression = '"{{:.{}f}}".format(({} >> {}) + ({} & {:#x}) / {!r})'.format(
+            field.decimals, name, field.fractionBits, name, (1 << field.fractionBits) - 1, float(10 ** field.decimals))
+    elif field.kind == 'derivative':
+        high = field.decimals // 2
+        lines.append("{0}_sign = '' if {0} & {1:#x} else '-'".format(name, field.sign))
+        lines.append('{0} = {0} & {1:#x}'.format(name, field.mask & ~field.sign))
+        # THE LEADING 0 OF 0.NNNNNNNN IS DROPPED
+        expression = '{}_sign + "{{:.{}f}}".format(round(({} >> {}) / {!r} + ({} & {:#x}) / {!r}, {}))[1:]'.format(
+            name, field.decimals, name, field.fractionBits, float(10 ** high), name, (1 << field.fractionBits) - 1,
+            float(10 ** field.decimals), field.decimals)
+    elif field.kind == 'drag':
+        lines.append("{0}_sign = '' if {0} & {1:#x} else '-'".format(name, field.sign))
+        lines.append('{0} = {0} & {1:#x}'.format(name, field.mask & ~field.sign))
+        expression = "{0}_sign + str({0} >> {1}).zfill({2}) + '-' + str({0} & {3:#x})".format(
+            name, field.exponentBits + 1, field.digits, field.sign - 1)
+    elif field.kind == 'angle':
+        expression = '"{{:.{}f}}".format(({} >> {}) + ({} & {:#x}) / {!r})'.format(
+            field.decimals, name, field.fractionBits, name, (1 << field.fractionBits) - 1, float(10 ** field.decimals))
+    elif field.kind == 'decimal':
+        expression = '"{{:.{}f}}".format({} / {!r})'.format(field.decimals, name, float(10 ** field.decimals))
+    else:
+        if field.aligned:
+            # READ IN PLACE, THE RAW VALUE IS NOT NEEDED
+            value = '_FLOAT.unpack_from(packet, {})[0]'.format(field.firstByte)
+        else:
+            value = "_FLOAT.unpack({}.to_bytes(4, 'big'))[0]".format(name)
+        expression = '"{{:.{}f}}".format({})'.format(field.decimals, value)
+    return lines, expression
+
+
+def _encodeSource(field):
+    # STATEMENTS SETTING THE VARIABLE NAMED LIKE THE FIELD FROM tle[KEY], AS RETURNED BY tlePacket.parseTLE
+    name = field.name
+    key = field.key
+    if field.kind == 'epoch':
+        return [
+            "{} = tle['{}']".format(key, key),
+            '{0} = (int({1}) << {2}) + int(round(({1} - int({1})) * {3!r}))'.format(
+                name, key, field.fractionBits, float(10 ** field.decimals)),
+        ]
+    if field.kind == 'derivative':
+        high = field.decimals // 2
+        return [
+            "{} = tle['{}']".format(key, key),
+            'if not isinstance({}, str):'.format(key),
+            '    {0} = "{{:.{1}f}}".format({0})'.format(key, field.decimals),
+            "{0}_digits = {0}.split('.')[1]".format(key),
+            '{0} = (int({1}_digits[0:{2}]) << {3}) + int({1}_digits[{2}:{4}])'.format(
+                name, key, high, field.fractionBits, field.decimals),
+            "if not {}.strip().startswith('-'):".format(key),
+            '    {0} = {0} + {1:#x}'.format(name, field.sign),
+        ]
+    if field.kind == 'drag':
+        return [
+            "{} = tle['{}']".format(key, key),
+            "{0}_positive = not {0}.startswith('-')".format(key),
+            "{0} = {0}.lstrip('+-')".format(key),
+            "if {0}[-2] == '+' and int({0}[-1]) != 0:".format(key),
+            "    raise ValueError('Drag term {{}} has a positive exponent'.format(tle['{}']))".format(key),
+            '{0} = (int({1}[:-2]) << {2}) + int({1}[-1])'.format(name, key, field.exponentBits + 1),
+            # SMALLER DRAG TERMS THAN THE EXPONENT CAN HOLD ARE SENT AS ZERO
+            'if int({}[-1]) > {}:'.format(key, (1 << field.exponentBits) - 1),
+            '    {} = 0'.format(name),
+            'if {}_positive:'.format(key),
+            '    {0} = {0} + {1:#x}'.format(name, field.sign),
+        ]
+    if field.kind == 'angle':
+        return [
+            "{0}_degrees, {0}_fraction = divmod(int(round(tle['{1}'] * {2!r})), {3})".format(
+                name, key, float(10 ** field.decimals), 10 ** field.decimals),
+            '{0} = ({0}_degrees << {1}) + {0}_fraction'.format(name, field.fractionBits),
+        ]
+    if field.kind == 'decimal':
+        return [
+            "{} = tle['{}']".format(key, key),
+            '{} = int({}) if isinstance({}, str) else int(round({} * {!r}))'.format(
+                name, key, key, key, float(10 ** field.decimals)),
+        ]
+    return ["{} = int.from_bytes(_FLOAT.pack(tle['{}']), 'big')".format(name, key)]
+
+
+def _packSource(fields):
+    # RANGE CHECK AND OR EVERY FIELD INTO THE PACKET INTEGER
+    lines = ['DATA_PACKET = 0']
+    for field in fields:
+        lines.extend([
+            'if {0} < 0 or {0} >> {1}:'.format(field.name, field.width),
+            "    raise ValueError('{} = {{:#x}} does not fit in {} bits'.format({}))".format(
+                field.name, field.width, field.name),
+            'DATA_PACKET = DATA_PACKET | ({} << {})'.format(field.name, field.offset),
+        ])
+    lines.append("return DATA_PACKET.to_bytes({}, 'big')".format(PACKET_LENGTH))
+    return lines
+
+
+def _unpackSource(fields):
+    return [
+        'if len(packet) != {}:'.format(PACKET_LENGTH),
+        "    raise ValueError('TLE packet must be {} bytes, got {{}}'.format(len(packet)))".format(PACKET_LENGTH),
+        "DATA_PACKET = int.from_bytes(packet, 'big')",
+    ] + ['{} = (DATA_PACKET >> {}) & {:#x}'.format(field.name, field.offset, field.mask) for field in fields]
+
+
+def _function(signature, docstring, lines):
+    return 'def {}:\n    """{}"""\n{}'.format(signature, docstring, ''.join('    ' + line + '\n' for line in lines))
+
+
+def generateSource(version, fields):
+    """Python source of pack, unpack, encode and decode for the fields of one layout"""
+    unpack = _unpackSource(fields)
+    # SINGLES READ IN PLACE NEED NO SHIFT AND MASK
+    decode = _unpackSource([field for field in fields if not (field.kind == 'float32' and field.aligned)])
+    result = []
+    for field in fields:
+        lines, expression = _decodeSource(field)
+        decode.extend(lines)
+        result.append("    '{}': {},".format(field.key, expression))
+    encode = []
+    for field in fields:
+        encode.extend(_encodeSource(field))
+    return '\n\n'.join([
+        '# PACKET VERSION {}, GENERATED BY packetSchema.py'.format(version),
+        _function('pack(fields)', 'Pack raw integer fields into the {}-byte packet'.format(PACKET_LENGTH),
+                  ["{} = fields['{}']".format(field.name, field.name) for field in fields] + _packSource(fields)),
+        _function('unpack(packet)', 'Unpack the {}-byte packet into raw integer fields'.format(PACKET_LENGTH),
+                  unpack + ['return {' + ', '.join("'{0}': {0}".format(field.name) for field in fields) + '}']),
+        _function('encode(tle)', 'Encode TLE fields (as returned by parseTLE) into the {}-byte packet'.format(
+            PACKET_LENGTH), encode + _packSource(fields)),
+        _function('decode(packet)', 'Decode the {}-byte packet into TLE-formatted field strings'.format(PACKET_LENGTH),
+                  decode + ['return {'] + result + ['}']),
+    ])
+
+
+def _compileSource(version, source):
+    # CODE OBJECT OF THE GENERATED SOURCE, CACHED NEXT TO THIS MODULE WITH THE SOURCE IT WAS COMPILED FROM
+    filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__',
+                            'packetSchema.v{}.{}.bin'.format(version, sys.implementation.cache_tag))
+    try:
+        with open(filename, 'rb') as file:
+            cachedSource, code = marshal.load(file)
+        if cachedSource == source:
+            return code
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    code = compile(source, '<packet version {}>'.format(version), 'exec')
+    if sys.dont_write_bytecode:
+        return code
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temporary = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(temporary, 'wb') as file:
+            marshal.dump((source, code), file)
+        os.replace(temporary, filename)
+    except OSError:
+        pass  # READ-ONLY INSTALL, COMPILE EVERY TIME
+    return code
+
+
+class PacketCodec:
+    """Encoder and decoder of one packet version, single packets and numpy batches"""
+
+    def __init__(self, version, layout):
+        self.version = version
+        self.fields = tuple(Field(*spec) for spec in layout)
+        self.byKey = {field.key: field for field in self.fields}
+        self.byName = {field.name: field for field in self.fields}
+        if len(self.byKey) != len(self.fields) or len(self.byName) != len(self.fields):
+            raise ValueError('Packet version {} repeats a TLE key or field name'.format(version))
+        used = 0
+        for field in self.fields:
+            if used & (field.mask << field.offset):
+                raise ValueError('Packet version {}: {} overlaps another field'.format(version, field.name))
+            used = used | (field.mask << field.offset)
+
+        # STRAIGHT-LINE SINGLE-PACKET FUNCTIONS, EVERY CONSTANT OF THE LAYOUT IS A LITERAL IN THEIR BYTECODE
+        self.source = generateSource(version, self.fields)
+        namespace = {'_FLOAT': _FLOAT}
+        exec(_compileSource(version, self.source), namespace)
+        self.pack = namespace['pack']
+        self.unpack = namespace['unpack']
+        self.encode = namespace['encode']
+        self.decode = namespace['decode']
+
+    def asPacketArray(self, packets):
+        """View packets as an N x 32 uint8 array.
+
+        Accepts an N x 32 uint8 array or any buffer of concatenated packets
+        (bytes, bytearray, memoryview, mmap) without copying.
+        """
+        import numpy as np
+        if isinstance(packets, np.ndarray):
+            array = packets
+        else:
+            array = np.frombuffer(packets, dtype=np.uint8)
+        if array.dtype != np.uint8 or array.size % PACKET_LENGTH:
+            raise ValueError('Packets must be uint8 and a multiple of {} bytes'.format(PACKET_LENGTH))
+        return array.reshape(-1, PACKET_LENGTH)
+
+    def unpackBatch(self, packets, names=None):
+        """Unpack every packet into raw uint64 field arrays (all fields unless names are given)"""
+        import numpy as np
+        packets = self.asPacketArray(packets)
+        fields = {}
+        for field in self.fields:
+            if names is not None and field.name not in names:
+                continue
+            if field.aligned:
+                fields[field.name] = packets[:, field.firstByte:field.lastByte + 1].view(
+                    '>u{}'.format(field.width // 8))[:, 0].astype(np.uint64)
+                continue
+            value = packets[:, field.firstByte].astype(np.uint64)
+            for byte in range(field.firstByte + 1, field.lastByte + 1):
+                value = (value << np.uint64(8)) | packets[:, byte]
+            fields[field.name] = (value >> np.uint64(field.byteShift)) & np.uint64(field.mask)
+        return fields
+
+    def packBatch(self, fields, ok=None):
+        """Pack raw integer field arrays into an N x 32 uint8 array, missing fields are left zero.
+
+        A value wider than its field raises ValueError, unless ok (a boolean
+        array per packet) is given: then its packet is cleared in ok and left
+        all zero.
+        """
+        import numpy as np
+        count = len(next(iter(fields.values())))
+        packets = np.zeros((count, PACKET_LENGTH), dtype=np.uint8)
+        for field in self.fields:
+            if field.name not in fields:
+                continue
+            value = np.asarray(fields[field.name], dtype=np.uint64)
+            overflow = np.flatnonzero(value >> np.uint64(field.width))
+            if overflow.size:
+                if ok is None:
+                    raise ValueError('{} does not fit in {} bits for packet {}'.format(
+                        field.name, field.width, overflow[0]))
+                ok[overflow] = False
+                value = np.where(value >> np.uint64(field.width), np.uint64(0), value)
+            value = value << np.uint64(field.byteShift)
+            for byte in range(field.lastByte, field.firstByte - 1, -1):
+                packets[:, byte] |= (value & np.uint64(0xFF)).astype(np.uint8)
+                value = value >> np.uint64(8)
+        if ok is not None:
+            packets[~ok] = 0
+        return packets
+
+    def decodeBatch(self, packets):
+        """Decode N packets into numeric float64 arrays keyed like decode()"""
+        fields = self.unpackBatch(packets)
+        return {field.key: _decodeColumn(field, fields[field.name]) for field in self.fields}
+
+    def encodeBatch(self, columns, ok=None):
+        """Encode numeric field arrays (keyed like decodeBatch(), see tlePacket.tleColumns) into N x 32 packets.
+
+        With ok (a boolean array per row), rows that cannot be encoded are
+        cleared in ok and left all zero instead of raising ValueError.
+        """
+        return self.packBatch({field.name: _encodeColumn(field, columns[field.key], ok) for field in self.fields}, ok)
+
+
+def _decodeColumn(field, value):
+    # FLOAT64 ARRAY OF A RAW uint64 FIELD ARRAY
+    import numpy as np
+    if field.kind in ('epoch', 'angle'):
+        return (value >> np.uint64(field.fractionBits)) + \
+            (value & np.uint64((1 << field.fractionBits) - 1)) / float(10 ** field.decimals)
+    if field.kind == 'derivative':
+        high = (value & np.uint64(field.mask & ~field.sign)) >> np.uint64(field.fractionBits)
+        magnitude = high / float(10 ** (field.decimals // 2)) + \
+            (value & np.uint64((1 << field.fractionBits) - 1)) / float(10 ** field.decimals)
+        return np.where(value & np.uint64(field.sign), magnitude, -magnitude)
+    if field.kind == 'drag':
+        # MANTISSA WITH ASSUMED LEADING DECIMAL POINT AND NEGATIVE EXPONENT
+        exponent = (value & np.uint64(field.sign - 1)).astype(np.float64)
+        magnitude = (value >> np.uint64(field.exponentBits + 1)) * float('1e-{}'.format(field.digits)) * 10.0 ** -exponent
+        return np.where(value & np.uint64(field.sign), magnitude, -magnitude)
+    if field.kind == 'decimal':
+        return value / float(10 ** field.decimals)
+    return value.astype(np.uint32).view(np.float32).astype(np.float64)
+
+
+def _encodeColumn(field, column, ok=None):
+    # RAW uint64 FIELD ARRAY OF A NUMERIC COLUMN; ROWS THAT CANNOT BE ENCODED RAISE, OR ARE CLEARED IN ok
+    import numpy as np
+    column = np.asarray(column, dtype=np.float64)
+    if field.kind == 'epoch':
+        day = np.floor(column)
+        return (day.astype(np.uint64) << np.uint64(field.fractionBits)) + \
+            np.round((column - day) * float(10 ** field.decimals)).astype(np.uint64)
+    if field.kind == 'derivative':
+        high = np.uint64(10 ** (field.decimals - field.decimals // 2))
+        magnitude = np.round(np.abs(column) * float(10 ** field.decimals)).astype(np.uint64)
+        value = ((magnitude // high) << np.uint64(field.fractionBits)) + magnitude % high
+        return np.where(np.signbit(column), value, value + np.uint64(field.sign))
+    if field.kind == 'drag':
+        # NORMALISE TO A digits-DIGIT MANTISSA AND NEGATIVE EXPONENT
+        magnitude = np.abs(column)
+        nonZero = magnitude > 0
+        power = np.zeros_like(column)
+        power[nonZero] = np.floor(np.log10(magnitude[nonZero])) + 1
+        mantissa = np.round(magnitude * 10.0 ** -power * float(10 ** field.digits))
+        carry = mantissa >= 10 ** field.digits  # ROUNDED UP TO 10**digits
+        mantissa[carry] = mantissa[carry] / 10
+        exponent = -(power + carry)
+        positive = exponent < 0
+        if np.any(positive):
+            if ok is None:
+                raise ValueError('Drag term {} has a positive exponent'.format(column[np.argmax(positive)]))
+            ok[positive] = False
+            mantissa[positive] = 0
+            exponent[positive] = 0
+        underflow = exponent > (1 << field.exponentBits) - 1
+        mantissa[underflow] = 0
+        exponent[underflow] = 0
+        value = (mantissa.astype(np.uint64) << np.uint64(field.exponentBits + 1)) + exponent.astype(np.uint64)
+        return np.where(np.signbit(column), value, value + np.uint64(field.sign))
+    if field.kind == 'angle':
+        scale = 10 ** field.decimals
+        value = np.round(column * float(scale)).astype(np.uint64)
+        return ((value // np.uint64(scale)) << np.uint64(field.fractionBits)) + value % np.uint64(scale)
+    if field.kind == 'decimal':
+        return np.round(column * float(10 ** field.decimals)).astype(np.uint64)
+    return column.astype(np.float32).view(np.uint32).astype(np.uint64)
+
+
+_codecs = {}
+
+
+def codec(version):
+    """PacketCodec of a packet version, compiled on first use"""
+    compiled = _codecs.get(version)
+    if compiled is None:
+        if version not in LAYOUTS:
+            raise ValueError('Unknown packet version {}, known: {}'.format(version, ', '.join(map(str, LAYOUTS))))
+        compiled = _codecs[version] = PacketCodec(version, LAYOUTS[version])
+    return compiled
+
+
+def codecFor(satellite):
+    """PacketCodec of the packet version a satellite (constants dict or name in SATELLITES) sends"""
+    if isinstance(satellite, str):
+        satellite = SATELLITES[satellite]
+    return codec(satellite.get('packet', SATELLITES[DEFAULT_SATELLITE]['packet']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List the satellites and packet layouts or print a generated codec')
+    parser.add_argument('--source', type=int, metavar='VERSION', help='print the generated functions of a packet version')
+    args = parser.parse_args(argv)
+
+    if args.source is not None:
+        print(codec(args.source).source)
+        return 0
+
+    for name, satellite in SATELLITES.items():
+        print('{:16} catalog {:05d} designator {:8} packet version {}'.format(
+            name, satellite['catalog'], satellite['designator'], satellite['packet']))
+    for version in LAYOUTS:
+        print('\nPacket version {}'.format(version))
+        for field in codec(version).fields:
+            print('  {:3} bits {:3}-{:3} {:12} {}'.format(field.name, field.offset, field.offset + field.width - 1,
+                                                         field.kind, field.key))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+PassScheduler
+NEXT PASSES OF A WHOLE CATALOG, PREDICTED IN A PROCESS POOL AND MERGED INTO ONE TIME-ORDERED TABLE
+
+run "python passScheduler.py" for every satellite of the cached CelesTrak active catalog
+run "python passScheduler.py diwataTLE.txt MicroOrbiter-1.txt --hours 48 --horizon 10" for TLE files
+"""
+
+import argparse
+import heapq
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import satellitePredict
+from catalogStore import CatalogStore
+
+SHARDS_PER_WORKER = 4  # SMALLER SHARDS KEEP THE POOL BUSY WHEN SOME SHARDS HAVE MORE PASSES
+
+
+def _predictShard(shard, start, options, first=0):
+    # RUNS IN A WORKER PROCESS: ONE TIME-ORDERED LIST OF PASSES FOR THE SHARD STARTING AT ENTRY first
+    table = []
+    for index, ((name, _, _), passes) in enumerate(zip(shard, satellitePredict.predictPasses(shard, start=start, **options))):
+        for p in passes:
+            p['satellite'] = name
+            p['entry'] = first + index  # SATELLITES WITH THE SAME NAME STAY APART
+            table.append(p)
+    table.sort(key=lambda p: p['aos'])
+    return table
+
+
+def shard(entries, workers, shardSize=None):
+    """Split entries into contiguous shards, several per worker unless a size is given"""
+    if shardSize is None:
+        shardSize = max(1, math.ceil(len(entries) / (workers * SHARDS_PER_WORKER)))
+    return [entries[first:first + shardSize] for first in range(0, len(entries), shardSize)]
+
+
+def schedulePasses(entries, start=None, workers=None, shardSize=None, **options):
+    """Passes of every (name, line1, line2) entry as one table ordered by AOS.
+
+    Satellites are sharded across a pool of worker processes (all cores by
+    default, workers=1 predicts in this process). Each row is a pass dict
+    from satellitePredict.predictPasses() with its 'satellite' name and the
+    'entry' index of its satellite in entries; options are passed on to it
+    (hours, horizon, latitude, ...).
+    """
+    if start is None:
+        start = datetime.now(timezone.utc)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shards = shard(entries, workers, shardSize)
+
+    if workers == 1 or len(shards) == 1:
+        tables = [_predictShard(entries, start, options)]
+    else:
+        firsts = [0]
+        for part in shards[:-1]:
+            firsts.append(firsts[-1] + len(part))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(_predictShard, shards, [start] * len(shards), [options] * len(shards), firsts))
+
+    # EVERY SHARD IS ALREADY SORTED, SO A K-WAY MERGE IS ENOUGH
+    return list(heapq.merge(*tables, key=lambda p: p['aos']))
+
+
+def markConflicts(table):
+    """Group overlapping passes of a table ordered by AOS; returns the conflict groups.
+
+    Passes that overlap directly or through a chain of overlaps share a
+    'group' number. Every pass gets 'conflict' set to True when its group
+    holds more than one pass, i.e. a single antenna cannot work them all.
+    """
+    groups = []
+    current = []
+    end = None
+    for p in table:
+        if end is None or p['aos'] >= end:
+            current = []
+            groups.append(current)
+            end = p['los']
+        else:
+            end = max(end, p['los'])
+        p['group'] = len(groups) - 1
+        current.append(p)
+    for group in groups:
+        for p in group:
+            p['conflict'] = len(group) > 1
+    return [group for group in groups if len(group) > 1]
+
+
+def printSchedule(table):
+    for p in table:
+        print('{:%Y-%m-%d %H:%M:%S}  {:%H:%M:%S}  {:%H:%M:%S}  {:5.1f}  {:<4} {}'.format(
+            p['aos'], p['tca'], p['los'], p['maxElevation'], '!' if p['conflict'] else '', p['satellite']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pass table for a catalog of satellites')
+    parser.add_argument('files', nargs='*', help='TLE files (default: the cached CelesTrak active catalog)')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='UTC start, e.g. 2023-04-19T00:00 (default: now)')
+    parser.add_argument('--hours', type=float, default=satellitePredict.HOURS, help='prediction window (default: %(default)s)')
+    parser.add_argument('--horizon', type=float, default=satellitePredict.HORIZON, help='minimum elevation in degrees (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    if args.files:
+        entries = satellitePredict.readTLEFiles(args.files)
+    else:
+        entries = CatalogStore().load().entries
+    if not entries:
+        print('No TLEs found', file=sys.stderr)
+        return 1
+
+    table = schedulePasses(entries, start=args.start, workers=args.workers, hours=args.hours, horizon=args.horizon)
+    conflicts = markConflicts(table)
+    print('AOS (UTC)            TCA       LOS       MAX EL      SATELLITE')
+    printSchedule(table)
+    print('\n{} passes of {} satellites, {} groups of overlapping passes'.format(len(table), len(entries), len(conflicts)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
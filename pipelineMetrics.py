@@ -0,0 +1,149 @@
+"""
+PipelineMetrics
+LATENCY HISTOGRAMS AND COUNTERS OF THE RECEIVE -> DECODE -> PUBLISH PIPELINE OF THE GROUND STATION
+
+STAGES ARE TIMED WITH THE MONOTONIC time.perf_counter; EACH HISTOGRAM HAS 10 LOG-SPACED BUCKETS PER DECADE
+FROM 100 ns TO 10 s, SO p50 AND p99 ARE ACCURATE TO ONE BUCKET (ABOUT 26%)
+THE RECEIVER DUMPS A JSON SNAPSHOT EVERY FEW SECONDS, SWAPPED IN WHOLE LIKE THE TLE FILE
+
+run "python groundStationCore.py --metrics pipelineMetrics.json" to receive with metrics enabled
+run "python pipelineMetrics.py pipelineMetrics.json" to print the latest snapshot
+"""
+
+import argparse
+import bisect
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+clock = time.perf_counter
+
+METRICS_FILE = 'pipelineMetrics.json'
+INTERVAL = 10.0  # SECONDS BETWEEN SNAPSHOTS
+
+# SOCKET READ -> DEFRAME -> UNESCAPE -> DECODE -> FORMAT -> PUBLISH, THEN THE DEBOUNCED FILE WRITE
+# latency IS SOCKET READ TO PUBLISH OF EVERY NEW PACKET
+STAGES = ('deframe', 'unescape', 'decode', 'format', 'publish', 'write', 'latency')
+
+BUCKETS_PER_DECADE = 10
+MIN_SECONDS = 1e-7
+MAX_SECONDS = 10.0
+_EDGES = [MIN_SECONDS * 10 ** (i / BUCKETS_PER_DECADE)
+          for i in range(8 * BUCKETS_PER_DECADE + 1)]  # UPPER BUCKET EDGES, 1e-7 TO 10 s
+
+
+class Histogram:
+    """Log-bucketed histogram of durations in seconds"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_EDGES) + 1)  # LAST BUCKET HOLDS EVERYTHING ABOVE MAX_SECONDS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(_EDGES, seconds)] += 1
+        self.count = self.count + 1
+        self.total = self.total + seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the given fraction of samples, capped at the maximum"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen = seen + count
+            if seen >= rank and count:
+                return min(_EDGES[index], self.max) if index < len(_EDGES) else self.max
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.total / self.count,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+
+class PipelineMetrics:
+    """Per-stage histograms and event counters, shared by the receive loop and the TLE publishers"""
+
+    def __init__(self, filename=METRICS_FILE, interval=INTERVAL):
+        self.filename = filename
+        self.interval = interval
+        self.started = time.time()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.counters = collections.Counter()  # frames, badFrames, duplicates, unrouted, ...
+        self.dumps = 0
+        # TLEPublisher WRITES FROM ITS TIMER THREAD
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.histograms[stage].add(seconds)
+
+    def count(self, name, increment=1):
+        with self._lock:
+            self.counters[name] = self.counters[name] + increment
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'time': time.time(),
+                'uptime': time.time() - self.started,
+                'counters': dict(self.counters),
+                'stages': {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+            }
+
+    def dump(self):
+        """Write a snapshot to the metrics file, replacing the previous one whole"""
+        # A TEMPORARY FILE OF ITS OWN, SO TWO DUMPS OR TWO RECEIVERS NEVER WRITE INTO THE SAME ONE
+        fd, temporary = tempfile.mkstemp(prefix=os.path.basename(self.filename) + '.', suffix='.tmp',
+                                         dir=os.path.dirname(self.filename) or '.')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(self.snapshot(), file, indent=1)
+            os.replace(temporary, self.filename)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.dumps = self.dumps + 1
+
+
+def formatSnapshot(snapshot):
+    """Printable lines of a snapshot, durations in microseconds"""
+    lines = ['{:.0f} s of receiving'.format(snapshot['uptime'])]
+    for name, value in sorted(snapshot['counters'].items()):
+        lines.append('{:>12}: {}'.format(name, value))
+    lines.append('{:>12}  {:>8} {:>10} {:>10} {:>10} {:>10}'.format('stage', 'count', 'mean us', 'p50 us', 'p99 us', 'max us'))
+    for stage, summary in snapshot['stages'].items():
+        if not summary['count']:
+            continue
+        lines.append('{:>12}  {:>8} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}'.format(
+            stage, summary['count'], summary['mean'] * 1e6, summary['p50'] * 1e6, summary['p99'] * 1e6,
+            summary['max'] * 1e6))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print a ground station metrics snapshot')
+    parser.add_argument('filename', nargs='?', default=METRICS_FILE, help='(default: %(default)s)')
+    args = parser.parse_args(argv)
+    with open(args.filename) as file:
+        print('\n'.join(formatSnapshot(json.load(file))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
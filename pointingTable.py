@@ -0,0 +1,203 @@
+"""
+PointingTable
+AZ/EL SETPOINTS FOR A WHOLE PASS AT THE 100 MS CONTROL TICK OF RotatorControl.ino
+
+THE TABLE IS COMPUTED IN ONE VECTORIZED SGP4 CALL AND STORED AS FLOAT32 (WINDUP AZIMUTH, ELEVATION) ROWS
+THE WINDUP AZIMUTH IS THE CONTINUOUS ANGLE THE FIRMWARE COUNTS IN getWindup(), KEPT WITHIN WINDUP_LIMIT
+
+run "python pointingTable.py --emulate --preview" to replay the next pass of diwataTLE.txt to the rotator emulator now
+run "python pointingTable.py --port /dev/ttyUSB0" to wait for the next pass and track it
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sgp4.api import Satrec, jday
+
+import satellitePredict
+
+TICK = 0.1  # SECONDS, Timer t1(100) IN THE FIRMWARE
+WINDUP_LIMIT = 450.0  # DEGREES FROM HOME BEFORE THE FIRMWARE UNWINDS THE ANTENNA
+APPROACH_STEP = 90.0  # DEGREES BETWEEN PRE-POSITIONING WAYPOINTS, SHORTEST PATH IS TAKEN BELOW 180
+APPROACH_TOLERANCE = 5.0  # DEGREES
+APPROACH_TIMEOUT = 120.0  # SECONDS TO REACH EACH WAYPOINT
+
+
+class PointingTable:
+    """Setpoints of one pass: row i is due at start + i * tick"""
+
+    def __init__(self, name, start, tick, data):
+        self.name = name
+        self.start = start
+        self.tick = tick
+        self.data = data  # FLOAT32 N x 2: WINDUP AZIMUTH, ELEVATION
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def end(self):
+        return self.start + timedelta(seconds=self.tick * (len(self.data) - 1))
+
+    @property
+    def maxWindup(self):
+        return float(np.max(np.abs(self.data[:, 0])))
+
+
+def windupAzimuth(azimuth, currentWindup=0.0, limit=WINDUP_LIMIT):
+    """Continuous azimuth track for 0..360 azimuths, on the turn closest to currentWindup.
+
+    The firmware counts windup from the -180..180 azimuth it started at and
+    unwinds the antenna beyond +-limit, so the turn is chosen to keep the
+    whole pass inside the limit; among those the one needing the least
+    rotation before AOS wins.
+    """
+    track = np.unwrap(azimuth, period=360.0)
+    track = track - 360.0 * np.round(track[0] / 360.0)  # FIRST POINT IN -180..180
+    turns = np.arange(-2, 3) * 360.0
+    excursion = np.array([np.max(np.abs(track + turn)) for turn in turns])
+    inside = excursion <= limit
+    if inside.any():
+        cost = np.where(inside, np.abs(track[0] + turns - currentWindup), np.inf)
+    else:
+        cost = excursion
+    return track + turns[np.argmin(cost)]
+
+
+def buildTable(entry, aos, los, tick=TICK, currentWindup=0.0, latitude=satellitePredict.LATITUDE,
+               longitude=satellitePredict.LONGITUDE, altitude=satellitePredict.ALTITUDE):
+    """PointingTable for a (name, line1, line2) entry between two UTC datetimes"""
+    satrec = Satrec.twoline2rv(entry[1], entry[2])
+    station = satellitePredict.stationECEF(latitude, longitude, altitude)
+
+    seconds = np.arange(0.0, (los - aos).total_seconds() + tick / 2, tick)
+    jd0, fr0 = jday(aos.year, aos.month, aos.day, aos.hour, aos.minute, aos.second + aos.microsecond * 1e-6)
+    jd = np.full(len(seconds), jd0)
+    fr = fr0 + seconds / 86400.0
+    error, r, _ = satrec.sgp4_array(jd, fr)
+    if error.any():
+        raise ValueError('SGP4 error {} for {}'.format(int(error[error != 0][0]), entry[0]))
+    azimuth, elevation, _ = satellitePredict.lookAngles(r, jd, fr, station)
+
+    data = np.empty((len(seconds), 2), dtype=np.float32)
+    data[:, 0] = windupAzimuth(azimuth, currentWindup)
+    data[:, 1] = np.clip(elevation, 0.0, 90.0)
+    return PointingTable(entry[0], aos, tick, data)
+
+
+def approach(fromWindup, toWindup, step=APPROACH_STEP):
+    """Waypoints that turn the antenna to toWindup the long way round when needed.
+
+    The firmware always takes the shortest path to a setpoint, so a target
+    more than 180 degrees away has to be reached in smaller steps.
+    """
+    count = int(np.ceil(abs(toWindup - fromWindup) / step))
+    return [float(waypoint) for waypoint in np.linspace(fromWindup, toWindup, count + 1)[1:]]
+
+
+async def prePosition(client, table, currentWindup=0.0):
+    """Drive the antenna to the first row of the table on the right turn before AOS"""
+    for waypoint in approach(currentWindup, float(table.data[0, 0])):
+        client.point(waypoint, float(table.data[0, 1]))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + APPROACH_TIMEOUT
+        while loop.time() < deadline:
+            azimuth, _ = await client.getAzEl()
+            if abs((azimuth - waypoint + 180.0) % 360.0 - 180.0) < APPROACH_TOLERANCE:
+                break
+            await asyncio.sleep(0.5)
+
+
+async def replay(client, table, start=None):
+    """Send every row of the table at its tick and return the send jitter statistics.
+
+    start defaults to the table start; rows that are already due are skipped.
+    Jitter is measured as the lateness of each send against its deadline.
+    """
+    if start is None:
+        start = table.start
+    loop = asyncio.get_running_loop()
+    origin = loop.time() + (start - datetime.now(timezone.utc)).total_seconds()
+    first = max(0, int(np.ceil((loop.time() - origin) / table.tick)))
+
+    lateness = np.empty(len(table) - first)
+    for i in range(first, len(table)):
+        deadline = origin + i * table.tick
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness[i - first] = loop.time() - deadline
+        azimuth, elevation = table.data[i]
+        client.point(float(azimuth), float(elevation))
+
+    lateness = lateness * 1000.0
+    return {
+        'sent': len(lateness),
+        'meanMs': float(np.mean(lateness)) if len(lateness) else 0.0,
+        'p99Ms': float(np.percentile(lateness, 99)) if len(lateness) else 0.0,
+        'maxMs': float(np.max(lateness)) if len(lateness) else 0.0,
+    }
+
+
+async def run(args):
+    import rotatorClient
+
+    entries = satellitePredict.readTLEFiles([args.tle])
+    if not entries:
+        print('No TLE in {}'.format(args.tle), file=sys.stderr)
+        return 1
+    entry = entries[0]
+    passes = satellitePredict.predictPasses([entry], start=args.start, hours=args.hours)[0]
+    if not passes:
+        print('No pass of {} in the next {} hours'.format(entry[0], args.hours))
+        return 1
+    p = passes[0]
+
+    begin = datetime.now()
+    table = buildTable(entry, p['aos'], p['los'], currentWindup=args.windup)
+    elapsed = (datetime.now() - begin).total_seconds()
+    print('{} AOS {:%Y-%m-%d %H:%M:%S} LOS {:%H:%M:%S} MAX EL {:.1f}'.format(entry[0], p['aos'], p['los'], p['maxElevation']))
+    print('{} rows, {} bytes, built in {:.1f} ms, max windup {:.1f} deg'.format(
+        len(table), table.data.nbytes, elapsed * 1000, table.maxWindup))
+    if not args.port and not args.emulate:
+        return 0
+
+    emulator = None
+    port = args.port
+    if args.emulate:
+        import rotatorEmulator
+        emulator = rotatorEmulator.RotatorEmulator(slewRate=60.0).start()
+        port = emulator.port
+    client = await rotatorClient.RotatorClient.open(port)
+    async with client:
+        await prePosition(client, table, args.windup)
+        start = datetime.now(timezone.utc) if args.preview else None
+        jitter = await replay(client, table, start)
+    print('{sent} setpoints, lateness mean {meanMs:.2f} ms, p99 {p99Ms:.2f} ms, max {maxMs:.2f} ms'.format(**jitter))
+    print('{} coalesced by the client'.format(client.coalesced))
+    if emulator is not None:
+        emulator.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute and replay the pointing table of the next pass')
+    parser.add_argument('--tle', default='diwataTLE.txt', help='TLE file of the satellite (default: %(default)s)')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='UTC time to search passes from (default: now)')
+    parser.add_argument('--hours', type=float, default=satellitePredict.HOURS, help='pass search window (default: %(default)s)')
+    parser.add_argument('--windup', type=float, default=0.0, help='current antenna windup in degrees (default: %(default)s)')
+    parser.add_argument('--port', help='serial port of the rotator controller')
+    parser.add_argument('--emulate', action='store_true', help='replay to a pty stand-in instead of a serial port')
+    parser.add_argument('--preview', action='store_true', help='replay the table starting now instead of at AOS')
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+RotatorClient
+ASYNCIO EASYCOMM II CLIENT FOR RotatorControl.ino OVER ITS 9600-BAUD SERIAL LINK
+
+SETPOINTS ARE COALESCED: ONLY THE NEWEST ONE IS WRITTEN WHEN THE LINK IS BUSY
+QUERIES ARE PIPELINED: REPLIES ARE MATCHED TO QUERIES IN ORDER BY A SEPARATE READER TASK
+
+run "python rotatorClient.py --port /dev/ttyUSB0" (COM3 on Windows) to track the satellite in diwataTLE.txt
+run "python rotatorClient.py --emulate" to track against the pty stand-in from rotatorEmulator.py
+"""
+
+import argparse
+import asyncio
+import collections
+import functools
+import os
+import re
+import sys
+from datetime import datetime, timezone
+
+BAUD = 9600
+QUERY = b'AZ EL \n'  # EASYCOMM II POSITION QUERY
+MAX_PENDING = 4  # QUERIES IN FLIGHT, FURTHER QUERIES SHARE THE NEWEST ONE
+QUERY_TIMEOUT = 1.0  # SECONDS
+TRACK_PERIOD = 0.5  # SECONDS BETWEEN SETPOINTS WHILE TRACKING
+
+_REPLY = re.compile(rb'AZ(-?\d+(?:\.\d*)?) EL(-?\d+(?:\.\d*)?)')
+
+
+def positionCommand(azimuth, elevation):
+    """Easycomm II position command, azimuth wrapped to 0..360 and elevation clamped to 0..90"""
+    return 'AZ{:.1f} EL{:.1f}\n'.format(azimuth % 360.0, min(max(elevation, 0.0), 90.0)).encode()
+
+
+def parseAzEl(line):
+    """(azimuth, elevation) from a printAzEl() line, None for any other line"""
+    match = _REPLY.match(line.strip())
+    if match is None:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+async def openSerial(port, baud=BAUD):
+    """(reader, writer) streams for a serial port.
+
+    Uses pyserial-asyncio when it is installed; otherwise POSIX ttys (and
+    ptys) are opened raw with termios.
+    """
+    try:
+        import serial_asyncio
+    except ImportError:
+        serial_asyncio = None
+    if serial_asyncio is not None:
+        return await serial_asyncio.open_serial_connection(url=port, baudrate=baud)
+    if os.name != 'posix':
+        raise ImportError('pyserial-asyncio is needed for serial ports on this platform')
+
+    import termios
+    import tty
+    fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    tty.setraw(fd)
+    attributes = termios.tcgetattr(fd)
+    attributes[4] = attributes[5] = getattr(termios, 'B{}'.format(baud))
+    termios.tcsetattr(fd, termios.TCSANOW, attributes)
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, 'rb', buffering=0))
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin,
+                                                        os.fdopen(os.dup(fd), 'wb', buffering=0))
+    return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+
+
+class RotatorClient:
+    """Easycomm II rotator on a pair of asyncio streams"""
+
+    def __init__(self, reader, writer, baud=BAUD):
+        self.reader = reader
+        self.writer = writer
+        self.baud = baud
+        self.position = None  # LAST (azimuth, elevation) REPORTED BY THE ROTATOR
+        self.setpoints = 0
+        self.coalesced = 0
+        self.replies = 0
+        self._setpoint = None
+        self._queries = 0  # QUERIES WAITING TO BE WRITTEN
+        self._pending = collections.deque()  # FUTURES OF QUERIES WAITING FOR A REPLY
+        self._wake = asyncio.Event()
+        self._tasks = []
+
+    @classmethod
+    async def open(cls, port, baud=BAUD):
+        reader, writer = await openSerial(port, baud)
+        return cls(reader, writer, baud).start()
+
+    def start(self):
+        self._tasks = [asyncio.ensure_future(self._readLoop()), asyncio.ensure_future(self._writeLoop())]
+        return self
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def point(self, azimuth, elevation):
+        """Set the antenna direction; replaces a setpoint that has not been written yet"""
+        if self._setpoint is not None:
+            self.coalesced = self.coalesced + 1
+        self._setpoint = positionCommand(azimuth, elevation)
+        self.setpoints = self.setpoints + 1
+        self._wake.set()
+
+    def query(self):
+        """Future of the next (azimuth, elevation) reply, without waiting for earlier replies"""
+        if len(self._pending) >= MAX_PENDING:
+            return self._pending[-1]
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        self._queries = self._queries + 1
+        self._wake.set()
+        return future
+
+    async def getAzEl(self, timeout=QUERY_TIMEOUT):
+        """Query the rotator and wait for its reply"""
+        future = self.query()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            # A LOST REPLY MUST NOT SHIFT LATER REPLIES ONTO THE WRONG QUERIES
+            if future in self._pending:
+                self._pending.remove(future)
+            raise
+
+    async def _writeLoop(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._setpoint is not None or self._queries:
+                data = b''
+                if self._setpoint is not None:
+                    data = self._setpoint
+                    self._setpoint = None
+                data = data + QUERY * self._queries
+                self._queries = 0
+                self.writer.write(data)
+                await self.writer.drain()
+                # PACE TO THE LINE RATE SO STALE SETPOINTS ARE REPLACED HERE INSTEAD OF QUEUING IN THE UART
+                await asyncio.sleep(len(data) * 10 / self.baud)
+
+    async def _readLoop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError('rotator closed the serial port')
+                position = parseAzEl(line)
+                if position is None:
+                    continue  # USER COMMAND OUTPUT, CALIBRATION DATA, ...
+                self.position = position
+                self.replies = self.replies + 1
+                while self._pending:
+                    future = self._pending.popleft()
+                    if not future.done():
+                        future.set_result(position)
+                        break
+        except ConnectionError as error:
+            while self._pending:
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(error)
+            raise
+
+
+def printFeedback(azimuth, elevation, done):
+    """done callback of query(): the set point next to the reported position, nothing when the query failed"""
+    if done.cancelled() or done.exception() is not None:
+        return
+    print('SET AZ {:6.1f} EL {:5.1f}  ROTATOR AZ {:6.1f} EL {:5.1f}'.format(azimuth, elevation, *done.result()))
+
+
+async def track(client, entry, period=TRACK_PERIOD, duration=None, verbose=True):
+    """Stream setpoints for a (name, line1, line2) TLE every period seconds.
+
+    Below the horizon the antenna is held at the satellite azimuth with 0
+    elevation, ready for AOS.
+    """
+    import numpy as np
+    from sgp4.api import Satrec, jday
+
+    import satellitePredict
+
+    satrec = Satrec.twoline2rv(entry[1], entry[2])
+    station = satellitePredict.stationECEF()
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    tick = begin
+    while duration is None or tick - begin < duration:
+        now = datetime.now(timezone.utc)
+        jd, fr = jday(now.year, now.month, now.day, now.hour, now.minute, now.second + now.microsecond * 1e-6)
+        error, r, _ = satrec.sgp4(jd, fr)
+        if error != 0:
+            print('SGP4 error {} for {}, is the TLE too old?'.format(error, entry[0]))
+            return
+        azimuth, elevation, _ = satellitePredict.lookAngles(np.array(r), jd, fr, station)
+        client.point(float(azimuth), float(elevation))
+        feedback = client.query()
+        if verbose:
+            feedback.add_done_callback(functools.partial(printFeedback, azimuth, elevation))
+        tick = tick + period
+        await asyncio.sleep(max(0.0, tick - loop.time()))
+
+
+async def run(args):
+    emulator = None
+    port = args.port
+    if args.emulate:
+        import rotatorEmulator
+        emulator = rotatorEmulator.RotatorEmulator().start()
+        port = emulator.port
+
+    import satellitePredict
+    entries = satellitePredict.readTLEFiles([args.tle])
+    if not entries:
+        print('No TLE in {}'.format(args.tle), file=sys.stderr)
+        return 1
+
+    client = await RotatorClient.open(port, args.baud)
+    async with client:
+        print('Tracking {} on {}'.format(entries[0][0], port))
+        await track(client, entries[0], period=args.period, duration=args.duration)
+    print('{} setpoints, {} coalesced, {} replies'.format(client.setpoints, client.coalesced, client.replies))
+    if emulator is not None:
+        emulator.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive the Easycomm II rotator from a TLE')
+    parser.add_argument('--port', help='serial port of the rotator controller')
+    parser.add_argument('--emulate', action='store_true', help='use a pty stand-in instead of a serial port')
+    parser.add_argument('--baud', type=int, default=BAUD, help='(default: %(default)s)')
+    parser.add_argument('--tle', default='diwataTLE.txt', help='TLE file of the satellite (default: %(default)s)')
+    parser.add_argument('--period', type=float, default=TRACK_PERIOD, help='seconds between setpoints (default: %(default)s)')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    args = parser.parse_args(argv)
+    if not args.port and not args.emulate:
+        parser.error('--port or --emulate is required')
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
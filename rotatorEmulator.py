@@ -0,0 +1,175 @@
+"""
+RotatorEmulator
+PTY STAND-IN FOR RotatorControl.ino: EASYCOMM II COMMANDS IN, printAzEl() FEEDBACK OUT
+
+AZIMUTH FOLLOWS THE FIRMWARE: SHORTEST PATH TO THE SET POINT (diffAngle) ACROSS SOUTH (-180/180), WINDUP COUNTED FROM
+NORTH, AND BEYOND WINDUP_LIMIT THE ANTENNA UNWINDS TOWARDS NORTH UNTIL IT IS WITHIN 175 DEGREES OF IT
+
+run "python rotatorEmulator.py" and point a tracking program or rotatorClient.py at the printed port
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import tty
+
+BAUD = 9600  # SERIAL LINK OF THE ROTATOR CONTROLLER
+SLEW_RATE = 6.0  # DEGREES PER SECOND ON EACH AXIS
+WINDUP_LIMIT = 450  # DEGREES OF AZIMUTH ROTATION FROM NORTH BEFORE THE FIRMWARE UNWINDS
+UNWOUND = 175  # WINDUP IS CANCELLED WITHIN THIS MANY DEGREES OF NORTH
+LOOP_STEP = 1.0  # MOST DEGREES AN AXIS TURNS IN ONE FIRMWARE LOOP
+
+_FLOAT = re.compile(r'^\s*[-+]?(\d+\.?\d*|\.\d+)')
+
+
+def toFloat(text):
+    """Arduino String.toFloat(): the leading number of the text, 0 when there is none"""
+    match = _FLOAT.match(text)
+    return float(match.group(0)) if match else 0.0
+
+
+def diffAngle(a, b):
+    """diffAngle() of the firmware: a - b for angles in -180..180, the acute way round"""
+    diff = a - b
+    if diff < -180:
+        diff = diff + 360
+    if diff > 180:
+        diff = diff - 360
+    return diff
+
+
+class RotatorEmulator:
+    """Rotator controller on the master side of a pty, clients open self.port"""
+
+    def __init__(self, baud=BAUD, slewRate=SLEW_RATE, az=0.0):
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self.baud = baud
+        self.slewRate = slewRate
+        self.az = az  # -180..180 LIKE THE FIRMWARE
+        self.el = 0.0
+        self.azSet = az
+        self.elSet = 0.0
+        self.azOffset = 0.0  # +-360 FOR EVERY CROSSING OF SOUTH
+        self.azWindup = az  # DEGREES ROTATED FROM NORTH
+        self.windup = False  # UNWINDING, SET POINTS ARE IGNORED
+        self.unwinds = 0
+        self.commands = 0
+        self.queries = 0
+        self._line = ''
+        self._azLast = az
+        self._moved = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        os.close(self._slave)
+        os.close(self.master)
+
+    def _run(self):
+        while True:
+            try:
+                data = os.read(self.master, 256)
+            except OSError:
+                return  # PTY CLOSED
+            if not data:
+                return
+            # THE UART ONLY DELIVERS baud / 10 CHARACTERS PER SECOND
+            time.sleep(len(data) * 10 / self.baud)
+            for ch in data.decode('ascii', 'replace'):
+                if ch == '\r':  # USER COMMANDS ARE NOT EMULATED
+                    self._line = ''
+                elif ch == '\n':
+                    self.processEasycommCommands(self._line)
+                    self._line = ''
+                else:
+                    self._line += ch
+
+    def processEasycommCommands(self, line):
+        # SAME PARSING AS processEasycommCommands() IN RotatorControl.ino
+        if line.startswith('AZ EL'):
+            self.queries = self.queries + 1
+            self.printAzEl()
+        elif line.startswith('AZ'):
+            self.commands = self.commands + 1
+            firstSpace = line.find(' ')
+            secondSpace = line.find(' ', firstSpace + 1)
+            self._move()
+            self.azSet = toFloat(line[2:firstSpace])
+            if self.azSet > 180:
+                self.azSet = self.azSet - 360
+            self.elSet = toFloat(line[firstSpace + 3:secondSpace] if secondSpace >= 0 else line[firstSpace + 3:])
+
+    def printAzEl(self):
+        self._move()
+        reply = 'AZ{:.1f} EL{:.1f}\n'.format(self.az + 360 if self.az < 0 else self.az, self.el)
+        time.sleep(len(reply) * 10 / self.baud)
+        os.write(self.master, reply.encode())
+
+    def _move(self):
+        # SLEW BOTH AXES SINCE THE LAST CALL, ONE FIRMWARE LOOP PER LOOP_STEP DEGREES
+        now = time.monotonic()
+        travel = self.slewRate * (now - self._moved)
+        self._moved = now
+        while travel > 0:
+            step = min(travel, LOOP_STEP)
+            travel = travel - step
+            if not self._loop(step):
+                break
+
+    def _loop(self, step):
+        # getAzElError(), THE MOTORS AND getWindup() OF processPosition(); False ONCE BOTH AXES ARE ON TARGET
+        if self.windup:
+            azError = max(-180.0, min(180.0, self.azWindup))
+            if abs(azError) < UNWOUND:
+                self.windup = False
+        else:
+            azError = diffAngle(self.az, self.azSet)
+        elError = diffAngle(self.el, self.elSet)
+        if not azError and not elError:
+            return False
+
+        az = self.az - max(-step, min(step, azError))
+        self.az = az - 360 if az > 180 else az + 360 if az < -180 else az
+        self.el = self.el - max(-step, min(step, elError))
+
+        azDiff = self.az - self._azLast
+        if azDiff < -180:
+            self.azOffset = self.azOffset + 360
+        if azDiff > 180:
+            self.azOffset = self.azOffset - 360
+        self._azLast = self.az
+        self.azWindup = self.az + self.azOffset
+        if abs(self.azWindup) > WINDUP_LIMIT and not self.windup:
+            self.windup = True
+            self.unwinds = self.unwinds + 1
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Emulate the Easycomm II rotator controller on a pty')
+    parser.add_argument('--slew', type=float, default=SLEW_RATE, help='degrees per second (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    emulator = RotatorEmulator(slewRate=args.slew).start()
+    print('Rotator emulator on {}'.format(emulator.port))
+    try:
+        while True:
+            time.sleep(1)
+            print('AZ {:6.1f} EL {:5.1f}  set {:6.1f} {:5.1f}  windup {:6.1f}{}  commands {} queries {}'.format(
+                emulator.az, emulator.el, emulator.azSet, emulator.elSet, emulator.azWindup,
+                ' UNWINDING' if emulator.windup else '', emulator.commands, emulator.queries))
+    except KeyboardInterrupt:
+        emulator.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
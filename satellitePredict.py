@@ -1,55 +1,290 @@
-'''from pyorbital.orbital import Orbital
-import numpy as np
-import time
-from datetime import datetime
+"""
+SatellitePredict
+PASS PREDICTION OVER THE GROUND STATION FROM THE TLE FILES WRITTEN BY THE DECODERS
+
+SGP4 IS EVALUATED FOR ALL SATELLITES ON A COARSE TIME GRID AT ONCE, THEN AOS/LOS ARE
+REFINED BY FALSE POSITION AND TCA BY PARABOLIC INTERPOLATION AROUND THE GRID MAXIMUM
+
+run "python satellitePredict.py" for the passes of diwataTLE.txt and MicroOrbiter-1.txt in the next day
+run "python satellitePredict.py issTLE.txt --start 2023-04-19T00:00 --hours 48 --horizon 10" for other TLE files, windows or masks
+"""
+
+import argparse
+import math
 import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+from catalogStore import parseCatalog
+
+# GROUND STATION
+LATITUDE = 33.8924  # DEGREES NORTH
+LONGITUDE = 130.8403  # DEGREES EAST
+ALTITUDE = 0.05  # KM ABOVE THE WGS84 ELLIPSOID
+HORIZON = 0.0  # DEGREES, MINIMUM ELEVATION OF A PASS
+
+TLE_FILES = ['diwataTLE.txt', 'MicroOrbiter-1.txt']
+
+HOURS = 24  # PREDICTION WINDOW
+STEP = 60.0  # SECONDS BETWEEN GRID POINTS, SHORTER THAN THE SHORTEST PASS OF INTEREST
+TOLERANCE = 0.1  # SECONDS, AOS/TCA/LOS ACCURACY
+MAX_ITERATIONS = 20  # ROOT FINDING GIVES UP AFTER THIS MANY PROPAGATIONS
+CHUNK = 256  # SATELLITES PROPAGATED TOGETHER, BOUNDS THE GRID MEMORY
+
+# WGS84 ELLIPSOID
+EARTH_RADIUS = 6378.137  # KM
+FLATTENING = 1 / 298.257223563
+
+
+def readTLEFiles(filenames=TLE_FILES):
+    """(name, line1, line2) entries from every TLE file that exists"""
+    entries = []
+    for filename in filenames:
+        if os.path.exists(filename):
+            with open(filename) as file:
+                entries.extend(parseCatalog(file.read()))
+    return entries
+
+
+def stationECEF(latitude=LATITUDE, longitude=LONGITUDE, altitude=ALTITUDE):
+    """Earth-fixed position (km) and east/north/up unit vectors (rows) of a geodetic location"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    e2 = FLATTENING * (2 - FLATTENING)
+    n = EARTH_RADIUS / math.sqrt(1 - e2 * math.sin(lat) ** 2)
+    position = np.array([(n + altitude) * math.cos(lat) * math.cos(lon),
+                         (n + altitude) * math.cos(lat) * math.sin(lon),
+                         (n * (1 - e2) + altitude) * math.sin(lat)])
+    up = np.array([math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)])
+    east = np.array([-math.sin(lon), math.cos(lon), 0.0])
+    north = np.cross(up, east)
+    return position, np.stack([east, north, up])
+
+
+def gmst(jd, fr):
+    """Greenwich mean sidereal time in radians (IAU 1982, UTC used for UT1)"""
+    t = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (67310.54841 + (876600.0 * 3600 + 8640184.812866) * t
+               + 0.093104 * t * t - 6.2e-6 * t * t * t)
+    return np.mod(seconds, 86400.0) * (2 * np.pi / 86400.0)
+
+
+def lookAngles(r, jd, fr, station):
+    """Azimuth, elevation (degrees) and range (km) from TEME positions r[..., 3].
+
+    station is the (position, enu) pair returned by stationECEF(). Polar
+    motion is ignored, which is far below the SGP4 error.
+    """
+    theta = gmst(jd, fr)
+    cos = np.cos(theta)
+    sin = np.sin(theta)
+
+    # TEME -> EARTH-FIXED IS A ROTATION ABOUT Z BY GMST
+    position, enu = station
+    x = cos * r[..., 0] + sin * r[..., 1] - position[0]
+    y = -sin * r[..., 0] + cos * r[..., 1] - position[1]
+    z = r[..., 2] - position[2]
+
+    east = enu[0, 0] * x + enu[0, 1] * y
+    north = enu[1, 0] * x + enu[1, 1] * y + enu[1, 2] * z
+    up = enu[2, 0] * x + enu[2, 1] * y + enu[2, 2] * z
+    distance = np.sqrt(x * x + y * y + z * z)
+    azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+    elevation = np.degrees(np.arcsin(up / distance))
+    return azimuth, elevation, distance
+
+
+def _elevations(satrecs, owner, jd0, fr0, seconds, station):
+    # ELEVATION OF satrecs[owner[i]] AT seconds[i], FAILED PROPAGATIONS COUNT AS BELOW THE HORIZON
+    order = np.argsort(owner, kind='stable')
+    bounds = np.searchsorted(owner[order], np.arange(len(satrecs) + 1))
+    jd = np.full(len(seconds), jd0)
+    fr = fr0 + seconds[order] / 86400.0
+    error = np.zeros(len(seconds), dtype=np.uint8)
+    r = np.empty((len(seconds), 3))
+    for satrec, first, end in zip(satrecs, bounds[:-1], bounds[1:]):
+        if end > first:
+            error[first:end], r[first:end], _ = satrec.sgp4_array(jd[first:end], fr[first:end])
+    elevation = np.empty(len(seconds))
+    elevation[order] = np.where(error == 0, lookAngles(r, jd, fr, station)[1], -90.0)
+    return elevation
+
+
+def _refine(satrecs, jd0, fr0, crossings, peaks, station, horizon):
+    """Refine the horizon crossings and culminations of a chunk of satellites together.
+
+    crossings is (owner, lo, hi, fLo, fHi): every crossing is bracketed by
+    grid times lo/hi with elevations fLo/fHi and solved by Illinois false
+    position. peaks is (owner, t, f): three grid times and elevations around
+    each culmination, highest in the middle, refined by successive parabolic
+    interpolation. Each iteration propagates every open estimate once.
+    """
+    crossOwner, lo, hi, fLo, fHi = crossings
+    peakOwner, t, f = peaks
+    owner = np.concatenate([crossOwner, peakOwner])
+    count = len(lo)
+    fLo = fLo - horizon
+    fHi = fHi - horizon
+    side = np.zeros(count)
+    crossing = hi - fHi * (hi - lo) / (fHi - fLo)
+    tca = t[1]
+    for _ in range(MAX_ITERATIONS):
+        vertex = _vertex(t, f)
+        fNew = _elevations(satrecs, owner, jd0, fr0, np.concatenate([crossing, vertex]), station)
+        fCross = fNew[:count] - horizon
+        fVertex = fNew[count:]
+
+        # ILLINOIS: HALVE THE RETAINED END WHEN THE SAME END MOVES TWICE IN A ROW
+        sameAsHi = np.sign(fCross) == np.sign(fHi)
+        fLo = np.where(sameAsHi & (side == 1), fLo / 2, fLo)
+        fHi = np.where(~sameAsHi & (side == -1), fHi / 2, fHi)
+        hi = np.where(sameAsHi, crossing, hi)
+        fHi = np.where(sameAsHi, fCross, fHi)
+        lo = np.where(sameAsHi, lo, crossing)
+        fLo = np.where(sameAsHi, fLo, fCross)
+        side = np.where(sameAsHi, 1, -1)
+
+        # KEEP THE BEST THREE POINTS AROUND THE PEAK
+        left = vertex < t[1]
+        better = fVertex > f[1]
+        t = np.stack([np.where(left, np.where(better, t[0], vertex), np.where(better, t[1], t[0])),
+                      np.where(better, vertex, t[1]),
+                      np.where(left, np.where(better, t[1], t[2]), np.where(better, t[2], vertex))])
+        f = np.stack([np.where(left, np.where(better, f[0], fVertex), np.where(better, f[1], f[0])),
+                      np.where(better, fVertex, f[1]),
+                      np.where(left, np.where(better, f[1], f[2]), np.where(better, f[2], fVertex))])
+        moved = np.abs(vertex - tca)
+        tca = vertex
+
+        previous = crossing
+        crossing = hi - fHi * (hi - lo) / np.where(fHi == fLo, 1.0, fHi - fLo)
+        if np.all(np.abs(crossing - previous) < TOLERANCE) and np.all(moved < TOLERANCE):
+            break
+    return crossing, t[1], f[1]
+
+
+def _vertex(t, f):
+    # ABSCISSA OF THE PARABOLA THROUGH THREE POINTS, THE MIDDLE ONE WHEN THEY ARE COLLINEAR
+    a = (t[1] - t[0]) * (f[1] - f[2])
+    b = (t[1] - t[2]) * (f[1] - f[0])
+    denominator = 2 * (a - b)
+    safe = np.abs(denominator) > 1e-12
+    vertex = t[1] - ((t[1] - t[0]) * a - (t[1] - t[2]) * b) / np.where(safe, denominator, 1.0)
+    return np.clip(np.where(safe, vertex, t[1]), t[0], t[2])
+
+
+def predictPasses(entries, start=None, hours=HOURS, latitude=LATITUDE, longitude=LONGITUDE,
+                  altitude=ALTITUDE, horizon=HORIZON, step=STEP):
+    """Passes of every (name, line1, line2) entry over the ground station.
+
+    Returns one list of passes per entry, in entry order, so entries sharing
+    a name keep their own passes. Each pass is a dict with 'aos', 'tca' and
+    'los' as UTC datetimes, 'maxElevation' in degrees and the 'satellite'
+    name of its entry. A pass already in progress at start or still up at
+    the end of the window is clipped to the window.
+    """
+    if start is None:
+        start = datetime.now(timezone.utc)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    station = stationECEF(latitude, longitude, altitude)
+
+    jd0, fr0 = jday(start.year, start.month, start.day, start.hour, start.minute,
+                    start.second + start.microsecond * 1e-6)
+    window = hours * 3600.0
+    grid = np.append(np.arange(0.0, window, step), window)
+    last = len(grid) - 1
+    jd = np.full(len(grid), jd0)
+    fr = fr0 + grid / 86400.0
+
+    passes = [[] for _ in entries]
+    satrecs = [Satrec.twoline2rv(line1, line2) for _, line1, line2 in entries]
+    for first in range(0, len(satrecs), CHUNK):
+        chunk = satrecs[first:first + CHUNK]
+
+        # COARSE GRID: ONE SGP4 CALL FOR THE WHOLE CHUNK AND THE WHOLE WINDOW
+        error, r, _ = SatrecArray(chunk).sgp4(jd, fr)
+        elevation = np.where(error == 0, lookAngles(r, jd, fr, station)[1], -90.0)
+        up = elevation > horizon
+
+        # GRID INTERVALS WHERE A SATELLITE CROSSES THE HORIZON, IN (SATELLITE, TIME) ORDER
+        crossOwner, change = np.nonzero(up[:, 1:] != up[:, :-1])
+        rising = up[crossOwner, change + 1]
 
-timestamp = datetime.now()
+        # RUNS ABOVE THE HORIZON, INCLUDING THOSE CUT BY THE ENDS OF THE WINDOW
+        startOwner = np.concatenate([crossOwner[rising], np.flatnonzero(up[:, 0])])
+        runStart = np.concatenate([change[rising] + 1, np.zeros(np.count_nonzero(up[:, 0]), int)])
+        order = np.lexsort((runStart, startOwner))
+        peakOwner = startOwner[order]
+        runStart = runStart[order]
+        endOwner = np.concatenate([crossOwner[~rising], np.flatnonzero(up[:, -1])])
+        runEnd = np.concatenate([change[~rising], np.full(np.count_nonzero(up[:, -1]), last)])
+        runEnd = runEnd[np.lexsort((runEnd, endOwner))]
 
-tle = os.getcwd() + '\dist\DIWATA-2B.txt'
-latitude = 33.8924
-longitude = 130.8403
+        # HIGHEST GRID POINT OF EACH RUN AND ITS NEIGHBOURS ONE STEP AWAY BRACKET THE CULMINATION,
+        # EVEN WHEN THEY FALL OUTSIDE THE WINDOW
+        peak = np.array([a + np.argmax(elevation[row, a:b + 1])
+                         for row, a, b in zip(peakOwner, runStart, runEnd)], dtype=int)
+        around = grid[peak] + np.array([[-step], [0.0], [step]])
+        aroundElevation = _elevations(chunk, np.tile(peakOwner, 3), jd0, fr0, around.ravel(), station)
 
-satellite = Orbital('DIWATA-2B',tle_file=tle)
-nextPasses = satellite.get_next_passes(timestamp,7,longitude,latitude,alt = 50, tol = 1e-3, horizon = 0)
+        crossing, tca, maxElevation = _refine(
+            chunk, jd0, fr0,
+            (crossOwner, grid[change], grid[change + 1], elevation[crossOwner, change], elevation[crossOwner, change + 1]),
+            (peakOwner, around, aroundElevation.reshape(around.shape)),
+            station, horizon)
 
-print(timestamp)
-for rise_time, fall_time, max_elev_time in nextPasses:
-    print(rise_time)
-    print(fall_time)
-    print(max_elev_time)
-'''
-    
-import win32gui
-import re
+        # RUN ENDS THAT ARE NOT CROSSINGS ARE THE EDGES OF THE WINDOW
+        aos = np.zeros(len(runStart))
+        los = np.full(len(runEnd), window)
+        aos[runStart > 0] = crossing[rising]
+        los[runEnd < last] = crossing[~rising]
 
+        # A CLIPPED PASS CULMINATES AT THE EDGE OF THE WINDOW
+        clipped = (tca < aos) | (tca > los)
+        if clipped.any():
+            tca = np.clip(tca, aos, los)
+            maxElevation[clipped] = _elevations(chunk, peakOwner[clipped], jd0, fr0, tca[clipped], station)
 
-class WindowMgr:
-    """Encapsulates some calls to the winapi for window management"""
+        for row, a, t, b, m in zip(peakOwner, aos, tca, los, maxElevation):
+            passes[first + row].append({
+                'satellite': entries[first + row][0],
+                'aos': start + timedelta(seconds=float(a)),
+                'tca': start + timedelta(seconds=float(t)),
+                'los': start + timedelta(seconds=float(b)),
+                'maxElevation': float(m),
+            })
+    return passes
 
-    def __init__ (self):
-        """Constructor"""
-        self._handle = None
 
-    def find_window(self, class_name, window_name=None):
-        """find a window by its class_name"""
-        self._handle = win32gui.FindWindow(class_name, window_name)
+def printPasses(entries, passes):
+    for (name, _, _), satellitePasses in zip(entries, passes):
+        print(name)
+        if not satellitePasses:
+            print('    no passes')
+        for p in satellitePasses:
+            print('    AOS {:%Y-%m-%d %H:%M:%S}  TCA {:%H:%M:%S}  LOS {:%H:%M:%S}  MAX EL {:5.1f}'.format(
+                p['aos'], p['tca'], p['los'], p['maxElevation']))
 
-    def _window_enum_callback(self, hwnd, wildcard):
-        """Pass to win32gui.EnumWindows() to check all the opened windows"""
-        if re.match(wildcard, str(win32gui.GetWindowText(hwnd))) is not None:
-            self._handle = hwnd
 
-    def find_window_wildcard(self, wildcard):
-        """find a window whose title matches the wildcard regex"""
-        self._handle = None
-        win32gui.EnumWindows(self._window_enum_callback, wildcard)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Predict passes over the ground station')
+    parser.add_argument('files', nargs='*', default=TLE_FILES, help='TLE files (default: %(default)s)')
+    parser.add_argument('--hours', type=float, default=HOURS, help='prediction window (default: %(default)s)')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='UTC start, e.g. 2023-04-19T00:00 (default: now)')
+    parser.add_argument('--horizon', type=float, default=HORIZON, help='minimum elevation in degrees (default: %(default)s)')
+    args = parser.parse_args(argv)
 
-    def set_foreground(self):
-        """put the window in the foreground"""
-        win32gui.SetForegroundWindow(self._handle)
+    entries = readTLEFiles(args.files)
+    if not entries:
+        print('No TLEs found in {}'.format(', '.join(args.files)), file=sys.stderr)
+        return 1
+    printPasses(entries, predictPasses(entries, start=args.start, hours=args.hours, horizon=args.horizon))
+    return 0
 
 
-w = WindowMgr()
-w.find_window_wildcard(".*Hello.*")
-w.set_foreground()
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,26 @@
-import socket
-
-HOST = "127.0.0.1"  # Standard loopback interface address (localhost)
-PORT = 8100  # Port to listen on (non-privileged ports are > 1023)
+import ax25
+import kissProtocol as kiss
+import tlePacket
 
 # LISTEN TO KISS PORT OF AX.25 HS SOUNDMODEM
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-    s.connect((HOST, PORT))
+with kiss.connect() as s:
     print('Connected!')
-    data = s.recv(108).hex()
-
-appendedFrame = len(data) - 212
-print('Number of Appended Frames: {} bytes' .format(int(appendedFrame/2)))
-DATA_PACKET_KISS = data[48:112+appendedFrame].upper()
-print('Original Data with Appended Frames \n',DATA_PACKET_KISS)
-print('Data Length: {} bytes'.format(int(len(DATA_PACKET_KISS)/2)))
+    frame = next(kiss.readFrames(s))
 
-# REMOVE APPENDED TRANSPOSED FRAME ESCAPE BY KISS PROTOCOL I.E. CHANGE DBDD TO DB
-DATA_PACKET_DBDD = ''
-DATA_PACKET_KISS = DATA_PACKET_KISS.split('DBDD')
-for i in range(len(DATA_PACKET_KISS)):
-    if(i == len(DATA_PACKET_KISS) - 1):
-        DATA_PACKET_DBDD = DATA_PACKET_DBDD + DATA_PACKET_KISS[i]
-        break
-    DATA_PACKET_DBDD = DATA_PACKET_DBDD + DATA_PACKET_KISS[i] + 'DB'
+print('Original Data with Escapes \n', frame.hex().upper())
+print('Data Length: {} bytes'.format(len(frame)))
 
-# REMOVE APPENDED TRANSPOSED FRAME END BY KISS PROTOCOL I.E. CHANGE C000 TO C0
-DATA_PACKET_C000 = ''
-DATA_PACKET_DBDD = DATA_PACKET_DBDD.split('C000')
-for j in range(len(DATA_PACKET_DBDD)):
-    if(j == len(DATA_PACKET_DBDD) - 1):
-        DATA_PACKET_C000 = DATA_PACKET_C000 + DATA_PACKET_DBDD[j]
-        break
-    DATA_PACKET_C000 = DATA_PACKET_C000 + DATA_PACKET_DBDD[j] + 'C0'
+# REMOVE KISS ESCAPES I.E. CHANGE DBDC TO C0 AND DBDD TO DB
+data = kiss.unescape(frame)
+print('Number of Escaped Bytes: {}'.format(len(frame) - len(data)))
 
-DATA_PACKET = DATA_PACKET_C000
+# THE TLE PACKET FOLLOWS THE SATELLITE HEADER IN THE AX.25 INFO FIELD, WHATEVER THE DIGIPEATER PATH
+header = ax25.parseFrame(data)
+print('AX.25 Frame: {}'.format(header))
+DATA_PACKET = header.info[tlePacket.INFO_OFFSET:tlePacket.INFO_OFFSET + tlePacket.PACKET_LENGTH]
 
-print('Corrected Data \n', DATA_PACKET)
-print('Data Length: {} bytes'.format(int(len(DATA_PACKET)/2)))
+print('Corrected Data \n', DATA_PACKET.hex().upper())
+print('Data Length: {} bytes'.format(len(DATA_PACKET)))
 
-DATA_PACKET = (int(DATA_PACKET,16)) # CONVERT TO INT FOR PACKET DECODER
+DATA_PACKET = int.from_bytes(DATA_PACKET, 'big') # CONVERT TO INT FOR PACKET DECODER
 print(hex(DATA_PACKET))
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+SHARED TEST SETUP: THE SCRIPTS ARE TOP-LEVEL MODULES OF THE REPOSITORY ROOT
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
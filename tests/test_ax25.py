@@ -0,0 +1,113 @@
+"""
+AX.25 HEADER PARSER AND SOURCE FILTER: DIGIPEATER PATHS, BROKEN ADDRESS FIELDS AND ESCAPED SSID BYTES
+"""
+
+import pytest
+
+import ax25
+import kissProtocol as kiss
+import kissReplay
+import tlePacket
+from test_groundStationCore import MICRO, coreFor
+
+INFO = b'TLE PACKET'
+
+
+def _frame(header, info=INFO):
+    # UNESCAPED KISS DATA FRAME: COMMAND BYTE, AX.25 HEADER, INFORMATION FIELD
+    return bytes([kiss.DATA_FRAME]) + header + info
+
+
+def test_direct_frame():
+    frame = ax25.parseFrame(_frame(ax25.encodeHeader('CQ', 'DW2B-1')))
+    assert (frame.destination, frame.source, frame.path) == ('CQ', 'DW2B-1', [])
+    assert (frame.control, frame.pid) == (ax25.UI_CONTROL, ax25.NO_LAYER3)
+    assert isinstance(frame.info, memoryview)
+    assert bytes(frame.info) == INFO
+
+
+def test_digipeated_path_keeps_the_h_bits():
+    header = ax25.encodeHeader('CQ', 'DW2B', path=['RELAY-1*', 'WIDE2-2*', 'WIDE1'])
+    frame = ax25.parseFrame(_frame(header))
+    assert frame.path == ['RELAY-1*', 'WIDE2-2*', 'WIDE1']
+    assert frame.source == 'DW2B'
+    assert bytes(frame.info) == INFO
+    assert repr(frame) == 'DW2B>CQ,RELAY-1*,WIDE2-2*,WIDE1: {} bytes'.format(len(INFO))
+    # ONLY THE DIGIPEATERS CARRY THE H BIT, THE LAST ONE ALSO ENDS THE ADDRESS FIELD
+    ssids = [header[i * ax25.ADDRESS_LENGTH + 6] for i in range(5)]
+    assert [ssid & ax25.REPEATED for ssid in ssids] == [0, 0, ax25.REPEATED, ax25.REPEATED, 0]
+    assert [ssid & 0x01 for ssid in ssids] == [0, 0, 0, 0, 1]
+
+
+def test_eight_digipeaters_and_no_more():
+    path = ['RELAY{}'.format(i) for i in range(ax25.MAX_DIGIPEATERS)]
+    assert ax25.parseFrame(_frame(ax25.encodeHeader('CQ', 'DW2B', path=path))).path == path
+    with pytest.raises(ValueError, match='more than 8 digipeaters'):
+        ax25.parseFrame(_frame(ax25.encodeHeader('CQ', 'DW2B', path=path + ['RELAY9'])))
+
+
+@pytest.mark.parametrize('control', [0x00, 0x01, 0x3F, 0xAF])  # I, S, SABM AND XID FRAMES
+def test_non_ui_frames_are_rejected(control):
+    with pytest.raises(ValueError, match='Not an AX.25 UI frame'):
+        ax25.parseFrame(_frame(ax25.encodeHeader('CQ', 'DW2B', control=control)))
+
+
+def test_poll_bit_is_still_ui():
+    frame = ax25.parseFrame(_frame(ax25.encodeHeader('CQ', 'DW2B', control=ax25.UI_CONTROL | ax25.POLL_FINAL)))
+    assert frame.control == ax25.UI_CONTROL | ax25.POLL_FINAL
+
+
+@pytest.mark.parametrize('cut, message', [
+    (ax25.ADDRESS_LENGTH - 1, 'address field is cut short'),
+    (ax25.ADDRESS_LENGTH + 3, 'address field is cut short'),
+    (2 * ax25.ADDRESS_LENGTH, 'no control and PID'),
+    (2 * ax25.ADDRESS_LENGTH + 1, 'no control and PID'),
+])
+def test_cut_short_header(cut, message):
+    header = ax25.encodeHeader('CQ', 'DW2B')
+    with pytest.raises(ValueError, match=message):
+        ax25.parseFrame(_frame(header[:cut], b''))
+    # A FRAME THAT ENDS AT THE PID IS VALID, WITH AN EMPTY INFORMATION FIELD
+    assert len(ax25.parseFrame(_frame(header, b'')).info) == 0
+
+
+def test_single_address_has_no_source():
+    with pytest.raises(ValueError, match='no source address'):
+        ax25.parseFrame(_frame(ax25.encodeAddress('CQ', last=True) + bytes([ax25.UI_CONTROL, ax25.NO_LAYER3])))
+
+
+def test_source_filter_ignores_h_reserved_and_last_bits():
+    sources = ax25.SourceFilter(['dw2b', 'DW2B-3'])
+    assert sources.callsigns == ['DW2B', 'DW2B-3']
+    header = bytearray(ax25.encodeHeader('CQ', 'DW2B-3'))
+    header[2 * ax25.ADDRESS_LENGTH - 1] ^= 0xE0  # C BIT AND RESERVED BITS FLIPPED
+    assert sources.accepts(_frame(bytes(header)))
+    assert sources.accepts(_frame(ax25.encodeHeader('CQ', 'DW2B', path=['RELAY*'])))
+    assert not sources.accepts(_frame(ax25.encodeHeader('CQ', 'DW2B-4')))
+    assert not sources.accepts(_frame(ax25.encodeHeader('DW2B', 'ISS')))  # DESTINATION IS NOT THE SOURCE
+    assert not sources.accepts(_frame(ax25.encodeHeader('CQ', 'DW2B'))[:ax25.ADDRESS_LENGTH + 4])
+    assert (sources.accepted, sources.rejected) == (2, 3)
+
+
+def _escapedSourceFrame(source, ssidByte, path):
+    # KISS FRAME WHOSE SOURCE SSID BYTE IS FEND OR FESC, SO IT IS SENT AS A TWO-BYTE ESCAPE
+    header = bytearray(ax25.encodeHeader('CQ', source, path=path))
+    header[2 * ax25.ADDRESS_LENGTH - 1] = ssidByte
+    packet = tlePacket.encode(tlePacket.parseTLE(MICRO[1], MICRO[2]))
+    return kiss.encodeFrame(bytes(header) + kissReplay.SATELLITE_HEADER + packet)[1:-1]
+
+
+# FEND HAS THE LAST-ADDRESS BIT CLEAR, SO THAT FRAME GOES THROUGH A DIGIPEATER
+@pytest.mark.parametrize('source, ssidByte, path', [('DW2B', kiss.FEND, ['RELAY']), ('DW2B-13', kiss.FESC, [])])
+def test_filter_matches_an_escaped_ssid_byte(source, ssidByte, path):
+    frame = _escapedSourceFrame(source, ssidByte, path)
+    head = frame[:1 + 2 * ax25.ADDRESS_LENGTH]
+    assert head[-1] == kiss.FESC
+    assert ax25.SourceFilter([source]).accepts(kiss.unescape(frame[:2 * len(head)]))
+
+    # THE SAME FRAME THROUGH THE CORE: ACCEPTED, UNESCAPED AND DECODED
+    core = coreFor(1, [source])
+    core.handleFrame(core.modems[0], frame)
+    assert core.sources.accepted == 1
+    assert core.invalid == 0
+    assert core.decoders[source].received == 1
@@ -0,0 +1,112 @@
+"""
+BulkUplink: ONLY ENTRIES PASSING THE TLE LAYOUT AND CHECKSUM CHECKS ARE ENCODED, --changed ONLY WHAT WAS NOT ENCODED YET
+"""
+
+import io
+import types
+
+import pytest
+
+import bulkUplink
+import catalogDelta
+import tlePacket
+from test_catalogStore import DIWATA, ISS
+
+BAD_CHECKSUM = ('ISS BAD CHECKSUM', ISS[1][:-1] + '0', ISS[2])
+BAD_LAYOUT = ('ISS BAD LAYOUT', ISS[1], ISS[2].replace(' 51.6391', '51.6391 '))
+
+
+def withChecksum(line):
+    """TLE line with its column 69 checksum recomputed: digits count their value, '-' counts 1"""
+    return line[:68] + str(sum(int(c) if c.isdigit() else c == '-' for c in line[:68]) % 10)
+
+
+# PASSES THE LAYOUT AND CHECKSUM CHECKS, BUT THE PACKET ONLY CARRIES NEGATIVE DRAG EXPONENTS
+POSITIVE_DRAG = ('ISS POSITIVE DRAG', withChecksum(ISS[1][:53] + ' 12345+1' + ISS[1][61:]), ISS[2])
+
+
+def test_invalid_entries_are_not_encoded():
+    entries, packets, invalid = bulkUplink.encodeEntries([ISS, BAD_CHECKSUM, DIWATA, BAD_LAYOUT])
+    assert entries == [ISS, DIWATA]
+    assert invalid == [BAD_CHECKSUM, BAD_LAYOUT]
+    assert packets.shape == (2, tlePacket.PACKET_LENGTH)
+    assert (packets == bulkUplink.encodeEntries([ISS, DIWATA])[1]).all()
+    assert bulkUplink.formatCommands(entries, packets).count('DL COMMAND') == 2
+
+
+def test_unencodable_entries_are_skipped_not_raised():
+    entries, packets, invalid = bulkUplink.encodeEntries([ISS, POSITIVE_DRAG, DIWATA, BAD_CHECKSUM])
+    assert entries == [ISS, DIWATA]
+    assert invalid == [POSITIVE_DRAG, BAD_CHECKSUM]
+    assert (packets == bulkUplink.encodeEntries([ISS, DIWATA])[1]).all()
+
+
+def test_no_entries():
+    entries, packets, invalid = bulkUplink.encodeEntries([])
+    assert entries == invalid == []
+    assert len(packets) == 0
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    # THE TWO ATTRIBUTES OF CatalogStore THAT changedEntries() READS
+    return types.SimpleNamespace(deltaLog=str(tmp_path / 'delta.jsonl.gz'), delta=None)
+
+
+def _download(catalog, timestamp, *updated):
+    delta = catalogDelta.CatalogDelta(updated=updated, timestamp=timestamp)
+    catalogDelta.DeltaLog(catalog.deltaLog).append(delta)
+    catalog.delta = delta
+
+
+def test_everything_changed_before_the_first_download(catalog):
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS, DIWATA], [])
+
+
+def test_encoded_changes_are_not_reported_again(catalog):
+    catalogDelta.DeltaLog(catalog.deltaLog).append(catalogDelta.CatalogDelta(added=[ISS, DIWATA], timestamp=1))
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS, DIWATA], [])
+    bulkUplink.recordEncoded(catalog, [ISS, DIWATA])
+    # A LATER RUN WITHOUT A NEW DOWNLOAD
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([], [ISS, DIWATA])
+
+    _download(catalog, 2)  # NOTHING CHANGED
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([], [ISS, DIWATA])
+
+    _download(catalog, 3, ISS)
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS], [DIWATA])
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS], [DIWATA])
+    bulkUplink.recordEncoded(catalog, [ISS])
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([], [ISS, DIWATA])
+
+
+def test_changes_wait_for_the_satellite_to_be_encoded(catalog):
+    catalogDelta.DeltaLog(catalog.deltaLog).append(catalogDelta.CatalogDelta(added=[ISS, DIWATA], timestamp=1))
+    bulkUplink.recordEncoded(catalog, [ISS, DIWATA])
+    _download(catalog, 2, DIWATA)
+    _download(catalog, 3, ISS)
+    # DIWATA CHANGED TWO DOWNLOADS AGO BUT WAS NOT ENCODED SINCE
+    assert bulkUplink.changedEntries(catalog, [DIWATA]) == ([DIWATA], [])
+
+
+def test_without_a_delta_log_only_this_download_counts(catalog):
+    catalog.deltaLog = None
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS, DIWATA], [])
+    catalog.delta = catalogDelta.CatalogDelta(updated=[ISS])
+    assert bulkUplink.changedEntries(catalog, [ISS, DIWATA]) == ([ISS], [DIWATA])
+
+
+def test_uplink_writes_encodable_satellites_and_reports_the_rest(capsys):
+    catalog = types.SimpleNamespace(deltaLog=None, delta=None,
+                                    find={'ISS': ISS, 'DIWATA': DIWATA, 'BAD': POSITIVE_DRAG}.get)
+    output = io.StringIO()
+    assert bulkUplink.uplink(catalog, ['ISS', 'BAD', 'NOSUCH', 'DIWATA'], output, crc=True) == 1
+    assert output.getvalue() == bulkUplink.formatCommands([ISS, DIWATA], bulkUplink.encodeEntries([ISS, DIWATA])[1],
+                                                          crc=True)
+    errors = capsys.readouterr().err
+    assert 'Satellite not found: NOSUCH' in errors
+    assert 'Skipped: ISS POSITIVE DRAG' in errors
+
+    output = io.StringIO()
+    assert bulkUplink.uplink(catalog, ['DIWATA'], output) == 0
+    assert output.getvalue().startswith('DIWATA-2B\n')
@@ -0,0 +1,145 @@
+"""
+CatalogStore AGAINST A LOCAL HTTP STAND-IN FOR CELESTRAK: CONDITIONAL GET, TTL AND INDEXED LOOKUPS
+"""
+
+import http.server
+import threading
+import time
+
+import pytest
+
+import catalogStore
+from catalogStore import CatalogStore
+
+ISS = ('ISS (ZARYA)',
+       '1 25544U 98067A   23108.95540690  .00019443  00000+0  34804-3 0  9994',
+       '2 25544  51.6391 262.0713 0006099 208.3097 234.4315 15.49967480 48019')
+DIWATA = ('DIWATA-2B',
+          '1 43678U 18084H   23108.95540690  .00019443  00000+0  34804-3 0  9993',
+          '2 43678  51.6391 262.0713 0006099 208.3097 234.4315 15.49967480 48017')
+# ALPHA-5 NUMBER A0001 = 100001
+ALPHA5 = ('FUTURESAT',
+          '1 A0001U 24001A   24010.50000000  .00000000  00000+0  00000+0 0  9990',
+          '2 A0001  97.5000 100.0000 0001000  90.0000 270.0000 15.00000000 00010')
+ETAG = '"v1"'
+
+
+def catalogText(*entries):
+    return ''.join('{}\n{}\n{}\n'.format(*entry) for entry in entries)
+
+
+class CelesTrak(http.server.BaseHTTPRequestHandler):
+    # SERVES server.catalog WITH AN ETAG, 304 WHEN THE CLIENT ALREADY HAS IT
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.catalog.encode('ascii')
+        self.send_response(200)
+        self.send_header('ETag', server.etag)
+        self.send_header('Last-Modified', 'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def celestrak():
+    server = http.server.HTTPServer(('127.0.0.1', 0), CelesTrak)
+    server.catalog = catalogText(ISS, DIWATA, ALPHA5)
+    server.etag = ETAG
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(celestrak, tmp_path):
+    def make(ttl=catalogStore.TTL):
+        return CatalogStore('http://127.0.0.1:{}/gp.php'.format(celestrak.server_port),
+                            str(tmp_path / 'celestrakActive.txt'), ttl, str(tmp_path / 'celestrakDelta.jsonl.gz'))
+    return make
+
+
+def test_first_load_downloads_and_caches(store, celestrak, tmp_path):
+    catalog = store().load()
+    assert len(catalog.entries) == 3
+    assert len(celestrak.requests) == 1
+    assert 'If-None-Match' not in celestrak.requests[0]
+    assert (tmp_path / 'celestrakActive.txt').read_text() == celestrak.catalog
+    assert catalog.meta['etag'] == ETAG
+
+
+def test_fresh_snapshot_is_not_downloaded_again(store, celestrak):
+    store().load()
+    catalog = store().load()
+    assert len(celestrak.requests) == 1
+    assert len(catalog.entries) == 3
+
+
+def test_expired_snapshot_sends_conditional_get_and_keeps_it_on_304(store, celestrak):
+    store().load()
+    catalog = store(ttl=0)
+    time.sleep(0.01)
+    catalog.load()
+    assert len(celestrak.requests) == 2
+    assert celestrak.requests[1]['If-None-Match'] == ETAG
+    assert 'If-Modified-Since' in celestrak.requests[1]
+    assert len(catalog.entries) == 3
+    assert catalog.age() < 5
+
+
+def test_expired_snapshot_is_replaced_on_200(store, celestrak):
+    store().load()
+    celestrak.catalog = catalogText(ISS, DIWATA)
+    celestrak.etag = '"v2"'
+    catalog = store(ttl=0)
+    time.sleep(0.01)
+    catalog.load()
+    assert len(catalog.entries) == 2
+    assert catalog.meta['etag'] == '"v2"'
+    assert catalog.delta.removed == [100001]
+
+
+def test_refresh_reports_whether_the_snapshot_changed(store, celestrak):
+    catalog = store().load()
+    assert catalog.refresh() is False
+    celestrak.etag = '"v2"'
+    assert catalog.refresh() is True
+
+
+@pytest.mark.parametrize('key, name', [
+    ('iss (zarya)', 'ISS (ZARYA)'),
+    ('DIWATA-2B', 'DIWATA-2B'),
+    ('25544', 'ISS (ZARYA)'),
+    (43678, 'DIWATA-2B'),
+    ('A0001', 'FUTURESAT'),
+    ('100001', 'FUTURESAT'),
+    ('1998-067A', 'ISS (ZARYA)'),
+    ('98067A', 'ISS (ZARYA)'),
+    ('2018-084H', 'DIWATA-2B'),
+])
+def test_find(store, key, name):
+    assert store().load().find(key)[0] == name
+
+
+def test_find_unknown_returns_none(store):
+    catalog = store().load()
+    assert catalog.find('99999') is None
+    assert catalog.find('NO SUCH SATELLITE') is None
+
+
+def test_alpha5_numbers():
+    assert catalogStore.noradNumber('A0001') == 100001
+    assert catalogStore.noradNumber('J0000') == 180000  # I IS SKIPPED
+    assert catalogStore.noradNumber('Z9999') == 339999
+    assert catalogStore.noradNumber('25544') == 25544
@@ -0,0 +1,244 @@
+"""
+GroundStationCore AGAINST kissReplay STAND-INS: CALLSIGN ROUTING, RECONNECTS AND MALFORMED KISS FRAMES
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+import groundStationCore
+import kissProtocol as kiss
+import kissReplay
+import tlePacket
+from groundStationCore import SOURCE_END, GroundStationCore
+from test_catalogStore import DIWATA
+
+# ELEMENTS DIFFERENT FROM DIWATA, SO ITS PACKETS AND TLE TEXT DIFFER TOO
+MICRO = ('MicroOrbiter-1',
+         '1 59483U 98067WF  24207.17670810  .00289925  00000+0  14955-2 0  9994',
+         '2 59483  51.6275 117.2958 0007326 132.2973 227.8650 15.79730129 48012')
+
+TIMEOUT = 5.0  # SECONDS A TEST MAY WAIT FOR THE CORE
+
+
+def coreFor(port, callsigns, crc=False, **options):
+    """Core with one modem on port and a DIWATA-2B layout decoder per callsign, no files written"""
+    config = {'modems': [{'name': 'test', 'host': kiss.HOST, 'port': port}],
+              'satellites': [{'callsign': callsign, 'name': 'DIWATA-2B', 'crc': crc} for callsign in callsigns]}
+    options.setdefault('reconnectDelay', 60.0)
+    return GroundStationCore.fromConfig(config, **options)
+
+
+async def runUntil(core, condition, timeout=TIMEOUT):
+    """Run the core until condition() holds, then stop it"""
+    task = asyncio.ensure_future(core.run())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        while not condition():
+            if loop.time() > deadline or task.done():
+                raise AssertionError('condition not met within {} s'.format(timeout))
+            await asyncio.sleep(0.005)
+    finally:
+        core.stop()
+        await task
+
+
+def hungUp(core):
+    modem = core.modems[0]
+    return lambda: modem.connects and not modem.connected
+
+
+async def serve(capture, core=None, **options):
+    async with kissReplay.ReplayServer(capture, baud=0) as server:
+        core = core or coreFor(server.port, **options)
+        await runUntil(core, hungUp(core))
+    return core
+
+
+def test_routes_recorded_capture_by_callsign(tmp_path):
+    capture = (kissReplay.syntheticCapture([MICRO], 'ISS') + kissReplay.syntheticCapture([DIWATA], 'DW2B', copies=2)
+               + kissReplay.syntheticCapture([MICRO], 'NOSUCH', path=('RELAY*',)))
+    captureFile = str(tmp_path / 'capture.kiss')
+
+    async def recordAndReplay():
+        async with kissReplay.ReplayServer(capture, baud=0) as server:
+            count = await kissReplay.record(captureFile, kiss.HOST, server.port, duration=TIMEOUT)
+        assert count == len(capture)
+        with open(captureFile, 'rb') as file:
+            recorded = file.read()
+        tles = []
+        async with kissReplay.ReplayServer(recorded, baud=0) as server:
+            core = coreFor(server.port, ['DW2B', 'ISS'], sources=None,
+                           onTLE=lambda timestamp, outputTLE, repeat: tles.append((outputTLE, repeat)))
+            await runUntil(core, hungUp(core))
+        return core, tles
+
+    core, tles = asyncio.run(recordAndReplay())
+    assert core.decoders['ISS'].received == 1
+    assert core.decoders['DW2B'].received == 2
+    assert [repeat for _, repeat in tles] == [False, False, True]
+    assert tles[1][0] == tles[2][0] != tles[0][0]
+    assert core.unrouted == {'NOSUCH': 1}
+    assert core.invalid == 0
+    assert core.modems[0].frames == 4
+    assert any('frames from unknown callsign NOSUCH' in line for line in core.report())
+
+
+def test_catch_all_takes_unknown_sources():
+    capture = b''.join(kissReplay.syntheticCapture([DIWATA], source) for source in ('DW2B', 'OTHER', 'ISS', 'OTHER'))
+    core = asyncio.run(serve(capture, callsigns=['DW2B', '*']))
+    assert core.decoders['DW2B'].received == 1
+    assert core.decoders['*'].received == 3
+    assert not core.unrouted
+    assert core.sources is None  # "*" ACCEPTS EVERY SOURCE
+
+
+def test_source_filter_rejects_before_routing():
+    capture = kissReplay.syntheticCapture([DIWATA], 'DW2B') + kissReplay.syntheticCapture([DIWATA], 'OTHER')
+    core = asyncio.run(serve(capture, callsigns=['DW2B']))
+    assert core.decoders['DW2B'].received == 1
+    assert core.sources.rejected == 1
+    assert not core.unrouted
+
+
+def test_unknown_sources_are_counted_per_callsign():
+    capture = b''.join(kissReplay.syntheticCapture([MICRO], source) for source in ('AAA', 'BBB', 'AAA', 'DW2B', 'AAA'))
+    core = asyncio.run(serve(capture, callsigns=['DW2B'], sources=None))
+    assert core.unrouted == {'AAA': 3, 'BBB': 1}
+    assert core.unrouted.most_common(1) == [('AAA', 3)]
+    assert core.decoders['DW2B'].received == 1
+
+
+def test_reconnects_after_hang_up():
+    capture = kissReplay.syntheticCapture([MICRO, DIWATA], 'DW2B')
+
+    async def reconnect():
+        async with kissReplay.ReplayServer(capture, baud=0) as server:
+            core = coreFor(server.port, ['DW2B'], reconnectDelay=0.01)
+            await runUntil(core, lambda: server.clients >= 3 and not core.modems[0].connected)
+            return core, server.clients
+
+    core, clients = asyncio.run(reconnect())
+    modem = core.modems[0]
+    assert modem.connects == clients >= 3
+    decoder = core.decoders['DW2B']
+    assert decoder.received >= 2 * (clients - 1)
+    # EVERY REPLAY AFTER THE FIRST IS ANSWERED BY THE PACKET CACHE
+    assert decoder.cache.stats()['hits'] == decoder.received - 2
+
+
+def test_backoff_doubles_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(groundStationCore, 'RECONNECT_JITTER', 0.0)
+    attempts = []
+    openConnection = asyncio.open_connection
+
+    async def recordAttempt(*args, **kwargs):
+        attempts.append(asyncio.get_running_loop().time())
+        return await openConnection(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, 'open_connection', recordAttempt)
+
+    async def unreachable():
+        # A PORT THAT WAS JUST FREED, NOTHING LISTENS ON IT
+        server = await asyncio.start_server(lambda reader, writer: None, kiss.HOST, 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        core = coreFor(port, ['DW2B'], reconnectDelay=0.02, maxReconnectDelay=0.08)
+        await runUntil(core, lambda: len(attempts) >= 6)
+        return core
+
+    core = asyncio.run(unreachable())
+    assert core.modems[0].connects == 0
+    gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+    for gap, delay in zip(gaps, [0.02, 0.04, 0.08, 0.08, 0.08]):
+        assert delay * 0.9 <= gap < delay + 0.05
+
+
+def _badEscape(frame):
+    # FESC FOLLOWED BY A BYTE THAT IS NEITHER TFEND NOR TFESC, IN THE MIDDLE OF THE PACKET
+    middle = len(frame) - 20
+    return frame[:middle] + bytes([kiss.FESC]) + frame[middle:]
+
+
+@pytest.mark.parametrize('crc', [False, True], ids=['plain', 'crc'])
+def test_malformed_frames_are_counted_and_skipped(crc):
+    good = kissReplay.syntheticCapture([MICRO], 'DW2B', crc=crc)
+    header = kissReplay.buildFrame(b'', 'DW2B')[:-1]
+    runt = header[:1 + SOURCE_END] + bytes([kiss.FEND])  # ADDRESSES ONLY, NO CONTROL OR PID
+    short = header + bytes(tlePacket.PACKET_LENGTH // 2) + bytes([kiss.FEND])  # UI FRAME, HALF A PACKET
+    command = bytes([kiss.FEND, 0x06]) + good[2:]  # KISS HARDWARE COMMAND, NOT DATA
+    oversize = bytes([kiss.FEND, kiss.DATA_FRAME]) + b'\x55' * (kiss.MAX_FRAME + 100)  # FEND NEVER COMES
+    escaped = _badEscape(kissReplay.syntheticCapture([DIWATA], 'DW2B', crc=crc))
+    capture = good + runt + short + command + oversize + good + escaped + good
+
+    core = asyncio.run(serve(capture, callsigns=['DW2B'], crc=crc))
+    modem = core.modems[0]
+    decoder = core.decoders['DW2B']
+    assert modem.dropped == 1
+    assert core.invalid == 3  # RUNT, SHORT AND COMMAND
+    # THE GOOD FRAMES AROUND THE BROKEN ONES ARE ALL RECEIVED, THE BADLY ESCAPED ONE TOO
+    assert decoder.received == 4
+    assert decoder.cache.stats()['hits'] == 2
+    # ONLY THE CRC CAN TELL A BAD ESCAPE FROM DATA; WITHOUT ONE THE SHIFTED PACKET IS DECODED AS RECEIVED
+    assert decoder.badCRC == (1 if crc else 0)
+    assert any('3 non-data, non-UI or short frames' in line for line in core.report())
+
+
+def test_oversize_frame_ending_in_one_read_is_dropped():
+    # SHORTER THAN TWO READS, SO ITS CLOSING FEND ARRIVES IN THE SAME READ THAT PUSHES IT PAST MAX_FRAME
+    good = kissReplay.syntheticCapture([MICRO], 'DW2B')
+    oversize = bytes([kiss.FEND, kiss.DATA_FRAME]) + bytes(range(1, 0xC0)) * 30 + bytes([kiss.FEND])
+    assert kiss.MAX_FRAME < len(oversize) < 2 * kiss.RECV_SIZE
+    core = asyncio.run(serve(oversize + good + good, callsigns=['DW2B']))
+    assert core.modems[0].dropped == 1
+    assert core.invalid == 0
+    assert core.decoders['DW2B'].received == 2
+
+
+def test_stop_from_another_thread():
+    capture = kissReplay.syntheticCapture([MICRO], 'DW2B')
+    errors = []
+
+    async def serveForever(ready, stop):
+        async with kissReplay.ReplayServer(capture, baud=0, loop=True) as server:
+            ready.append(server.port)
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+
+    stop = threading.Event()
+    ready = []
+    serverThread = threading.Thread(target=asyncio.run, args=(serveForever(ready, stop),))
+    serverThread.start()
+    try:
+        while not ready:
+            threading.Event().wait(0.01)
+        core = coreFor(ready[0], ['DW2B'])
+
+        def receive():
+            try:
+                asyncio.run(core.run())
+            except BaseException as error:
+                errors.append(error)
+
+        receiver = threading.Thread(target=receive)
+        receiver.start()
+        while not core.decoders['DW2B'].received:
+            threading.Event().wait(0.01)
+        core.stop()
+        receiver.join(TIMEOUT)
+        assert not receiver.is_alive()
+        assert not errors
+        assert not core.modems[0].connected
+    finally:
+        stop.set()
+        serverThread.join(TIMEOUT)
+
+
+def test_stop_before_run_returns_at_once():
+    core = coreFor(1, ['DW2B'])
+    core.stop()
+    asyncio.run(asyncio.wait_for(core.run(), TIMEOUT))
+    assert core.modems[0].connects == 0
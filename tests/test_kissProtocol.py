@@ -0,0 +1,93 @@
+"""
+KISSDeframer AND ESCAPING: FRAMES SPLIT ACROSS READS, IDLE FENDS, RUNAWAY FRAMES AND TRANSPARENCY
+"""
+
+import pytest
+
+import kissProtocol as kiss
+from kissProtocol import FEND, FESC, TFEND, TFESC, KISSDeframer
+
+# RAW PAYLOAD WITH BOTH SPECIAL CHARACTERS, BACK TO BACK AND AT EITHER END
+PAYLOAD = bytes([FEND, 0x01, FESC, FEND, FESC, FESC, 0x02, TFEND, TFESC, FEND])
+
+
+def test_escape_unescape_roundtrip():
+    escaped = kiss.escape(PAYLOAD)
+    assert FEND not in escaped
+    assert escaped.count(FESC) == PAYLOAD.count(FEND) + PAYLOAD.count(FESC)
+    assert escaped[:4] == bytes([FESC, TFEND, 0x01, FESC])
+    assert kiss.unescape(escaped) == PAYLOAD
+    assert kiss.unescape(memoryview(bytearray(escaped))) == PAYLOAD
+
+
+def test_unescape_without_fesc_does_not_copy():
+    frame = b'\x00TLE'
+    assert kiss.unescape(frame) is frame
+
+
+def test_encoded_frame_is_one_deframed_frame():
+    deframer = KISSDeframer()
+    frames = deframer.feed(kiss.encodeFrame(PAYLOAD))
+    assert frames == [bytes([kiss.DATA_FRAME]) + kiss.escape(PAYLOAD)]
+    assert kiss.unescape(frames[0][1:]) == PAYLOAD
+
+
+@pytest.mark.parametrize('cut', [1, 2, 5, 12])
+def test_frame_split_across_feeds(cut):
+    stream = kiss.encodeFrame(PAYLOAD) + kiss.encodeFrame(b'next')
+    deframer = KISSDeframer()
+    frames = deframer.feed(stream[:cut]) + deframer.feed(stream[cut:])
+    assert [kiss.unescape(frame[1:]) for frame in frames] == [PAYLOAD, b'next']
+
+
+def test_frame_fed_one_byte_at_a_time():
+    stream = kiss.encodeFrame(PAYLOAD) * 3
+    deframer = KISSDeframer()
+    frames = [frame for i in range(len(stream)) for frame in deframer.feed(stream[i:i + 1])]
+    assert [kiss.unescape(frame[1:]) for frame in frames] == [PAYLOAD] * 3
+
+
+def test_back_to_back_fends_are_idle_fill():
+    deframer = KISSDeframer()
+    idle = bytes([FEND]) * 4
+    assert deframer.feed(idle) == []
+    frames = deframer.feed(idle + b'\x00one' + idle + b'\x00two' + idle)
+    assert frames == [b'\x00one', b'\x00two']
+    assert deframer.feed(idle) == []
+    assert deframer.dropped == 0
+
+
+def test_bytes_before_the_first_fend_are_ignored():
+    deframer = KISSDeframer()
+    assert deframer.feed(b'noise') == []
+    assert deframer.feed(b'more' + kiss.encodeFrame(b'data')) == [b'\x00data']
+
+
+def test_runaway_frames_are_dropped_and_counted():
+    deframer = KISSDeframer(maxFrame=8)
+    # ENDS IN THE SAME READ, ENDS IN A LATER READ, NEVER ENDS IN TIME
+    assert deframer.feed(bytes([FEND]) + bytes(9) + bytes([FEND]) + b'\x00ok' + bytes([FEND])) == [b'\x00ok']
+    assert deframer.dropped == 1
+    assert deframer.feed(bytes([FEND]) + bytes(6)) == []
+    assert deframer.feed(bytes(3) + bytes([FEND])) == []
+    assert deframer.dropped == 2
+    assert deframer.feed(bytes([FEND]) + bytes(20)) == []
+    assert deframer.dropped == 3
+    # THE REST OF THE RUNAWAY FRAME IS SKIPPED UP TO THE NEXT FEND
+    assert deframer.feed(bytes(5) + kiss.encodeFrame(b'ok')) == [b'\x00ok']
+    assert deframer.dropped == 3
+
+
+def test_frame_at_the_limit_is_kept():
+    deframer = KISSDeframer(maxFrame=8)
+    frame = b'\x00' + bytes(range(1, 8))
+    assert deframer.feed(bytes([FEND]) + frame[:4]) == []
+    assert deframer.feed(frame[4:] + bytes([FEND])) == [frame]
+    assert deframer.dropped == 0
+
+
+def test_reset_forgets_the_partial_frame():
+    deframer = KISSDeframer()
+    deframer.feed(bytes([FEND]) + b'\x00half')
+    deframer.reset()
+    assert deframer.feed(b'tail' + kiss.encodeFrame(b'whole')) == [b'\x00whole']
@@ -0,0 +1,109 @@
+"""
+PacketArchive FILE HANDLING: BROKEN HEADERS, TORN RECORDS AND A STALE BLOCK INDEX
+"""
+
+import os
+
+import pytest
+
+import packetArchive
+import tlePacket
+from packetArchive import PacketArchive
+
+PAYLOAD = bytes(range(tlePacket.PACKET_LENGTH))
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(packetArchive, 'BLOCK', 4)
+    with PacketArchive(str(tmp_path / 'archive.bin')) as archive:
+        yield archive
+
+
+def _fill(archive, times):
+    for timestamp in times:
+        archive.append(PAYLOAD, 'TEST', timestamp)
+    archive.close()
+
+
+def _openFiles():
+    return len(os.listdir('/proc/self/fd'))
+
+
+@pytest.mark.parametrize('content', [b'', b'TLEARCH', b'NOTANARCHIVE\x00\x00\x00\x00'], ids=['truncated', 'short', 'magic'])
+def test_broken_header_raises_without_leaking(archive, content):
+    if not content:
+        _fill(archive, [1.0])
+        with open(archive.filename, 'r+b') as file:
+            file.truncate(3)
+    else:
+        with open(archive.filename, 'wb') as file:
+            file.write(content)
+    opened = _openFiles()
+    for _ in range(3):
+        with pytest.raises(ValueError, match='not a version'):
+            archive.append(PAYLOAD)
+    assert _openFiles() == opened
+    assert archive._fd is None
+
+
+def test_torn_record_is_dropped(archive):
+    _fill(archive, [1.0, 2.0])
+    with open(archive.filename, 'ab') as file:
+        file.write(b'\x00' * 10)
+    _fill(archive, [3.0])
+    assert list(archive.records()['time']) == [1.0, 2.0, 3.0]
+
+
+def test_block_index_grows(archive):
+    _fill(archive, range(6))
+    assert archive.blockIndex().tolist() == [[0, 3], [4, 5]]
+    _fill(archive, range(6, 9))
+    assert archive.blockIndex().tolist() == [[0, 3], [4, 7], [8, 8]]
+    assert list(archive.range(5, 7)['time']) == [5.0, 6.0]
+
+
+def test_block_index_rebuilt_for_replaced_archive(archive):
+    _fill(archive, range(9))
+    archive.blockIndex()
+    # SAME LENGTH, DIFFERENT TIMES: THE SAVED INDEX WOULD HIDE EVERY RECORD
+    os.remove(archive.filename)
+    _fill(archive, range(100, 109))
+    assert archive.blockIndex().tolist() == [[100, 103], [104, 107], [108, 108]]
+    assert len(archive.range(100, 200)) == 9
+
+
+def test_block_index_rebuilt_after_truncation(archive):
+    _fill(archive, range(9))
+    archive.blockIndex()
+    os.remove(archive.filename)
+    _fill(archive, [50.0] * 5)
+    assert archive.blockIndex().tolist() == [[50, 50], [50, 50]]
+
+
+def test_queries_do_not_rewrite_an_unchanged_index(archive, monkeypatch):
+    _fill(archive, range(6))
+    archive.blockIndex()
+    saved = os.stat(archive.indexFile)
+    monkeypatch.setattr(packetArchive.PacketArchive, '_saveIndex', lambda self, index: pytest.fail('index saved'))
+    assert list(archive.range(1, 5)['time']) == [1.0, 2.0, 3.0, 4.0]
+    assert archive.blockIndex().tolist() == [[0, 3], [4, 5]]
+    assert os.stat(archive.indexFile).st_ino == saved.st_ino
+
+
+def test_index_that_cannot_be_saved_still_answers(archive, monkeypatch):
+    _fill(archive, range(6))
+    archive.blockIndex()
+    _fill(archive, range(6, 9))
+
+    def readOnly(source, destination):
+        raise PermissionError(13, 'Permission denied', destination)
+
+    replace = os.replace
+    monkeypatch.setattr(os, 'replace', readOnly)
+    assert list(archive.range(5, 8)['time']) == [5.0, 6.0, 7.0]
+    assert archive.blockIndex().tolist() == [[0, 3], [4, 7], [8, 8]]
+    # NO TEMPORARY FILE IS LEFT BEHIND AND THE OLD INDEX IS STILL THERE
+    assert sorted(os.listdir(os.path.dirname(archive.filename))) == ['archive.bin', os.path.basename(archive.indexFile)]
+    monkeypatch.setattr(os, 'replace', replace)
+    assert archive.blockIndex().tolist() == [[0, 3], [4, 7], [8, 8]]
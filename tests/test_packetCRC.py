@@ -0,0 +1,57 @@
+"""
+PacketCRC: CRC-16/CCITT-FALSE CHECK VALUE, BATCH == binascii FOR EVERY LENGTH, TRAILERS AND CORRUPTED FRAMES
+"""
+
+import binascii
+import random
+
+import numpy as np
+import pytest
+
+import packetCRC
+import tlePacket
+
+
+def test_check_value():
+    assert packetCRC.crc16(b'123456789') == 0x29B1
+    assert packetCRC.crcBatch(np.frombuffer(b'123456789', dtype=np.uint8)[None, :]).tolist() == [0x29B1]
+    assert packetCRC.crc16(b'') == packetCRC.INIT
+
+
+def test_table_is_the_polynomial():
+    assert packetCRC.TABLE[1] == packetCRC.POLYNOMIAL
+    assert [binascii.crc_hqx(bytes([byte]), 0) for byte in range(256)] == packetCRC.TABLE
+
+
+@pytest.mark.parametrize('length', range(packetCRC.FRAME_LENGTH + 1))
+def test_batch_equals_binascii(length):
+    generator = random.Random(length)
+    rows = np.array([[generator.randrange(256) for _ in range(length)] for _ in range(20)], dtype=np.uint8)
+    rows[0] = 0x00
+    rows[1] = 0xFF
+    expected = [binascii.crc_hqx(row.tobytes(), packetCRC.INIT) for row in rows]
+    assert packetCRC.crcBatch(rows).tolist() == expected
+
+
+def test_trailers_match_single_and_batch():
+    generator = random.Random(0)
+    packets = [bytes(generator.randrange(256) for _ in range(tlePacket.PACKET_LENGTH)) for _ in range(10)]
+    frames = packetCRC.appendCRCBatch(b''.join(packets))
+    assert frames.shape == (10, packetCRC.FRAME_LENGTH)
+    assert [row.tobytes() for row in frames] == [packetCRC.appendCRC(packet) for packet in packets]
+    assert packetCRC.checkCRCBatch(frames).all()
+    assert all(packetCRC.checkCRC(row.tobytes()) for row in frames)
+    assert packetCRC.stripCRC(frames[3].tobytes()) == packets[3]
+
+
+def test_corrupted_frames_are_caught():
+    frames = packetCRC.appendCRCBatch(bytes(range(tlePacket.PACKET_LENGTH)) * 4)
+    frames[1, 0] ^= 0x01  # PACKET BIT
+    frames[2, -1] ^= 0x80  # TRAILER BIT
+    assert packetCRC.checkCRCBatch(frames).tolist() == [True, False, False, True]
+    assert not packetCRC.checkCRC(frames[1].tobytes())
+    assert not packetCRC.checkCRC(frames[0, :-1].tobytes())  # WRONG LENGTH
+    with pytest.raises(ValueError, match='CRC-16 trailer does not match'):
+        packetCRC.stripCRC(frames[2].tobytes())
+    with pytest.raises(ValueError, match='N x 34'):
+        packetCRC.checkCRCBatch(frames[:, :-1])
@@ -0,0 +1,45 @@
+"""
+schedulePasses AND markConflicts WITH SATELLITES THAT SHARE A NAME
+"""
+
+import os
+from datetime import datetime, timezone
+
+import passScheduler
+import satellitePredict
+from conftest import ROOT
+
+START = datetime(2023, 4, 19, tzinfo=timezone.utc)
+
+
+def twins():
+    # ISS RENAMED TO DIWATA-2B: TWO SATELLITES, ONE NAME
+    diwata, iss = satellitePredict.readTLEFiles([os.path.join(ROOT, 'diwataTLE.txt'), os.path.join(ROOT, 'issTLE.txt')])
+    return [diwata, ('DIWATA-2B',) + iss[1:]]
+
+
+def test_duplicate_names_keep_every_pass():
+    entries = twins()
+    expected = satellitePredict.predictPasses(entries, start=START, hours=24)
+    table = passScheduler.schedulePasses(entries, start=START, workers=1, hours=24)
+    assert len(table) == len(expected[0]) + len(expected[1])
+    for index in range(2):
+        assert [p['aos'] for p in table if p['entry'] == index] == [p['aos'] for p in expected[index]]
+    assert [p['aos'] for p in table] == sorted(p['aos'] for p in table)
+
+
+def test_sharded_schedule_numbers_entries_across_shards():
+    entries = twins() * 2
+    single = passScheduler.schedulePasses(entries, start=START, workers=1, hours=12)
+    pooled = passScheduler.schedulePasses(entries, start=START, workers=2, shardSize=1, hours=12)
+    key = lambda p: (p['aos'], p['entry'])
+    assert sorted(map(key, pooled)) == sorted(map(key, single))
+    assert {p['entry'] for p in pooled} == {0, 1, 2, 3}
+
+
+def test_identical_twins_conflict_with_each_other():
+    entries = twins()[:1] * 2
+    table = passScheduler.schedulePasses(entries, start=START, workers=1, hours=12)
+    groups = passScheduler.markConflicts(table)
+    assert groups and all(p['conflict'] for p in table)
+    assert all(sorted(p['entry'] for p in group) == [0, 1] for group in groups)
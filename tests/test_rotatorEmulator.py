@@ -0,0 +1,82 @@
+"""
+RotatorEmulator AGAINST THE FIRMWARE: diffAngle SHORTEST PATH, WINDUP_LIMIT UNWINDING AND EASYCOMM OVER THE PTY
+"""
+
+import asyncio
+
+import pytest
+
+import rotatorClient
+import rotatorEmulator
+
+
+@pytest.fixture
+def still():
+    # slewRate 0: ONLY _settle() MOVES THE ANTENNA, ONE FIRMWARE LOOP AT A TIME
+    emulator = rotatorEmulator.RotatorEmulator(slewRate=0.0)
+    yield emulator
+    emulator.close()
+
+
+def _settle(emulator, azimuth, elevation=0.0, limit=2000):
+    emulator.processEasycommCommands('AZ{:.1f} EL{:.1f}'.format(azimuth, elevation))
+    track = []
+    for _ in range(limit):
+        if not emulator._loop(rotatorEmulator.LOOP_STEP):
+            return track
+        track.append(emulator.az)
+    raise AssertionError('rotator did not settle on AZ {} EL {}'.format(azimuth, elevation))
+
+
+@pytest.mark.parametrize('a, b, diff', [(10, 350 - 360, 20), (-170, 170, 20), (170, -170, -20), (90, 0, 90)])
+def test_diffAngle(a, b, diff):
+    assert rotatorEmulator.diffAngle(a, b) == diff
+
+
+def test_shortest_path_across_south(still):
+    _settle(still, 170)
+    track = _settle(still, 190)  # 190 IS -170 TO THE FIRMWARE
+    assert len(track) == 20
+    assert still.az == -170
+    assert still.azWindup == 190
+    assert all(abs(az) >= 170 for az in track)
+
+
+def test_shortest_path_across_north(still):
+    track = _settle(still, 350)
+    assert len(track) == 10
+    assert still.az == -10
+    assert still.azWindup == -10
+
+
+def test_windup_unwinds_towards_north(still):
+    for azimuth in (90, 180, 270, 360, 90):  # ONE AND A QUARTER TURNS CLOCKWISE
+        _settle(still, azimuth)
+    assert still.azWindup == 450
+    assert not still.windup
+
+    _settle(still, 100)
+    assert still.unwinds == 1
+    assert not still.windup
+    # THE 10 DEGREES PAST THE LIMIT ARE UNDONE BY GOING BACK ROUND, NOT ON
+    assert still.az == 100
+    assert still.azWindup == 100
+
+
+def test_client_reads_emulator_over_pty():
+    async def point():
+        emulator = rotatorEmulator.RotatorEmulator(slewRate=1000.0, az=170.0).start()
+        try:
+            async with await rotatorClient.RotatorClient.open(emulator.port) as client:
+                client.point(190.0, 30.0)
+                await asyncio.sleep(0.2)
+                return await client.getAzEl(), emulator
+        finally:
+            emulator.close()
+
+    (azimuth, elevation), emulator = asyncio.run(point())
+    assert (azimuth, elevation) == (190.0, 30.0)
+    assert emulator.commands == 1
+    assert emulator.queries == 1
+    assert emulator.azWindup == 190
+    assert emulator.unwinds == 0
@@ -0,0 +1,36 @@
+"""
+predictPasses KEEPS THE PASSES OF EVERY ENTRY APART, ALSO WHEN ENTRIES SHARE A NAME
+"""
+
+import os
+from datetime import datetime, timezone
+
+import satellitePredict
+from conftest import ROOT
+
+START = datetime(2023, 4, 19, tzinfo=timezone.utc)
+
+
+def entries():
+    return satellitePredict.readTLEFiles([os.path.join(ROOT, 'diwataTLE.txt'), os.path.join(ROOT, 'issTLE.txt')])
+
+
+def test_one_list_per_entry_carrying_the_name():
+    diwata, iss = entries()
+    passes = satellitePredict.predictPasses([diwata, iss], start=START, hours=12)
+    assert len(passes) == 2
+    assert passes[0] and passes[1]
+    assert {p['satellite'] for p in passes[0]} == {'DIWATA-2B'}
+    assert {p['satellite'] for p in passes[1]} == {'ISS (ZARYA)'}
+
+
+def test_duplicate_names_keep_their_own_passes(monkeypatch):
+    diwata, iss = entries()
+    alone = satellitePredict.predictPasses([diwata, iss], start=START, hours=12)
+    # ONE SATELLITE PER CHUNK, SO THE SECOND ENTRY IS PREDICTED AFTER THE FIRST ONE'S PASSES EXIST
+    monkeypatch.setattr(satellitePredict, 'CHUNK', 1)
+    twins = [diwata, ('DIWATA-2B',) + iss[1:]]
+    passes = satellitePredict.predictPasses(twins, start=START, hours=12)
+    assert [p['aos'] for p in passes[0]] == [p['aos'] for p in alone[0]]
+    assert [p['aos'] for p in passes[1]] == [p['aos'] for p in alone[1]]
+    assert {p['satellite'] for p in passes[0] + passes[1]} == {'DIWATA-2B'}
@@ -0,0 +1,47 @@
+"""
+TLEFormat: formatPackets EQUALS formatTLE OF THE DECODED PACKET, EPOCHS OF 2000-2009 INCLUDED
+"""
+
+import pytest
+
+import tleFormat
+import tlePacket
+from test_bulkUplink import withChecksum
+from test_catalogStore import ISS
+from test_groundStationCore import MICRO
+from test_tlePacket import NEGATIVE
+
+# YEAR 05: THE EPOCH COLUMN KEEPS ITS LEADING ZERO
+Y2005 = ('ISS 2005', withChecksum(ISS[1][:18] + '05108.95540690' + ISS[1][32:]), ISS[2])
+# DRAG BELOW THE EXPONENT RANGE, SENT AS ZERO
+FLUSHED = ('ISS FLUSHED', withChecksum(ISS[1][:53] + ' 12345-9' + ISS[1][61:]), ISS[2])
+ENTRIES = [ISS, MICRO, NEGATIVE, Y2005, FLUSHED]
+
+
+def _packets(entries):
+    return [tlePacket.encode(tlePacket.parseTLE(line1, line2)) for _, line1, line2 in entries]
+
+
+def test_formatPackets_equals_formatTLE():
+    packets = _packets(ENTRIES)
+    texts = tleFormat.formatPackets(tlePacket.asPacketArray(b''.join(packets)))
+    assert len(texts) == len(packets)
+    for packet, text in zip(packets, texts):
+        assert text == tleFormat.formatTLE(tlePacket.decode(packet))
+
+
+@pytest.mark.parametrize('entry', [ISS, MICRO, NEGATIVE, Y2005], ids=lambda entry: entry[0])
+def test_packet_fields_land_in_their_columns(entry):
+    _, line1, line2 = entry
+    name, out1, out2 = tleFormat.formatTLE(tlePacket.decode(_packets([entry])[0])).split('\n')
+    assert name == tleFormat.DIWATA_2B['name']
+    assert out1[18:61] == line1[18:61]
+    assert out2[8:63] == line2[8:63]
+    for line in (out1, out2):
+        assert len(line) == tleFormat.LINE_LENGTH
+        assert int(line[68]) == tleFormat.checkSum(line)
+
+
+def test_epoch_of_2005_keeps_its_leading_zero():
+    text, = tleFormat.formatPackets(_packets([Y2005])[0])
+    assert text.split('\n')[1][18:32] == '05108.95540690'
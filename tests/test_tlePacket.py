@@ -0,0 +1,114 @@
+"""
+TLE PACKET CODEC: SCALAR AND BATCH ROUNDTRIPS, BATCH == SCALAR, AND THE DRAG TERM EDGE CASES
+"""
+
+import numpy as np
+import pytest
+
+import tlePacket
+from test_bulkUplink import withChecksum
+from test_catalogStore import ISS
+from test_groundStationCore import MICRO
+
+# NEGATIVE 1ST DERIVATIVE AND DRAG TERM: THE SIGN SITS IN COLUMN 54, line1[53]
+NEGATIVE = ('ISS NEGATIVE', withChecksum(ISS[1][:33] + '-.00019443  00000+0 -34804-3' + ISS[1][61:]), ISS[2])
+ENTRIES = [ISS, MICRO, NEGATIVE]
+
+
+def _tles(entries):
+    return [tlePacket.parseTLE(line1, line2) for _, line1, line2 in entries]
+
+
+@pytest.mark.parametrize('entry', ENTRIES, ids=lambda entry: entry[0])
+def test_scalar_roundtrip(entry):
+    _, line1, line2 = entry
+    decoded = tlePacket.decode(tlePacket.encode(tlePacket.parseTLE(line1, line2)))
+    assert decoded == {
+        'epoch': line1[18:32],
+        'derivative': line1[33:43].strip(),
+        'drag': line1[53:61].strip(),
+        'inclination': line2[8:16].strip(),
+        'raan': line2[17:25].strip(),
+        'eccentricity': '0.' + line2[26:33],
+        'argPerigee': line2[34:42].strip(),
+        'meanAnomaly': line2[43:51].strip(),
+        'meanMotion': line2[52:63].strip(),
+    }
+
+
+def test_batch_roundtrip():
+    columns = tlePacket.tleColumns(_tles(ENTRIES))
+    decoded = tlePacket.decodeBatch(tlePacket.encodeBatch(columns))
+    for key, column in columns.items():
+        # MEAN MOTION TRAVELS AS A FLOAT32
+        assert np.allclose(decoded[key], column, rtol=1e-7 if key == 'meanMotion' else 1e-12, atol=0), key
+
+
+def test_encodeBatch_matches_encode_row_by_row():
+    tles = _tles(ENTRIES)
+    packets = tlePacket.encodeBatch(tlePacket.tleColumns(tles))
+    assert packets.shape == (len(tles), tlePacket.PACKET_LENGTH)
+    for row, tle in zip(packets, tles):
+        assert row.tobytes() == tlePacket.encode(tle)
+
+
+def test_negative_drag_keeps_its_sign():
+    tle = tlePacket.parseTLE(NEGATIVE[1], NEGATIVE[2])
+    assert tle['drag'] == '-34804-3'
+    assert tlePacket.decode(tlePacket.encode(tle))['drag'] == '-34804-3'
+    assert tlePacket.decodeBatch(tlePacket.encodeBatch(tlePacket.tleColumns([tle])))['drag'][0] == pytest.approx(-0.34804e-3)
+
+
+@pytest.mark.parametrize('drag', ['12345-8', '-12345-9'])
+def test_drag_below_the_exponent_range_is_sent_as_zero(drag):
+    assert int(drag[-1]) > tlePacket.DT_MAX_EXPONENT
+    tle = dict(tlePacket.parseTLE(ISS[1], ISS[2]), drag=drag)
+    packet = tlePacket.encode(tle)
+    assert tlePacket.decode(packet)['drag'] in ('00000-0', '-00000-0')
+    batch = tlePacket.encodeBatch(tlePacket.tleColumns([tle]))
+    assert tlePacket.decodeBatch(batch)['drag'][0] == 0
+
+
+def test_drag_at_the_exponent_limit_survives():
+    drag = '12345-{}'.format(tlePacket.DT_MAX_EXPONENT)
+    tle = dict(tlePacket.parseTLE(ISS[1], ISS[2]), drag=drag)
+    assert tlePacket.decode(tlePacket.encode(tle))['drag'] == drag
+
+
+def test_positive_drag_exponent_is_rejected():
+    tle = dict(tlePacket.parseTLE(ISS[1], ISS[2]), drag='12345+1')
+    with pytest.raises(ValueError, match='positive exponent'):
+        tlePacket.encode(tle)
+    columns = tlePacket.tleColumns([tlePacket.parseTLE(ISS[1], ISS[2]), tle])
+    with pytest.raises(ValueError, match='positive exponent'):
+        tlePacket.encodeBatch(columns)
+
+    # WITH A MASK THE ROW IS FLAGGED AND LEFT ZERO, THE OTHER ROWS ARE STILL ENCODED
+    ok = np.ones(2, dtype=bool)
+    packets = tlePacket.encodeBatch(columns, ok)
+    assert ok.tolist() == [True, False]
+    assert packets[0].tobytes() == tlePacket.encode(tlePacket.parseTLE(ISS[1], ISS[2]))
+    assert not packets[1].any()
+
+    # +0 IS THE SAME AS -0
+    tle['drag'] = '12345+0'
+    assert tlePacket.decode(tlePacket.encode(tle))['drag'] == '12345-0'
+
+
+def test_field_overflow_is_rejected_or_masked():
+    columns = tlePacket.tleColumns(_tles([ISS, MICRO]))
+    columns['epoch'][1] = 1 << 17  # DAY FIELD IS 17 BITS
+    with pytest.raises(ValueError, match='EP does not fit'):
+        tlePacket.encodeBatch(columns)
+    ok = np.ones(2, dtype=bool)
+    packets = tlePacket.encodeBatch(columns, ok)
+    assert ok.tolist() == [True, False]
+    assert packets[0].tobytes() == tlePacket.encode(tlePacket.parseTLE(ISS[1], ISS[2]))
+    assert not packets[1].any()
+
+
+def test_packet_length_is_checked():
+    with pytest.raises(ValueError, match='32 bytes'):
+        tlePacket.decode(bytes(31))
+    with pytest.raises(ValueError, match='multiple of 32'):
+        tlePacket.decodeBatch(bytes(33))
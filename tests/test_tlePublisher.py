@@ -0,0 +1,102 @@
+"""
+TLEPublisher DEBOUNCE: A BURST OF CHANGES IS WRITTEN ONCE, AFTER DEBOUNCE SECONDS WITHOUT A CHANGE
+"""
+
+import os
+import threading
+import time
+
+import tlePublisher
+from tlePublisher import TLEPublisher
+
+DEBOUNCE = 0.2
+
+
+def _read(path):
+    return path.read_text() if path.exists() else None
+
+
+def test_burst_waits_for_quiet(tmp_path):
+    path = tmp_path / 'tle.txt'
+    publisher = TLEPublisher(str(path), debounce=DEBOUNCE)
+    assert publisher.publish('A')
+    for text in ('B', 'C', 'D'):
+        time.sleep(DEBOUNCE * 0.6)
+        assert publisher.publish(text)
+    # WELL PAST DEBOUNCE SINCE THE FIRST CHANGE, BUT NEVER QUIET FOR THAT LONG
+    assert _read(path) is None
+    time.sleep(DEBOUNCE * 2)
+    assert _read(path) == 'D'
+    assert publisher.published == 1
+    assert publisher.coalesced == 3
+
+
+def test_unchanged_and_flush(tmp_path):
+    path = tmp_path / 'tle.txt'
+    publisher = TLEPublisher(str(path), debounce=60)
+    assert publisher.publish('A')
+    assert not publisher.publish('A')
+    publisher.flush()
+    assert _read(path) == 'A'
+    assert not publisher.publish('A')
+    assert publisher.published == 1
+    assert publisher.unchanged == 2
+
+
+def test_burst_back_to_published_text_is_not_written(tmp_path):
+    path = tmp_path / 'tle.txt'
+    path.write_text('A')
+    publisher = TLEPublisher(str(path), debounce=DEBOUNCE)
+    assert publisher.publish('B')
+    assert publisher.publish('A')
+    time.sleep(DEBOUNCE * 2)
+    assert publisher.published == 0
+    assert _read(path) == 'A'
+
+
+def test_failed_write_is_counted_and_retried(tmp_path, monkeypatch):
+    path = tmp_path / 'tle.txt'
+    path.write_text('A')
+    replace = os.replace
+    errors = []
+    monkeypatch.setattr(threading, 'excepthook', errors.append)
+    monkeypatch.setattr(tlePublisher, 'REPLACE_DELAY', 0.0)
+
+    def locked(source, destination):
+        raise PermissionError(13, 'Permission denied', destination)
+
+    monkeypatch.setattr(os, 'replace', locked)
+    publisher = TLEPublisher(str(path), debounce=DEBOUNCE)
+    assert publisher.publish('B')
+    time.sleep(DEBOUNCE * 2)
+    # THE TIMER THREAD DID NOT RAISE, THE OLD FILE IS UNTOUCHED AND NO TEMPORARY FILE IS LEFT
+    assert not errors
+    assert publisher.failed == 1
+    assert publisher.published == 0
+    assert os.listdir(str(tmp_path)) == ['tle.txt']
+    assert _read(path) == 'A'
+
+    # THE SAME TEXT AGAIN IS A RETRY, NOT AN UNCHANGED PACKET
+    monkeypatch.setattr(os, 'replace', replace)
+    assert publisher.publish('B')
+    time.sleep(DEBOUNCE * 2)
+    assert _read(path) == 'B'
+    assert (publisher.published, publisher.failed, publisher.unchanged) == (1, 1, 0)
+
+
+def test_flush_retries_text_that_failed(tmp_path, monkeypatch):
+    path = tmp_path / 'tle.txt'
+    replace = os.replace
+
+    def full(source, destination):
+        raise OSError(28, 'No space left on device', destination)
+
+    monkeypatch.setattr(os, 'replace', full)
+    publisher = TLEPublisher(str(path), debounce=0)
+    assert publisher.publish('A')
+    assert publisher.failed == 1
+    assert os.listdir(str(tmp_path)) == []
+    monkeypatch.setattr(os, 'replace', replace)
+    publisher.flush()
+    assert _read(path) == 'A'
+    assert (publisher.published, publisher.failed) == (1, 1)
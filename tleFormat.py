@@ -0,0 +1,167 @@
+"""
+TLEFormat
+COLUMN-EXACT TLE LINES FROM DECODED TLE PACKETS
+
+formatTLE FILLS ONE FIXED-WIDTH TEMPLATE PER LINE FROM THE STRINGS RETURNED BY tlePacket.decode
+formatPackets WRITES THE DIGITS OF N PACKETS STRAIGHT INTO AN N x 69 BYTE BUFFER, CHECKSUMS INCLUDED
+
+NUMPY IS ONLY IMPORTED BY THE BATCH FUNCTIONS SO SINGLE-PACKET TOOLS START WITHOUT IT
+"""
+
+import packetSchema
+
+LINE_LENGTH = 69  # 68 COLUMNS AND THE CHECKSUM
+
+# CONSTANTS THE PACKET DOES NOT CARRY, SEE packetSchema.SATELLITES
+DIWATA_2B = packetSchema.SATELLITES['DIWATA-2B']
+
+# TEMPLATES WITHOUT THE CHECKSUM COLUMN, THE EPOCH KEEPS THE LEADING ZERO OF YEARS 2000-2009
+LINE1 = '1 {catalog:05d}{classification:1} {designator:<8} {epoch:0>14} {derivative:>10} {secondDerivative:>8} {drag:>8} {ephemeris:1} {elementSet:>4}'
+LINE2 = '2 {catalog:05d} {inclination:>8} {raan:>8} {eccentricity:7} {argPerigee:>8} {meanAnomaly:>8} {meanMotion:>11}{revolution:>5}'
+
+# CHECKSUM: DIGITS COUNT THEIR VALUE, MINUS SIGNS COUNT 1, EVERYTHING ELSE 0
+_CHECKSUM_WEIGHTS = bytes(int(chr(ch)) if chr(ch) in '0123456789' else 1 if chr(ch) == '-' else 0 for ch in range(256))
+
+
+def checkSum(line):
+    """TLE checksum (modulo 10) of the first 68 columns"""
+    return sum(line[:68].encode('ascii').translate(_CHECKSUM_WEIGHTS)) % 10
+
+
+def checkSums(lines):
+    """TLE checksums of the first 68 columns of an N x 69 uint8 array of lines"""
+    import numpy as np
+    weights = np.frombuffer(_CHECKSUM_WEIGHTS, dtype=np.uint8)
+    return (weights[lines[:, :68]].sum(axis=1, dtype=np.uint32) % 10).astype(np.uint8)
+
+
+def formatLines(tle, satellite=DIWATA_2B):
+    """(line 1, line 2) for TLE field strings as returned by tlePacket.decode"""
+    line1 = LINE1.format(epoch=tle['epoch'], derivative=tle['derivative'], drag=tle['drag'], **satellite)
+    line2 = LINE2.format(inclination=tle['inclination'], raan=tle['raan'], eccentricity=tle['eccentricity'][2:],
+                         argPerigee=tle['argPerigee'], meanAnomaly=tle['meanAnomaly'], meanMotion=tle['meanMotion'],
+                         **satellite)
+    return line1 + str(checkSum(line1)), line2 + str(checkSum(line2))
+
+
+def formatTLE(tle, satellite=DIWATA_2B):
+    """Three-line TLE text (name, line 1, line 2) for TLE field strings as returned by tlePacket.decode"""
+    line1, line2 = formatLines(tle, satellite)
+    return satellite['name'] + '\n' + line1 + '\n' + line2
+
+
+def _template(template, satellite):
+    # ONE LINE WITH THE SATELLITE CONSTANTS FILLED IN AND EVERY PACKET FIELD BLANK, AS A uint8 ROW
+    import numpy as np
+    blanks = {'epoch': '', 'derivative': '', 'drag': '', 'inclination': '', 'raan': '', 'eccentricity': '',
+              'argPerigee': '', 'meanAnomaly': '', 'meanMotion': ''}
+    line = template.format(**dict(blanks, **satellite)) + ' '
+    if len(line) != LINE_LENGTH:
+        raise ValueError('Satellite constants do not fit the TLE columns: {!r}'.format(line))
+    return np.frombuffer(line.encode('ascii'), dtype=np.uint8)
+
+
+def _writeDigits(lines, column, width, value):
+    # ZERO-PADDED DECIMAL DIGITS OF A uint64 ARRAY IN lines[:, column:column + width]
+    import numpy as np
+    for i in range(column + width - 1, column - 1, -1):
+        lines[:, i] = (value % np.uint64(10)).astype(np.uint8) + ord('0')
+        value = value // np.uint64(10)
+
+
+def _writeFixed(lines, column, width, value, decimals):
+    # value / 10**decimals RIGHT-ALIGNED LIKE "{:{width}.{decimals}f}" OF A NON-NEGATIVE NUMBER
+    import numpy as np
+    point = column + width - 1 - decimals
+    _writeDigits(lines, point + 1, decimals, value % np.uint64(10 ** decimals))
+    lines[:, point] = ord('.')
+    value = value // np.uint64(10 ** decimals)
+    for i in range(point - 1, column - 1, -1):
+        digit = (value % np.uint64(10)).astype(np.uint8) + ord('0')
+        # THE UNITS DIGIT IS ALWAYS WRITTEN, HIGHER ONES ONLY WHILE DIGITS REMAIN
+        lines[:, i] = digit if i == point - 1 else np.where(value > 0, digit, ord(' '))
+        value = value // np.uint64(10)
+
+
+def _exactAngle(value, fractionBits):
+    # ANGLE x 1e4 AS AN EXACT INTEGER, INTEGER DEGREES ABOVE 4 DECIMALS
+    import numpy as np
+    return (value >> np.uint64(fractionBits)) * np.uint64(10000) + (value & np.uint64((1 << fractionBits) - 1))
+
+
+def _meanMotionDigits(bits):
+    # round(MEAN MOTION x 1e8) OF THE uint64 BITS OF THE SINGLE, ROUNDED HALF TO EVEN LIKE "{:.8f}"
+    import numpy as np
+    exponent = ((bits >> np.uint64(23)) & np.uint64(0xFF)).astype(np.int64)
+    mantissa = bits & np.uint64(0x7FFFFF)
+    mantissa = np.where(exponent > 0, mantissa | np.uint64(0x800000), mantissa)
+    # VALUE = mantissa * 2 ** -shift
+    shift = np.clip(150 - np.maximum(exponent, 1), 1, 63).astype(np.uint64)
+    scaled = mantissa * np.uint64(10 ** 8)
+    quotient = scaled >> shift
+    remainder = scaled & ((np.uint64(1) << shift) - np.uint64(1))
+    half = np.uint64(1) << (shift - np.uint64(1))
+    roundUp = (remainder > half) | ((remainder == half) & (quotient & np.uint64(1) == 1))
+    return quotient + roundUp.astype(np.uint64)
+
+
+def formatPackets(packets, satellite=DIWATA_2B):
+    """TLE texts of N packets (see tlePacket.asPacketArray), equal to formatTLE(tlePacket.decode(packet)).
+
+    Fields are rendered from the exact packet integers, so no float is ever
+    formatted. Mean motions must be below 2**23 and the other fields within
+    their TLE column widths, as in every packet made by tlePacket.encode.
+    The packet layout is the one of the satellite's packet version.
+    """
+    import numpy as np
+    codec = packetSchema.codecFor(satellite)
+    packets = codec.asPacketArray(packets)
+    count = len(packets)
+    raw = codec.unpackBatch(packets)
+    fields = {field.key: raw[field.name] for field in codec.fields}
+    layout = codec.byKey
+    line1 = np.empty((count, LINE_LENGTH), dtype=np.uint8)
+    line1[:] = _template(LINE1, satellite)
+    line2 = np.empty((count, LINE_LENGTH), dtype=np.uint8)
+    line2[:] = _template(LINE2, satellite)
+
+    # LINE 1: EPOCH, 1ST DERIVATIVE AND DRAG TERM
+    EP = fields['epoch']
+    fractionBits = layout['epoch'].fractionBits
+    epoch = (EP >> np.uint64(fractionBits)) * np.uint64(10 ** 8) + (EP & np.uint64((1 << fractionBits) - 1))
+    _writeDigits(line1, 18, 5, epoch // np.uint64(10 ** 8))
+    line1[:, 23] = ord('.')
+    _writeDigits(line1, 24, 8, epoch % np.uint64(10 ** 8))
+
+    DV = fields['derivative']
+    DV_sign = layout['derivative'].sign
+    fractionBits = layout['derivative'].fractionBits
+    derivative = ((DV & np.uint64(layout['derivative'].mask & ~DV_sign)) >> np.uint64(fractionBits)) * np.uint64(10000) + \
+        (DV & np.uint64((1 << fractionBits) - 1))
+    line1[:, 33] = np.where(DV & np.uint64(DV_sign), ord(' '), ord('-'))
+    line1[:, 34] = ord('.')
+    _writeDigits(line1, 35, 8, derivative)
+
+    DT = fields['drag']
+    DT_sign = layout['drag'].sign
+    line1[:, 53] = np.where(DT & np.uint64(DT_sign), ord(' '), ord('-'))
+    _writeDigits(line1, 54, 5, DT >> np.uint64(layout['drag'].exponentBits + 1))
+    line1[:, 59] = ord('-')
+    line1[:, 60] = (DT & np.uint64(DT_sign - 1)).astype(np.uint8) + ord('0')
+
+    # LINE 2: ANGLES, ECCENTRICITY AND MEAN MOTION
+    _writeFixed(line2, 8, 8, _exactAngle(fields['inclination'], layout['inclination'].fractionBits), 4)
+    _writeFixed(line2, 17, 8, _exactAngle(fields['raan'], layout['raan'].fractionBits), 4)
+    _writeDigits(line2, 26, 7, fields['eccentricity'])
+    _writeFixed(line2, 34, 8, _exactAngle(fields['argPerigee'], layout['argPerigee'].fractionBits), 4)
+    _writeFixed(line2, 43, 8, _exactAngle(fields['meanAnomaly'], layout['meanAnomaly'].fractionBits), 4)
+    _writeFixed(line2, 52, 11, _meanMotionDigits(fields['meanMotion']), 8)
+
+    # CHECKSUMS OF BOTH LINES IN ONE TABLE LOOKUP EACH
+    line1[:, 68] = checkSums(line1) + ord('0')
+    line2[:, 68] = checkSums(line2) + ord('0')
+
+    text = np.concatenate([line1, line2], axis=1).tobytes().decode('ascii')
+    name = satellite['name']
+    return [name + '\n' + text[i:i + LINE_LENGTH] + '\n' + text[i + LINE_LENGTH:i + 2 * LINE_LENGTH]
+            for i in range(0, len(text), 2 * LINE_LENGTH)]
@@ -0,0 +1,105 @@
+"""
+TLEPacket
+ENCODE AND DECODE THE 32-BYTE TLE DATA PACKET
+32-BYTE DATA PACKET FORMATTED IN BIG ENDIAN, FIELDS PACKED FROM THE MOST SIGNIFICANT BIT
+THE BIT LAYOUT IS DECLARED IN packetSchema.py AND COMPILED WHEN THIS MODULE IS FIRST IMPORTED
+
+NUMPY IS ONLY IMPORTED BY THE BATCH FUNCTIONS SO SINGLE-PACKET TOOLS START WITHOUT IT
+"""
+
+import packetSchema
+
+# THE LAYOUT AND ITS CONSTANTS ARE DECLARED IN packetSchema.py; THIS MODULE ENCODES AND DECODES THE PACKET OF
+# DIWATA-2B, USE packetSchema.codecFor(satellite) FOR THE PACKET VERSION OF ANOTHER SATELLITE
+CODEC = packetSchema.codecFor(packetSchema.DEFAULT_SATELLITE)
+
+PACKET_LENGTH = packetSchema.PACKET_LENGTH
+INFO_OFFSET = 6  # SATELLITE HEADER BEFORE THE PACKET IN THE AX.25 INFORMATION FIELD
+
+# PACKET LAYOUT: FIELD, BIT OFFSET FROM THE LEAST SIGNIFICANT BIT, BIT WIDTH
+FIELDS = tuple((field.name, field.offset, field.width) for field in CODEC.fields)
+
+# SUB-FIELDS
+EP_FRACTION_BITS = CODEC.byName['EP'].fractionBits  # JULIAN DAY FRACTION x 1e8 BELOW THE EPOCH YEAR AND DAY
+ANGLE_FRACTION_BITS = CODEC.byName['IN'].fractionBits  # INCLINATION AND MEAN ANOMALY: INTEGER DEGREES ABOVE 4 DECIMALS
+WRAPPED_FRACTION_BITS = CODEC.byName['RN'].fractionBits  # RAAN AND ARGUMENT OF PERIGEE: 9-BIT INTEGER DEGREES
+DV_POSITIVE = CODEC.byName['DV'].sign  # SET FOR A POSITIVE 1ST DERIVATIVE
+DT_POSITIVE = CODEC.byName['DT'].sign  # SET FOR A POSITIVE DRAG TERM
+
+DT_MAX_EXPONENT = (1 << CODEC.byName['DT'].exponentBits) - 1  # SMALLER DRAG TERMS ARE SENT AS ZERO
+
+# UPLINK COMMANDS CARRY 8 PACKET BYTES EACH, ADDRESS OF TLE = 04 B0 00 00
+UPLINK_COMMAND = '51 00 3{} {}'
+UPLINK_BYTES = 8
+DOWNLINK_COMMAND = '51 00 35 04 B0 00 00 01 00 00 01'
+
+# MEAN MOTION IS THE LAST 4 BYTES: AN IEEE 754 SINGLE READ IN PLACE
+MM_OFFSET = CODEC.byName['MM'].firstByte
+
+# GENERATED FROM THE LAYOUT, SEE "python packetSchema.py --source 1"
+pack = CODEC.pack
+unpack = CODEC.unpack
+encode = CODEC.encode
+decode = CODEC.decode
+
+asPacketArray = CODEC.asPacketArray
+unpackBatch = CODEC.unpackBatch
+packBatch = CODEC.packBatch
+decodeBatch = CODEC.decodeBatch
+encodeBatch = CODEC.encodeBatch
+
+
+def parseTLE(line1, line2):
+    """Split TLE line 1 and line 2 into the fields carried by the packet"""
+    return {
+        'epoch': float(line1[18:32].strip()),
+        'derivative': line1[33:43].strip(),
+        'drag': line1[53:61].strip(),
+        'inclination': float(line2[8:16].strip()),
+        'raan': float(line2[17:25].strip()),
+        'eccentricity': line2[26:33].strip(),
+        'argPerigee': float(line2[34:42].strip()),
+        'meanAnomaly': float(line2[43:51].strip()),
+        'meanMotion': float(line2[52:63].strip()),
+    }
+
+
+def dragValue(drag):
+    """Numeric value of a TLE drag term string such as 34804-3 or -12345-4"""
+    sign = '-' if drag.startswith('-') else ''
+    drag = drag.lstrip('+-')
+    return float(sign + '0.' + drag[:-2] + 'e' + drag[-2:])
+
+
+def tleColumns(tles):
+    """Numeric field arrays, keyed like decodeBatch(), for a list of parseTLE() results"""
+    import numpy as np
+    eccentricity = [tle['eccentricity'] for tle in tles]
+    return {
+        'epoch': np.array([tle['epoch'] for tle in tles], dtype=np.float64),
+        'derivative': np.array([float(tle['derivative']) for tle in tles], dtype=np.float64),
+        'drag': np.array([dragValue(tle['drag']) for tle in tles], dtype=np.float64),
+        'inclination': np.array([tle['inclination'] for tle in tles], dtype=np.float64),
+        'raan': np.array([tle['raan'] for tle in tles], dtype=np.float64),
+        'eccentricity': np.array([int(e) / 1e7 if isinstance(e, str) else e for e in eccentricity], dtype=np.float64),
+        'argPerigee': np.array([tle['argPerigee'] for tle in tles], dtype=np.float64),
+        'meanAnomaly': np.array([tle['meanAnomaly'] for tle in tles], dtype=np.float64),
+        'meanMotion': np.array([tle['meanMotion'] for tle in tles], dtype=np.float64),
+    }
+
+
+def uplinkCommands(packet):
+    """UL CMD 1-4 for one packet, each carrying 8 bytes as spaced hex"""
+    hexBytes = bytes(packet).hex(' ').upper()
+    return [UPLINK_COMMAND.format(i + 1, hexBytes[i * 3 * UPLINK_BYTES:(i + 1) * 3 * UPLINK_BYTES - 1])
+            for i in range(PACKET_LENGTH // UPLINK_BYTES)]
+
+
+def uplinkCommandsBatch(packets):
+    """UL CMD 1-4 for every packet, formatting the whole batch in one hex conversion"""
+    packets = asPacketArray(packets)
+    hexBytes = packets.tobytes().hex(' ').upper()
+    stride = 3 * PACKET_LENGTH
+    return [[UPLINK_COMMAND.format(i + 1, hexBytes[row + i * 3 * UPLINK_BYTES:row + (i + 1) * 3 * UPLINK_BYTES - 1])
+             for i in range(PACKET_LENGTH // UPLINK_BYTES)]
+            for row in range(0, len(packets) * stride, stride)]
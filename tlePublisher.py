@@ -0,0 +1,113 @@
+"""
+TLEPublisher
+ATOMIC, DEBOUNCED WRITES OF THE DECODED TLE FILE READ BY GPREDICT
+"""
+
+import os
+import threading
+import time
+
+TLE_FILE = 'diwataTLE.txt'
+DEBOUNCE = 1.0  # SECONDS OF QUIET BEFORE A BURST OF PACKETS IS WRITTEN
+REPLACE_RETRIES = 5  # WINDOWS REFUSES os.replace WHILE A READER HAS THE FILE OPEN
+REPLACE_DELAY = 0.1
+
+
+class TLEPublisher:
+    """Publish TLE text to a file only when it changes, once per burst of packets"""
+
+    def __init__(self, filename=TLE_FILE, debounce=DEBOUNCE, metrics=None):
+        self.filename = filename
+        self.debounce = debounce
+        self.metrics = metrics  # pipelineMetrics.PipelineMetrics TIMING EVERY FILE WRITE, OR None
+        self.published = 0  # FILE WRITES
+        self.unchanged = 0  # PACKETS WITH THE TLE ALREADY IN THE FILE
+        self.coalesced = 0  # CHANGES REPLACED BY A LATER ONE IN THE SAME BURST
+        self.failed = 0  # WRITES THAT FAILED, THEIR TEXT STAYS PENDING FOR THE NEXT PUBLISH OR FLUSH
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+        self._generation = 0  # TIMERS STARTED, A RESTARTED TIMER THAT FIRES ANYWAY IS IGNORED
+        self._current = None
+        if os.path.exists(filename):
+            with open(filename) as file:
+                self._current = file.read()
+
+    def publish(self, text):
+        """Queue text for the file; returns True when it differs from what is published"""
+        with self._lock:
+            if self._pending is None and text == self._current:
+                self.unchanged = self.unchanged + 1
+                return False
+            if self._pending is not None:
+                # A PENDING TEXT WITHOUT A TIMER FAILED TO WRITE, PUBLISHING IT AGAIN RETRIES
+                if text == self._pending and self._timer is not None:
+                    self.unchanged = self.unchanged + 1
+                    return False
+                if text != self._pending:
+                    self.coalesced = self.coalesced + 1
+            self._pending = text
+            if self.debounce <= 0:
+                self._write()
+            else:
+                # EVERY CHANGE RESTARTS THE QUIET PERIOD
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._generation = self._generation + 1
+                self._timer = threading.Timer(self.debounce, self._expire, (self._generation,))
+                self._timer.daemon = True
+                self._timer.start()
+            return True
+
+    def _expire(self, generation):
+        with self._lock:
+            if generation != self._generation:
+                return  # RESTARTED WHILE THIS TIMER WAS WAITING FOR THE LOCK
+            self._timer = None
+            if self._pending is not None:
+                self._write()
+
+    def flush(self):
+        """Write the pending text now, e.g. before the program exits"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending is not None:
+                self._write()
+
+    def _write(self):
+        text = self._pending
+        if text == self._current:
+            self._pending = None
+            return  # THE BURST ENDED ON THE PUBLISHED TLE
+
+        # WRITE THE WHOLE FILE BESIDE THE OLD ONE AND SWAP IT IN, SO READERS NEVER SEE HALF A TLE
+        start = time.perf_counter()
+        temporary = self.filename + '.tmp'
+        try:
+            with open(temporary, 'w') as file:
+                file.write(text)
+                file.flush()
+                os.fsync(file.fileno())
+            for attempt in range(REPLACE_RETRIES):
+                try:
+                    os.replace(temporary, self.filename)
+                    break
+                except PermissionError:
+                    if attempt == REPLACE_RETRIES - 1:
+                        raise
+                    time.sleep(REPLACE_DELAY)
+        except OSError:
+            # RUNS IN THE TIMER THREAD: COUNT IT, KEEP THE OLD FILE AND THE PENDING TEXT
+            self.failed = self.failed + 1
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+        self._pending = None
+        self._current = text
+        self.published = self.published + 1
+        if self.metrics is not None:
+            self.metrics.record('write', time.perf_counter() - start)